@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+def cpu_percent():
+    """System-wide CPU load in percent since the last call (psutil), else the 1-min load average per core."""
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None)
+    except ImportError:
+        return min(os.getloadavg()[0] / (os.cpu_count() or 1) * 100.0, 100.0)
+
+
+class AdaptiveController:
+    """Holds classifier latency inside a budget by trading inference rate and input size.
+
+    The inference worker reports every classifier call via observe(); step()
+    runs about once a second (GUI timer) and changes at most one knob:
+
+    - p90 latency over budget: next smaller input size (if the model allows it),
+      otherwise a lower inference rate
+    - CPU above cpu_high: lower inference rate (fewer calls, same latency)
+    - p90 well under budget and CPU below cpu_low: first back to the full
+      rate, then the next larger input size
+
+    After a change the controller waits `settle` steps so the effect shows in
+    the measurements before it acts again. Every decision is passed to `log`.
+    """
+
+    def __init__(self, budget=0.25, min_rate=0.5, max_rate=10.0, sizes=(224, 192, 160, 128),
+                 cpu_high=85.0, cpu_low=60.0, settle=3, log=print, cpu=cpu_percent):
+        self.budget = budget
+        self.min_interval = 1.0 / max_rate
+        self.max_interval = 1.0 / min_rate
+        self.sizes = tuple(sorted(sizes, reverse=True))
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.settle = settle
+        self.log = log
+        self.cpu = cpu
+        self._latencies = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._cooldown = 0
+        self.interval = self.min_interval
+        self.size_index = 0
+        self.resizable = True
+        self.worker = None
+        self.classifier = None
+        self.decisions = deque(maxlen=200)  # (time, change, reason)
+        self.changes = 0
+
+    def attach(self, worker, classifier):
+        """Start controlling worker.min_interval and classifier.set_input_size()."""
+        self.worker = worker
+        self.classifier = classifier
+        worker.min_interval = self.interval
+
+    def observe(self, latency):
+        """Called from the inference thread after each classifier call."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    @property
+    def input_size(self):
+        return self.sizes[self.size_index]
+
+    def step(self):
+        """One control decision; returns its description or None if nothing changed."""
+        with self._lock:
+            samples = list(self._latencies)
+        if self._cooldown:
+            self._cooldown -= 1
+            return None
+        if len(samples) < 3:
+            return None
+        p90 = float(np.percentile(samples, 90))
+        load = self.cpu()
+        why = f"p90 {p90 * 1000:.0f} ms, budget {self.budget * 1000:.0f} ms, CPU {load:.0f} %"
+
+        if p90 > self.budget:
+            if self.resizable and self.size_index < len(self.sizes) - 1 and self._set_size(self.size_index + 1):
+                return self._decide(f"input {self.sizes[self.size_index - 1]} → {self.input_size}", why)
+            if self.interval < self.max_interval:
+                return self._decide(self._set_interval(self.interval * 1.5), why)
+        elif load > self.cpu_high:
+            if self.interval < self.max_interval:
+                return self._decide(self._set_interval(self.interval * 1.25), why)
+        elif p90 < 0.6 * self.budget and load < self.cpu_low:
+            if self.interval > self.min_interval:
+                return self._decide(self._set_interval(self.interval / 1.25), why)
+            if self.resizable and self.size_index > 0:
+                # Größeres Bild nur, wenn die Latenz proportional zur Pixelzahl noch ins Budget passt
+                grow = (self.sizes[self.size_index - 1] / self.input_size) ** 2
+                if p90 * grow < 0.9 * self.budget and self._set_size(self.size_index - 1):
+                    return self._decide(f"input {self.sizes[self.size_index + 1]} → {self.input_size}", why)
+        return None
+
+    def _set_size(self, index):
+        if not self.classifier.set_input_size(self.sizes[index]):
+            self.resizable = False  # Modell mit fester Eingabegröße: nur noch die Rate regeln
+            self.log("⚙️ Model input size is fixed, adapting the inference rate only")
+            return False
+        self.size_index = index
+        with self._lock:
+            self._latencies.clear()  # alte Messungen gelten für die alte Größe
+        return True
+
+    def _set_interval(self, interval):
+        old = self.interval
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        if self.worker is not None:
+            self.worker.min_interval = self.interval
+        return f"rate {1 / old:.1f} → {1 / self.interval:.1f}/s"
+
+    def _decide(self, change, why):
+        self._cooldown = self.settle
+        self.changes += 1
+        text = f"⚙️ Adaptive: {change} ({why})"
+        self.decisions.append((time.time(), change, why))
+        self.log(text)
+        return text
+
+    def state(self):
+        return {"rate": round(1 / self.interval, 2), "input_size": self.input_size, "changes": self.changes}
@@ -0,0 +1,169 @@
+from PySide6.QtCore import QObject, Signal, Slot
+import threading
+import time
+from collections import deque
+from Widgets.cpu_plan import cpu_plan
+from Widgets.profiling import summarize
+from Widgets.metrics import INFERENCE_SECONDS
+
+
+class _StreamState:
+    def __init__(self, name):
+        self.name = name
+        self.frame = None
+        self.submitted_at = 0.0
+        self.received = 0
+        self.dropped = 0
+        self.served = 0
+        self.latencies = deque(maxlen=500)  # submit -> result, seconds
+
+
+class BatchInferenceService(QObject):
+    """One shared classifier for several camera streams.
+
+    Each stream has a latest-frame-wins slot. The service thread collects the
+    pending frames into micro-batches of at most `max_batch`, waiting up to
+    `max_wait` seconds for more streams to deliver, and runs them through a
+    single predict_batch() call. Streams are served round-robin so a fast
+    phone cannot starve a slow one.
+    """
+    result_ready = Signal(int, str, float)  # stream id, top-1 class name, confidence
+    finished = Signal()
+
+    def __init__(self, classifier, max_batch=4, max_wait=0.02):
+        super().__init__()
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.streams = {}
+        self._order = []
+        self._next = 0
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.failed_batches = 0
+        self.batch_sizes = deque(maxlen=500)
+        self.running = True
+
+    def add_stream(self, stream_id, name=""):
+        with self._cond:
+            self.streams[stream_id] = _StreamState(name or f"stream {stream_id}")
+            self._order.append(stream_id)
+        return stream_id
+
+    def remove_stream(self, stream_id):
+        with self._cond:
+            self.streams.pop(stream_id, None)
+            if stream_id in self._order:
+                self._order.remove(stream_id)
+
+    def submit(self, stream_id, frame):
+        """Thread-safe; called from the capture threads. Replaces an unserved frame of the same stream."""
+        with self._cond:
+            state = self.streams.get(stream_id)
+            if state is None:
+                return
+            state.received += 1
+            if state.frame is not None:
+                state.dropped += 1
+            state.frame = frame
+            state.submitted_at = time.perf_counter()
+            self._cond.notify()
+
+    def _pending(self):
+        return [sid for sid in self._order if self.streams[sid].frame is not None]
+
+    def _take_batch(self):
+        """Wait for work, give other streams max_wait to catch up, then take up to max_batch frames fairly."""
+        with self._cond:
+            while self.running and not self._pending():
+                self._cond.wait(0.1)
+            if not self.running:
+                return []
+            deadline = time.perf_counter() + self.max_wait
+            while self.running and len(self._pending()) < min(self.max_batch, len(self._order)):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # Round-robin ab dem Stream nach dem zuletzt bedienten
+            n = len(self._order)
+            rotated = [self._order[(self._next + i) % n] for i in range(n)]
+            batch = []
+            for sid in rotated:
+                state = self.streams[sid]
+                if state.frame is None:
+                    continue
+                batch.append((sid, state.frame, state.submitted_at))
+                state.frame = None
+                if len(batch) == self.max_batch:
+                    break
+            if batch:
+                self._next = (self._order.index(batch[-1][0]) + 1) % n
+            return batch
+
+    @Slot()
+    def run(self):
+        cpu_plan.pin("inference")
+        while self.running:
+            batch = self._take_batch()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                predictions = self.classifier.predict_batch([frame for _, frame, _ in batch])
+            except Exception as e:
+                # Ein fehlgeschlagener Batch kostet nur seine Bilder, nicht den Dienst aller Streams
+                with self._cond:
+                    self.failed_batches += 1
+                    for sid, _, _ in batch:
+                        state = self.streams.get(sid)
+                        if state is not None:
+                            state.dropped += 1
+                print(f"⚠️ Batch inference failed ({e!r}), dropped {len(batch)} frame(s)")
+                with self._cond:
+                    self._cond.wait(0.5)  # kurz pausieren, stop() weckt sofort auf
+                continue
+            done = time.perf_counter()
+            INFERENCE_SECONDS.observe(done - start, pipeline="batch")
+            with self._cond:
+                self.batches += 1
+                self.batch_sizes.append(len(batch))
+                for (sid, _, submitted_at), prediction in zip(batch, predictions):
+                    state = self.streams.get(sid)
+                    if state is not None:
+                        state.served += 1
+                        state.latencies.append(done - submitted_at)
+            for (sid, _, _), prediction in zip(batch, predictions):
+                self.result_ready.emit(sid, prediction.label, prediction.conf)
+        self.finished.emit()
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def stats(self):
+        """Per-stream served/dropped counts and latency, plus Jain's fairness index over served frames."""
+        with self._cond:
+            per_stream = {
+                sid: {
+                    "name": s.name,
+                    "received": s.received,
+                    "served": s.served,
+                    "dropped": s.dropped,
+                    "pending": int(s.frame is not None),
+                    "latency": summarize(list(s.latencies)),
+                }
+                for sid, s in self.streams.items()
+            }
+            sizes = list(self.batch_sizes)
+        served = [s["served"] for s in per_stream.values()]
+        fairness = (sum(served) ** 2 / (len(served) * sum(x * x for x in served))) if any(served) else 1.0
+        return {
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "mean_batch": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "fairness": round(fairness, 3),
+            "streams": per_stream,
+        }
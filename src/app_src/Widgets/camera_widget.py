@@ -1,74 +1,23 @@
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QTextEdit
-from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QImage, QPixmap
-from picamera2 import Picamera2
+from PySide6.QtCore import QTimer, Qt, QThread, Slot
+from PySide6.QtGui import QPixmap
 from PySide6.QtGui import QShortcut, QKeySequence
 import sys
-from ultralytics import YOLO
 import os
 import cv2
-import math
-
-# NEUE DATENSTRUKTUR: Faktoren für die Brennbarkeitsformel
-# V = Volatile Öle, S = Surface-to-Volume, D = Dichte
-FLAMMABILITY_FACTORS = {
-    "viburnum": {
-        "V": 0.1, "S": 0.5, "D": 0.6,
-        "description": "Sehr geringe Brennbarkeit. Hervorragend geeignet für den Brandschutz."
-    },
-    "quercus": {
-        "V": 0.2, "S": 0.3, "D": 0.9,
-        "description": "Geringe bis moderate Brennbarkeit. Sichere Wahl im grünen Zustand."
-    },
-    "arbutus": {
-        "V": 0.4, "S": 0.5, "D": 0.5,
-        "description": "Moderate Brennbarkeit. Gewachste Blätter und rissige Rinde."
-    },
-    "pyrancanthan": {
-        "V": 0.6, "S": 0.8, "D": 0.4,
-        "description": "Hohe Brennbarkeit. Dichtes, harziges Wachstum brennt schnell."
-    },
-    "pinus": {
-        "V": 0.9, "S": 0.7, "D": 0.3,
-        "description": "Sehr hohe Brennbarkeit. Harz und Nadeln entzünden sich leicht."
-    }
-}
-# Example usage
-# NEUE FUNKTION: Berechnet den Flammbarkeits-Grad (Index und Farbe)
-def calculate_flammability(plant_type, moisture=0.5, k=100):
-    """
-    Berechnet den Flammbarkeits-Index F basierend auf der Formel: F = k * (V * S) / (sqrt(M) * D)
-    Gibt Index (1-5) und zugehörige CSS-Farbe zurück.
-    """
-    data = FLAMMABILITY_FACTORS.get(plant_type.lower())
-    if not data:
-        return 0, "#7f8c8d" # Grau für unbekannt
-
-    V = data["V"]
-    S = data["S"]
-    D = data["D"]
-
-    # Sicherstellen, dass M und D > 0 sind
-    if D == 0 or moisture == 0:
-         F = 100
-    else:
-        F = k * (V * S) / (math.sqrt(moisture) * D)
-
-    F = min(F, 100) # Beschränken auf max. 100
-
-    # 1. Index bestimmen und 2. Farbe zuweisen
-    if F < 20: index, color = 1, "#2ecc71"  # Grün (Sehr gering)
-    elif F < 40: index, color = 2, "#3498db" # Blau (Gering)
-    elif F < 60: index, color = 3, "#f1c40f" # Gelb (Mittel)
-    elif F < 80: index, color = 4, "#e67e22" # Orange (Hoch)
-    else: index, color = 5, "#e74c3c" # Rot (Sehr hoch)
-
-    return index, color
-
+from Widgets.flammability import FlammabilityScorer
+from Widgets.inference_worker import InferenceWorker, FpsMeter
+from Widgets.frame_sources import Picamera2Source
+from Widgets.profiling import NullStageTimer
+from Widgets.preprocess import FramePreprocessor
+from Widgets.video_widget import VideoWidget
+from Widgets.view_state import ViewRenderer, view_state_for, DEFAULT_GRADE_STYLE
+from Widgets.model_registry import registry
 
 # Camera feed window
 class CameraWindow(QWidget):
-    def __init__(self):
+    def __init__(self, source=None, classifier=None, autostart=True, gate=None, recorder=None, preview=None,
+                 controller=None, pipeline=None, scheduler=None):
         super().__init__()
         self.setWindowTitle("Pi Camera Feed")
         self.showFullScreen()
@@ -76,7 +25,6 @@ class CameraWindow(QWidget):
         # self.adjustSize()
 
         self.layout = QVBoxLayout()
-        self.current_overlay_text = "No tree found! Please try again!"
 
 # ----------- HIER Züruck button-----------
         # DIESEN GESAMTEN BLOCK ERSETZEN
@@ -107,9 +55,7 @@ class CameraWindow(QWidget):
             grade_widget = QLabel(str(i))
             grade_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
             grade_widget.setFixedSize(30, 30)
-            grade_widget.setStyleSheet(
-                "background-color: #34495e; color: white; font-weight: bold; border: 1px solid #7f8c8d; border-radius: 4px;"
-            )
+            grade_widget.setStyleSheet(DEFAULT_GRADE_STYLE)
             self.grade_widgets.append(grade_widget)
             grade_layout.addWidget(grade_widget)
 
@@ -129,6 +75,10 @@ class CameraWindow(QWidget):
         top_layout.addStretch(1)
         top_layout.addWidget(self.grade_container) # Grad-Balken
         top_layout.addStretch(1)
+        # Gemessene Bildraten: Vorschau und Inferenz laufen entkoppelt
+        self.fps_label = QLabel("")
+        self.fps_label.setStyleSheet("font-size: 12px; color: #7f8c8d;")
+        top_layout.addWidget(self.fps_label)
         top_layout.addWidget(self.back_button) # Rechts
 
         self.layout.addLayout(top_layout)
@@ -137,15 +87,13 @@ class CameraWindow(QWidget):
 
         self.layout.setAlignment(Qt.AlignCenter)  # 🔹 ensure top-left alignment
 
-        self.label = QLabel()
-        self.label.setMargin(0)
-        self.label.setScaledContents(True)  # the image will fill the label
-        self.layout.addWidget(self.label)
+        # Video direkt mit QPainter zeichnen (statt QLabel mit setScaledContents)
+        self.video = VideoWidget()
+        self.layout.addWidget(self.video)
 
         self.setLayout(self.layout)
 
-        self.overlay_state = False
-        self.overlay_label = QLabel(self.label)
+        self.overlay_label = QLabel(self.video)
         self.overlay_label.setWordWrap(True)
         self.overlay_label.setStyleSheet(
             "background-color: rgba(0,0,0,150); color: white; padding: 10px; border-radius: 5px; margin: 5px"
@@ -155,17 +103,23 @@ class CameraWindow(QWidget):
         # self.overlay_label.setAlignment(Qt.AlignCenter)
         self.overlay_label.hide()  # start hidden
 
-        # Initialize camera
-        self.picam2 = Picamera2()
-        config = self.picam2.create_preview_configuration(
-            main={"format": "BGR888", "size": (240, 400)}
-        )
-        self.picam2.configure(config)
-        self.picam2.start()
-        # Timer for updating frames
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)
+        # Optional: Aufnahme und Inferenz in eigenen Prozessen (ProcessPipeline), Bilder kommen gedreht aus dem Shared Memory
+        self.pipeline = pipeline
+
+        # Initialize camera (Standard: Pi-Kamera, sonst z.B. Datei oder synthetisch)
+        if pipeline is not None:
+            self.source = pipeline.display_source()
+        else:
+            self.source = source if source is not None else Picamera2Source(size=(240, 400))
+        self.source.open()
+
+        # Drehung (180° + 90° im Uhrzeigersinn = 90° gegen den Uhrzeigersinn) und ggf. BGR->RGB
+        # in einem Schritt in wiederverwendete Puffer
+        rotation = None if pipeline is not None else cv2.ROTATE_90_COUNTERCLOCKWISE
+        self.preprocessor = FramePreprocessor(rotation, swap_rb=self.source.channel_order == "BGR")
+
+        # Grad-Balken und Overlay nur bei Änderungen anfassen
+        self.renderer = ViewRenderer(self.grade_widgets, self.overlay_label, self.center_description)
 
         # Button Layout
         #btn_layout = QHBoxLayout()
@@ -174,33 +128,70 @@ class CameraWindow(QWidget):
         #btn_layout.addWidget(self.show_btn)
         #self.layout.addLayout(btn_layout)
 
-        model_path = os.path.join(os.path.dirname(__file__), "treeDetection.pt")
-        self.model = YOLO(model_path)
-        QShortcut(QKeySequence("Esc"), self, self.close)
-        # self.shortcut.activated.connect(self.closeEvent)
+        # Klassifikator (PyTorch, ONNX Runtime oder OpenVINO); aus der Registry nur einmal pro Prozess geladen
+        if pipeline is not None:
+            self.classifier = pipeline  # Klassennamen kommen vom Inferenz-Prozess
+        else:
+            self.classifier = classifier if classifier is not None else registry.get("torch")
 
-    def show_description(self, pred_label, conf):
-        """Steuert die Anzeige des Overlays: Nur Anweisung bei niedriger Konfidenz, ansonsten verstecken."""
+        # Zeitmessung pro Pipeline-Stufe (nur im Benchmark aktiv)
+        self.stage_timer = NullStageTimer()
 
-        # Schwellenwert für NICHTS gefunden
-        if conf <= 0.7:
-            instruction_text = "Bitte bewegen Sie die Kamera oder passen Sie den Abstand zum Baum an."
+        # Bewertungstabelle über alle Modellklassen, angelegt beim ersten Ergebnis (Modell ist dann geladen)
+        self.scorer = None
 
-            # Text nur aktualisieren und zeigen, wenn eine Änderung vorliegt
-            if self.current_overlay_text != instruction_text:
-                self.overlay_label.setText(instruction_text)
-                self.current_overlay_text = instruction_text
+        # Optional: Ergebnisse und Vorschaubilder der Sitzung aufzeichnen (SessionRecorder)
+        self.recorder = recorder
 
-            # Zeigt das Overlay mittig an
-            self.center_description()
-            self.overlay_label.show()
+        # Optional: Live-Vorschau im Browser (PreviewChannel des Web-Servers)
+        self.preview = preview
 
+        # Letztes Klassifikationsergebnis (kommt asynchron vom Inferenz-Thread)
+        self.last_label = ""
+        self.last_conf = 0.0
+        self.preview_fps = FpsMeter()
+
+        # Inferenz in eigenem Thread, bekommt immer nur das neueste Bild
+        self.inference_thread = QThread()
+        if pipeline is not None:
+            self.inference_worker = pipeline.worker(release=self.preprocessor.pool.release)
         else:
-            # Bei erfolgreicher Erkennung (conf > 0.7): Overlay ausblenden
-            if self.overlay_label.isVisible():
-                self.overlay_label.hide()
-            # current_overlay_text zurücksetzen, damit die Anweisung beim nächsten Mal sofort angezeigt wird
-            self.current_overlay_text = ""
+            self.inference_worker = InferenceWorker(self.classifier, gate, release=self.preprocessor.pool.release)
+        self.inference_worker.moveToThread(self.inference_thread)
+        self.inference_thread.started.connect(self.inference_worker.run)
+        self.inference_worker.finished.connect(self.inference_thread.quit)
+        self.inference_worker.result_ready.connect(self.on_result)
+
+        # Timer for updating frames
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_frame)
+
+        # FPS-Anzeige einmal pro Sekunde aktualisieren
+        self.fps_timer = QTimer()
+        self.fps_timer.timeout.connect(self.update_fps_label)
+
+        # Optional: Inferenzrate und Eingabegröße an das Latenzbudget anpassen (AdaptiveController)
+        self.controller = controller
+        if controller is not None:
+            controller.attach(self.inference_worker, self.classifier)
+            self.inference_worker.controller = controller
+            self.fps_timer.timeout.connect(controller.step)
+
+        # Optional: vor dem Drosseln der CPU die Inferenzrate senken bzw. ein leichteres Modell nehmen
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.attach(self.inference_worker, self.classifier)
+            self.inference_worker.scheduler = scheduler
+            self.fps_timer.timeout.connect(scheduler.step)
+
+        # autostart=False: der headless Benchmark treibt update_frame/on_result selbst
+        if autostart:
+            self.inference_thread.start()
+            self.timer.start(30)
+            self.fps_timer.start(1000)
+
+        QShortcut(QKeySequence("Esc"), self, self.close)
+        # self.shortcut.activated.connect(self.closeEvent)
 
     def center_description(self):
         """Passt die Größe des Overlays an den Text an und zentriert es auf dem Kamerabild."""
@@ -208,8 +199,8 @@ class CameraWindow(QWidget):
         # Größe an Text anpassen
         self.overlay_label.adjustSize()
 
-        parent_width = self.label.width()
-        parent_height = self.label.height()
+        parent_width = self.video.width()
+        parent_height = self.video.height()
         overlay_width = self.overlay_label.width()
         overlay_height = self.overlay_label.height()
 
@@ -219,56 +210,76 @@ class CameraWindow(QWidget):
             # Positioniere es etwas oberhalb des unteren Randes
             (parent_height - overlay_height) / 2
         )
-        # NICHT self.overlay_label.show() hier aufrufen, da es in show_description gesteuert wird
-
-    def update_frame(self):
-            frame = self.picam2.capture_array()
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-
-            results = self.model.predict(frame, verbose=False)
-            pred_label = results[0].names[results[0].probs.top1]  # top-1 class name
-            conf = results[0].probs.top1conf.item()
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) # Konvertierung für CV2-Text
-
-            flam_index = 0
+        # NICHT self.overlay_label.show() hier aufrufen, das steuert der ViewRenderer
 
-            # Logik zur Grad-Anzeige und Farbmarkierung
-            if conf > 0.7:
-                # 1. Berechne Grad und Farbe
-                flam_index, flam_color = calculate_flammability(pred_label)
-
-                # 2. Baumname auf das Video zeichnen
-                cv2.putText(frame_bgr, f"{pred_label} ({conf:.2f})", (20, 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            else:
-                pred_label = ""
-
-            # 3. Kacheln färben: Setze alle zurück und markiere nur den aktuellen Index (falls vorhanden)
-            DEFAULT_STYLE = "background-color: #34495e; color: white; font-weight: bold; border: 1px solid #7f8c8d; border-radius: 4px;"
-
-            for i, widget in enumerate(self.grade_widgets):
-                widget_grade = i + 1 # Grade sind 1 bis 5
-
-                if widget_grade == flam_index:
-                    # Aktuellen Grad markieren (hellere Farbe, dickerer Rand)
-                    widget.setStyleSheet(
-                        f"background-color: {flam_color}; color: black; font-weight: bold; border: 2px solid white; border-radius: 4px;"
-                    )
-                else:
-                    # Alle anderen Kacheln zurücksetzen
-                    widget.setStyleSheet(DEFAULT_STYLE)
-
-
-            frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB) # Korrektur für Qt-Anzeige
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # showFullScreen() im Konstruktor löst resizeEvent aus, bevor das Overlay existiert
+        if hasattr(self, "overlay_label") and self.overlay_label.isVisible():
+            self.center_description()
 
-            self.show_description(pred_label, conf) # Steuert die Anweisung in der Mitte
+    @Slot(str, float, object, float)
+    def on_result(self, pred_label, conf, probs=None, latency=None):
+        """Neues Ergebnis vom Inferenz-Thread: Grad-Balken und Overlay aktualisieren."""
+        timer = self.stage_timer
+
+        # Grad (gewichtet über alle Klassen), Farbe und Anweisung bestimmen
+        with timer.stage("flammability"):
+            if self.scorer is None and probs is not None:
+                self.scorer = FlammabilityScorer(self.classifier.names)
+                if self.recorder is not None:
+                    self.recorder.set_names(self.classifier.names)
+            state = view_state_for(pred_label, conf, probs, self.scorer)
+
+        if self.recorder is not None:
+            with timer.stage("record"):
+                self.recorder.record(probs, state.grade, latency)
+        if self.preview is not None:
+            self.preview.publish_result(state.label, conf, state.grade or None)
+
+        self.last_label = state.label
+        self.last_conf = state.conf
+
+        # Nur geänderte Kacheln bzw. das Overlay neu setzen
+        with timer.stage("render"):
+            self.renderer.render(state)
+
+    def update_fps_label(self):
+        text = f"Vorschau {self.preview_fps.fps:.1f} FPS | Inferenz {self.inference_worker.fps_meter.fps:.1f} FPS"
+        gate = self.inference_worker.gate
+        if gate is not None:
+            text += f" | Cache {gate.hit_rate:.0%} ({gate.cpu_saved:.0f} s CPU gespart)"
+        if self.controller is not None:
+            text += f" | {self.controller.input_size} px"
+        if self.scheduler is not None and self.scheduler.reading.temp_c is not None:
+            text += f" | {self.scheduler.reading.temp_c:.0f} °C"
+        self.fps_label.setText(text)
 
-            self.label.setPixmap(QPixmap.fromImage(qt_image))
-            self.label.setScaledContents(True)
+    def update_frame(self):
+            timer = self.stage_timer
+            with timer.stage("capture"):
+                frame = self.source.read()
+            if frame is None:
+                return
+            with timer.stage("transform"):
+                frame = self.preprocessor.process(frame) # Puffer aus dem Pool, RGB und richtig gedreht
+
+            # Neuestes Bild an den Inferenz-Thread geben (ältere, noch nicht verarbeitete werden verworfen).
+            # Kein Kopieren: der Puffer bleibt reserviert, bis der Worker ihn freigibt.
+            self.preprocessor.pool.retain(frame)
+            self.inference_worker.submit(frame)
+
+            # Anzeige ohne Kopie: das Widget malt direkt aus dem Puffer und gibt ihn beim nächsten Bild frei
+            if self.recorder is not None:
+                with timer.stage("record"):
+                    self.recorder.add_thumbnail(frame)
+            if self.preview is not None:
+                self.preview.publish(frame, "RGB")
+
+            with timer.stage("display"):
+                text = f"{self.last_label} ({self.last_conf:.2f})" if self.last_label else ""
+                self.video.set_frame(frame, text, release=self.preprocessor.pool.release)
+            self.preview_fps.tick()
 
     # without button
     # def update_frame(self):
@@ -312,7 +323,20 @@ class CameraWindow(QWidget):
 
     def closeEvent(self, event):
         self.timer.stop()
-        self.picam2.stop()
-        self.picam2.close()
-        del self.picam2  # ensure it's released
+        self.fps_timer.stop()
+        self.inference_worker.stop()
+        self.inference_thread.quit()
+        self.inference_thread.wait()
+        self.source.close()  # ensure it's released
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.video.clear()
+        if self.preview is not None:
+            self.preview.close()
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"💾 Session saved to {self.recorder.path}: {self.recorder.stats()}")
+            self.recorder = None
+        if self.scheduler is not None:
+            print(f"🌡 Thermal: {self.scheduler.summary()}")
         event.accept()
@@ -0,0 +1,111 @@
+import threading
+from Widgets.metrics import metrics
+from Widgets.view_state import CONFIDENCE_THRESHOLD
+
+CASCADE_FRAMES = metrics.counter(
+    "treedetection_cascade_frames_total", "Frames answered by the cascade, by the stage that decided.",
+    labelnames=("stage",))
+
+
+def _class_list(names):
+    return list(names.values()) if isinstance(names, dict) else list(names)
+
+
+def outcome(prediction):
+    """What the user gets to see: the species above the confidence threshold, else None (move the camera)."""
+    return prediction.label if prediction.conf > CONFIDENCE_THRESHOLD else None
+
+
+class CascadeClassifier:
+    """A small gate model in front of the full classifier, with early exit.
+
+    The gate model answers alone when it is confident either way: below `low`
+    the frame shows no recognisable tree, at or above `high` it is clearly one
+    species. Only frames in the ambiguous band [low, high) around the 0.7
+    display threshold pay for the full model. Both models must share the class
+    list.
+
+    Every `audit_every`-th early exit is also run through the full model
+    (0 = never), which gives a running estimate of how often the early exit
+    changes what the user sees.
+
+    Satisfies the predict()/predict_batch()/names contract, so the windows and
+    services use it like any backend or ModelEntry.
+    """
+
+    def __init__(self, gate, full, low=0.5, high=0.9, audit_every=20):
+        self.gate = gate
+        self.full = full
+        self.low = low
+        self.high = high
+        self.audit_every = audit_every
+        self.model_path = f"{getattr(gate, 'model_path', '?')} → {getattr(full, 'model_path', '?')}"
+        self._lock = threading.Lock()
+        self._checked = False
+        self.frames = 0
+        self.early_exits = 0
+        self.audited = 0
+        self.audit_agree = 0
+
+    @property
+    def ready(self):
+        return getattr(self.gate, "ready", True) and getattr(self.full, "ready", True)
+
+    def wait(self, timeout=None):
+        for model in (self.gate, self.full):
+            if hasattr(model, "wait"):
+                model.wait(timeout)
+        return self
+
+    @property
+    def names(self):
+        return self.full.names
+
+    def set_input_size(self, size):
+        # Nur das große Modell anpassen: das Gate-Modell ist ohnehin schnell
+        return self.full.set_input_size(size)
+
+    def predict(self, frame):
+        return self.predict_batch([frame])[0]
+
+    def predict_batch(self, frames):
+        frames = list(frames)
+        predictions = list(self.gate.predict_batch(frames))
+        if not self._checked:
+            if _class_list(self.gate.names) != _class_list(self.full.names):
+                raise ValueError("cascade gate model and full model have different classes")
+            self._checked = True
+
+        escalate, audit = [], []
+        with self._lock:
+            for i, prediction in enumerate(predictions):
+                self.frames += 1
+                if self.low <= prediction.conf < self.high:
+                    escalate.append(i)
+                    continue
+                self.early_exits += 1
+                if self.audit_every and self.early_exits % self.audit_every == 0:
+                    audit.append(i)
+
+        if escalate or audit:
+            full = self.full.predict_batch([frames[i] for i in escalate + audit])
+            for i, prediction in zip(escalate, full):
+                predictions[i] = prediction
+            agree = sum(outcome(predictions[i]) == outcome(p) for i, p in zip(audit, full[len(escalate):]))
+            with self._lock:
+                self.audited += len(audit)
+                self.audit_agree += agree
+        CASCADE_FRAMES.inc(len(frames) - len(escalate), stage="gate")
+        if escalate:
+            CASCADE_FRAMES.inc(len(escalate), stage="full")
+        return predictions
+
+    def stats(self):
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "early_exits": self.early_exits,
+                "early_exit_fraction": round(self.early_exits / self.frames, 4) if self.frames else 0.0,
+                "audited": self.audited,
+                "audit_agreement": round(self.audit_agree / self.audited, 4) if self.audited else None,
+            }
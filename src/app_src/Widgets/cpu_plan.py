@@ -0,0 +1,92 @@
+import os
+
+ROLES = ("gui", "capture", "inference", "web")
+
+
+def parse_cores(text):
+    """'0-1,3' -> frozenset({0, 1, 3})."""
+    cores = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cores.update(range(int(first), int(last or first) + 1))
+    if not cores:
+        raise ValueError(f"no cores in {text!r}")
+    return frozenset(cores)
+
+
+def parse_affinity(rules):
+    """['inference=1-3', 'capture=0'] or 'inference=1-3;capture=0' -> {role: cores}."""
+    if isinstance(rules, str):
+        rules = [rule for rule in rules.split(";") if rule.strip()]
+    affinity = {}
+    for rule in rules or ():
+        role, _, cores = rule.partition("=")
+        role = role.strip()
+        if role not in ROLES or not cores:
+            raise ValueError(f"expected ROLE=CORES with ROLE one of {', '.join(ROLES)}, got {rule!r}")
+        affinity[role] = parse_cores(cores)
+    return affinity
+
+
+def format_affinity(affinity):
+    return ";".join(f"{role}={','.join(map(str, sorted(cores)))}" for role, cores in affinity.items()) or "none"
+
+
+class CpuPlan:
+    """How many threads inference may use and which cores each pipeline role runs on.
+
+    inference_threads (0 = runtime default) is handed to the backends as
+    intra-op thread count (torch.set_num_threads, ONNX Runtime
+    intra_op_num_threads, OpenVINO INFERENCE_NUM_THREADS). affinity maps the
+    roles gui, capture, inference and web to core sets; every long-running
+    thread calls pin(role) when it starts. Threads inherit the mask of the
+    thread that created them, so helpers without a role of their own (the
+    inference runtime's pool, request threads of the web server) follow
+    their parent. Pinning needs Linux; elsewhere it is a no-op.
+    """
+
+    def __init__(self, inference_threads=0, affinity=None):
+        self.configure(inference_threads, affinity)
+
+    def configure(self, inference_threads=0, affinity=None):
+        self.inference_threads = inference_threads or 0
+        self.affinity = dict(affinity or {})
+        available = self.available()
+        for role, cores in self.affinity.items():
+            if available is not None and not cores <= available:
+                print(f"⚠️ Cores {sorted(cores - available)} for {role} not available (have {sorted(available)})")
+        return self
+
+    @staticmethod
+    def available():
+        return frozenset(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+
+    def pin(self, role):
+        """Restrict the calling thread to the role's cores; False if there is no rule or it failed."""
+        cores = self.affinity.get(role)
+        if not cores or not hasattr(os, "sched_setaffinity"):
+            return False
+        try:
+            os.sched_setaffinity(0, cores)  # 0 = der aufrufende Thread
+        except OSError as e:
+            print(f"⚠️ Could not pin {role} to cores {sorted(cores)}: {e}")
+            return False
+        return True
+
+    def loader_kwargs(self):
+        """Extra arguments for load_classifier()."""
+        return {"threads": self.inference_threads} if self.inference_threads else {}
+
+    def as_dict(self):
+        """Picklable form for the pipeline processes (CpuPlan(**plan.as_dict()))."""
+        return {"inference_threads": self.inference_threads, "affinity": dict(self.affinity)}
+
+    def describe(self):
+        threads = self.inference_threads or "default"
+        return f"inference threads {threads}, affinity {format_affinity(self.affinity)}"
+
+
+cpu_plan = CpuPlan()
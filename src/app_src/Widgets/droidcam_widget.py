@@ -1,9 +1,21 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy, QPushButton, QHBoxLayout
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy, QPushButton, QHBoxLayout, QProgressBar, QCheckBox
 from PySide6.QtCore import QTimer, Qt, QObject, Signal, Slot
 from PySide6.QtGui import QImage, QPixmap, QKeySequence, QShortcut
 import cv2
-from ultralytics import YOLO
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from Widgets.cpu_plan import cpu_plan
+from Widgets.frame_sources import FrameSource, VideoCaptureSource
+from Widgets.frame_grabber import FrameGrabber
+from Widgets.profiling import summarize
+from Widgets.result_cache import FrameResultCache
+from Widgets.inference_worker import FpsMeter
+from Widgets.inference_backends import draw_prediction
+from Widgets.model_registry import registry
+from Widgets.tiling import TiledAnalyzer
 
 '''class CameraWindowDroidCam(QWidget):
     def __init__(self):
@@ -44,13 +56,19 @@ import os
 '''
 
 class CameraWindowDroidCam(QWidget):
-    def __init__(self):
+    frame_shown = Signal()  # an update_frame call has finished (acknowledges the CameraWorker)
+    detection_progress = Signal(int, int, str)  # job, step (1-3), text
+    detection_done = Signal(int, object)        # job, (prediction, annotated RGB) or the exception
+    closed = Signal()                           # window closed: the owner stops its camera stream
+
+    def __init__(self, classifier=None, tiler=None, tiled=False):
         super().__init__()
         self.setWindowTitle("DroidCam Feed")
 
-        # --- Load YOLO model ---
-        model_path = os.path.join(os.path.dirname(__file__), "treeDetection.pt")
-        self.model = YOLO(model_path)
+        # --- Classifier (PyTorch, ONNX Runtime or OpenVINO), shared through the model registry ---
+        self.classifier = classifier if classifier is not None else registry.get("torch")
+        # Kachel-Analyse für Hecken mit mehreren Arten (ein Batch-Aufruf pro Standbild)
+        self.tiler = tiler if tiler is not None else TiledAnalyzer(self.classifier)
 
         # --- Layout setup ---
         #layout = QVBoxLayout(self)
@@ -72,6 +90,9 @@ class CameraWindowDroidCam(QWidget):
         self.resume_btn.setVisible(False)
         btn_layout.addWidget(self.resume_btn)
 
+        self.tiled_check = QCheckBox("🧩 Tiled analysis")
+        self.tiled_check.setChecked(tiled)
+        btn_layout.addWidget(self.tiled_check)
 
         layout.addLayout(btn_layout)
 
@@ -100,6 +121,14 @@ class CameraWindowDroidCam(QWidget):
         self.result_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.result_label)
 
+        # Fortschritt der Erkennung (Modell laden, klassifizieren, zeichnen)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 3)
+        self.progress.setTextVisible(False)
+        self.progress.setMaximumHeight(8)
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+
         self.setLayout(layout)
         #self.resize(480, 320)
         #self.setMinimumSize(320, 240)
@@ -112,21 +141,48 @@ class CameraWindowDroidCam(QWidget):
         # --- Internal state ---
         self.current_frame = None
         self.frozen = False
+        self.preview = None  # PreviewChannel for browsers, set by the main window
+
+        # --- Detection runs in the background; results are memoized per frame ---
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detect")
+        self.cache = FrameResultCache(maxsize=32)
+        self._job = 0          # bumped by every capture and resume; stale results are ignored
+        self._future = None
+        self.detection_progress.connect(self._on_detection_progress)
+        self.detection_done.connect(self._on_detection_done)
 
     @Slot(object)
     def update_frame(self, frame):
         """Show the live feed only if not frozen."""
-        if self.frozen:
-            return
-        self.current_frame = frame
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb.shape
-        qt_img = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-        self.label.setPixmap(QPixmap.fromImage(qt_img))
+        if self.preview is not None:
+            self.preview.publish(frame)
+        if not self.frozen:
+            self.current_frame = frame
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            h, w, ch = rgb.shape
+            qt_img = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
+            self.label.setPixmap(QPixmap.fromImage(qt_img))
+        self.frame_shown.emit()
+
+    @Slot(str)
+    def show_status(self, text):
+        """Connection state from the CameraWorker (connected, reconnecting)."""
+        if self.current_frame is None:
+            self.label.setText(text)
+        elif not self.frozen:
+            self.result_label.setText(text)
+
+    @Slot(str, float)
+    def show_live_result(self, pred_label, conf):
+        """Live classification from the shared multi-stream service."""
+        if not self.frozen:
+            self.result_label.setText(f"{pred_label} ({conf:.2f})")
+        if self.preview is not None:
+            self.preview.publish_result(pred_label, conf)
 
     @Slot()
     def capture_frame(self):
-        """Freeze stream and run YOLO once on current frame."""
+        """Freeze stream and classify the current frame in the background."""
         if self.current_frame is None:
             self.result_label.setText("❌ No frame to capture yet.")
             return
@@ -135,66 +191,173 @@ class CameraWindowDroidCam(QWidget):
         self.frozen = True
         self.capture_btn.setEnabled(False)
         self.resume_btn.setVisible(True)
+
+        frame = self.current_frame
+        self._job += 1
+        tiled = self.tiled_check.isChecked()
+        key = (self.cache.key(frame), tiled)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._show_detection(*cached, cached=True)
+            return
+
         self.result_label.setText("🔍 Detecting...")
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self._future = self.executor.submit(self._detect, self._job, key, frame, tiled)
 
-        # Run YOLO detection
-        results = self.model.predict(self.current_frame, verbose=False)
-        if not results:
-            self.result_label.setText("No detections.")
+    def _detect(self, job, key, frame, tiled=False):
+        """Executor thread: classify and annotate, reporting progress through signals."""
+        try:
+            if not getattr(self.classifier, "ready", True):
+                self.detection_progress.emit(job, 1, "⏳ Model is still loading...")
+                self.classifier.wait()
+            if job != self._job:
+                return  # cancelled by "Continue Stream" before the model ran
+
+            if tiled:
+                self.detection_progress.emit(job, 2, "🧩 Classifying tiles...")
+                tiles = self.tiler.analyze(frame)
+                self.detection_progress.emit(job, 3, "🖍 Drawing heat map...")
+                annotated_frame = self.tiler.render(frame, tiles)
+                summary = f"{self.tiler.summary(tiles)} | {len(tiles.boxes)} tiles, {tiles.tiles_per_s:.1f} tiles/s"
+                print(f"🧩 Tiled analysis: {summary}")
+                result = (tiles.prediction, cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB), summary)
+            else:
+                self.detection_progress.emit(job, 2, "🔍 Detecting...")
+                prediction = self.classifier.predict(frame)
+
+                # Draw top-5 classes like ultralytics' Results.plot()
+                self.detection_progress.emit(job, 3, "🖍 Drawing result...")
+                annotated_frame = draw_prediction(frame, prediction, self.classifier.names)
+                result = (prediction, cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB))
+            # Auch abgebrochene Läufe cachen: erneutes Aufnehmen desselben Bildes ist dann sofort fertig
+            self.cache.put(key, result)
+            self.detection_done.emit(job, result)
+        except Exception as e:
+            self.detection_done.emit(job, e)
+
+    @Slot(int, int, str)
+    def _on_detection_progress(self, job, step, text):
+        if job == self._job:
+            self.progress.setValue(step)
+            self.result_label.setText(text)
+
+    @Slot(int, object)
+    def _on_detection_done(self, job, result):
+        if job != self._job:
+            return  # stale: resumed or captured again meanwhile
+        self.progress.setVisible(False)
+        if isinstance(result, Exception):
+            self.result_label.setText(f"❌ Detection failed: {result}")
             return
+        self._show_detection(*result)
 
-        # Draw bounding boxes and labels
-        annotated_frame = results[0].plot()  # ultralytics utility draws all boxes
-        rgb_annotated = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
+    def _show_detection(self, prediction, rgb_annotated, summary=None, cached=False):
         h, w, ch = rgb_annotated.shape
         qt_img = QImage(rgb_annotated.data, w, h, ch * w, QImage.Format_RGB888)
         self.label.setPixmap(QPixmap.fromImage(qt_img))
 
+        if self.preview is not None:
+            self.preview.publish_result(prediction.label, prediction.conf)
+
         # Display prediction summary (best class + confidence)
-        try:
-            pred_label = results[0].names[results[0].probs.top1]
-            conf = results[0].probs.top1conf.item()
-            self.result_label.setText(f"✅ {pred_label} ({conf:.2f})")
-        except Exception:
-            self.result_label.setText("✅ Detection complete")
+        suffix = " (cached)" if cached else ""
+        if summary is not None:
+            self.result_label.setText(f"🧩 {summary}{suffix}")
+        else:
+            self.result_label.setText(f"✅ {prediction.label} ({prediction.conf:.2f}){suffix}")
 
     @Slot()
     def resume_stream(self):
-        """Unfreeze and continue showing live video feed."""
+        """Unfreeze and continue showing live video feed; cancels a running detection."""
+        self._job += 1
+        if self._future is not None:
+            self._future.cancel()  # noch nicht gestartet: gar nicht erst rechnen
+            self._future = None
+        self.progress.setVisible(False)
         self.frozen = False
         self.capture_btn.setEnabled(True)
         self.resume_btn.setVisible(False)
         self.result_label.setText("▶ Live stream resumed.")
 
+    def closeEvent(self, event):
+        # Laufende Erkennung verwerfen; der Executor bleibt für ein erneutes Öffnen bestehen
+        self._job += 1
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self.closed.emit()
+        event.accept()
+
 class CameraWorker(QObject):
+    """Hands the newest DroidCam frame to the window, one at a time.
+
+    A FrameGrabber drains the stream in the background. A frame is only
+    emitted once the window has shown the previous one (frame_shown), so
+    queued signals never pile up; frames that arrive in the meantime are
+    dropped, and frames older than max_age when their turn comes are skipped
+    as late. Latency from grab to display therefore stays bounded.
+    """
     frame_ready = Signal(object)  # emits cv2 frames
+    status = Signal(str)          # connection changes for the window
     finished = Signal()
 
-    def __init__(self, url):
+    def __init__(self, source, max_age=0.5):
         super().__init__()
-        self.url = url
+        # Accept a plain stream URL for backwards compatibility
+        self.source = source if isinstance(source, FrameSource) else VideoCaptureSource(source, size=(200, 200), timeout=5.0)
+        self.max_age = max_age
+        self.grabber = FrameGrabber(self.source, on_status=self.status.emit)
         self.running = True
+        self._shown = threading.Event()
+        self._in_flight = None  # grab timestamp of the frame the window is still drawing
+        self.emitted = 0
+        self.fps_meter = FpsMeter()
+        self.latency = deque(maxlen=1000)
 
     @Slot()
     def run(self):
-        cap = cv2.VideoCapture(self.url)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 200)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 200)
-        while not cap.isOpened():
-            print(f"Could not open camera: {self.url}")
-            # self.finished.emit()
-            # return
-
-        print(f"✅ Connected to {self.url}")
+        cpu_plan.pin("capture")  # vor start(): der Grabber-Thread erbt die Kerne
+        self.grabber.start()
+        self._shown.set()
         while self.running:
-            ret, frame = cap.read()
-            if not ret:
-                print("Failed to read frame")
-                break
+            # Erst weitermachen, wenn das Fenster das letzte Bild gezeigt hat
+            if not self._shown.wait(0.1):
+                continue
+            item = self.grabber.take(timeout=0.1, max_age=self.max_age)
+            if item is None:
+                continue
+            frame, grabbed_at = item
+            if self.source.channel_order == "RGB":
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)  # window expects OpenCV order
+            self._shown.clear()
+            self._in_flight = grabbed_at
+            self.emitted += 1
+            self.fps_meter.tick()
             self.frame_ready.emit(frame)
 
-        cap.release()
+        self.grabber.stop()
+        print(f"📉 {self.source.describe()}: {self.stats()}")
         self.finished.emit()
 
+    def frame_shown(self):
+        """Called (directly, from the GUI thread) once the window has drawn the emitted frame."""
+        grabbed_at = self._in_flight
+        if grabbed_at is not None:
+            self.latency.append(time.perf_counter() - grabbed_at)
+            self._in_flight = None
+        self._shown.set()
+
+    def stats(self):
+        return {
+            "grabbed": self.grabber.grabbed,
+            "emitted": self.emitted,
+            "dropped": self.grabber.dropped,
+            "late": self.grabber.late,
+            "reconnects": self.grabber.reconnects,
+            "latency": summarize(list(self.latency)),
+        }
+
     def stop(self):
         self.running = False
@@ -0,0 +1,121 @@
+import math
+import numpy as np
+
+# NEUE DATENSTRUKTUR: Faktoren für die Brennbarkeitsformel
+# V = Volatile Öle, S = Surface-to-Volume, D = Dichte
+FLAMMABILITY_FACTORS = {
+    "viburnum": {
+        "V": 0.1, "S": 0.5, "D": 0.6,
+        "description": "Sehr geringe Brennbarkeit. Hervorragend geeignet für den Brandschutz."
+    },
+    "quercus": {
+        "V": 0.2, "S": 0.3, "D": 0.9,
+        "description": "Geringe bis moderate Brennbarkeit. Sichere Wahl im grünen Zustand."
+    },
+    "arbutus": {
+        "V": 0.4, "S": 0.5, "D": 0.5,
+        "description": "Moderate Brennbarkeit. Gewachste Blätter und rissige Rinde."
+    },
+    "pyrancanthan": {
+        "V": 0.6, "S": 0.8, "D": 0.4,
+        "description": "Hohe Brennbarkeit. Dichtes, harziges Wachstum brennt schnell."
+    },
+    "pinus": {
+        "V": 0.9, "S": 0.7, "D": 0.3,
+        "description": "Sehr hohe Brennbarkeit. Harz und Nadeln entzünden sich leicht."
+    }
+}
+# Example usage
+# NEUE FUNKTION: Berechnet den Flammbarkeits-Grad (Index und Farbe)
+def calculate_flammability(plant_type, moisture=0.5, k=100):
+    """
+    Berechnet den Flammbarkeits-Index F basierend auf der Formel: F = k * (V * S) / (sqrt(M) * D)
+    Gibt Index (1-5) und zugehörige CSS-Farbe zurück.
+    """
+    data = FLAMMABILITY_FACTORS.get(plant_type.lower())
+    if not data:
+        return 0, "#7f8c8d" # Grau für unbekannt
+
+    V = data["V"]
+    S = data["S"]
+    D = data["D"]
+
+    # Sicherstellen, dass M und D > 0 sind
+    if D == 0 or moisture == 0:
+         F = 100
+    else:
+        F = k * (V * S) / (math.sqrt(moisture) * D)
+
+    F = min(F, 100) # Beschränken auf max. 100
+
+    # 1. Index bestimmen und 2. Farbe zuweisen
+    if F < 20: index, color = 1, "#2ecc71"  # Grün (Sehr gering)
+    elif F < 40: index, color = 2, "#3498db" # Blau (Gering)
+    elif F < 60: index, color = 3, "#f1c40f" # Gelb (Mittel)
+    elif F < 80: index, color = 4, "#e67e22" # Orange (Hoch)
+    else: index, color = 5, "#e74c3c" # Rot (Sehr hoch)
+
+    return index, color
+
+
+# Grenzen und Farben der Grade 1-5 (wie in calculate_flammability), Index 0 = unbekannt
+GRADE_BOUNDS = np.array([20.0, 40.0, 60.0, 80.0])
+GRADE_COLORS = ("#7f8c8d", "#2ecc71", "#3498db", "#f1c40f", "#e67e22", "#e74c3c")
+
+
+class FlammabilityScorer:
+    """Probability-weighted flammability over the model's full class index.
+
+    V*S/D is precomputed per class once, so scoring a frame is a dot product:
+    F = sum_c p_c * min(k * V_c * S_c / (sqrt(M) * D_c), 100), with the
+    probabilities renormalised over the classes that have factors. Accepts a
+    single probability vector (C,) or a batch (N, C), and moisture as a scalar
+    or an (N,) array.
+    """
+
+    def __init__(self, names, k=100):
+        self.k = k
+        count = max(names) + 1 if isinstance(names, dict) else len(names)
+        items = names.items() if isinstance(names, dict) else enumerate(names)
+        self.ratio = np.zeros(count)    # V*S/D, inf bei D == 0
+        self.known = np.zeros(count, dtype=bool)
+        for class_id, name in items:
+            data = FLAMMABILITY_FACTORS.get(str(name).lower())
+            if data:
+                self.known[class_id] = True
+                self.ratio[class_id] = data["V"] * data["S"] / data["D"] if data["D"] else np.inf
+        self._table = {}  # moisture -> per-class index
+
+    def _per_class(self, moisture):
+        """Index per class for each moisture row, (N, 1) -> (N, C)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_class = np.minimum(self.k * self.ratio / np.sqrt(moisture), 100.0)
+        return np.where(moisture == 0, 100.0, per_class)
+
+    def index(self, probs, moisture=0.5):
+        """Expected flammability index F (0-100); NaN where no known species has probability mass."""
+        probs = np.asarray(probs, dtype=np.float64)
+        single = probs.ndim == 1
+        probs = np.atleast_2d(probs)
+        if np.ndim(moisture) == 0:
+            # Live-Betrieb: feste Feuchte, Tabelle nur einmal berechnen
+            per_class = self._table.get(moisture)
+            if per_class is None:
+                per_class = self._table[moisture] = self._per_class(np.asarray(moisture, dtype=np.float64).reshape(1, 1))
+        else:
+            per_class = self._per_class(np.asarray(moisture, dtype=np.float64).reshape(-1, 1))
+        weights = probs * self.known
+        mass = weights.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            F = (weights * per_class).sum(axis=1) / mass
+        F = np.where(mass > 0, F, np.nan)
+        return F[0] if single else F
+
+    def grade(self, probs, moisture=0.5):
+        """Grade 1-5 (0 = unknown) and its colour; arrays for batch input."""
+        F = self.index(probs, moisture)
+        grades = np.where(np.isnan(F), 0, np.searchsorted(GRADE_BOUNDS, np.nan_to_num(F), side="right") + 1)
+        if np.ndim(grades) == 0:
+            grade = int(grades)
+            return grade, GRADE_COLORS[grade]
+        return grades, [GRADE_COLORS[g] for g in grades]
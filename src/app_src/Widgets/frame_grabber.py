@@ -0,0 +1,107 @@
+import threading
+import time
+from Widgets.cpu_plan import cpu_plan
+from Widgets.inference_worker import LatestFrameSlot
+
+
+class FrameGrabber:
+    """Reads a FrameSource in its own thread and keeps only the newest frame.
+
+    The source is drained as fast as it delivers, so OpenCV's internal buffer
+    never fills up with old frames; whatever the consumer does not pick up in
+    time is overwritten (counted as dropped). When the source cannot be opened
+    or stops delivering, the grabber reconnects with exponential backoff
+    instead of spinning. The backoff also applies after a lost connection and
+    only resets once a connection has delivered frames for stable_after
+    seconds, so a camera that accepts and drops at once is not hammered.
+
+    Sources with grab()/retrieve() (MjpegSource) are only decoded in take(),
+    so dropped and late frames never cost a JPEG decode.
+    """
+
+    def __init__(self, source, backoff=0.5, max_backoff=8.0, stable_after=5.0, on_status=None):
+        self.source = source
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.on_status = on_status  # called with human-readable connection changes
+        self.slot = LatestFrameSlot()
+        self._stop = threading.Event()
+        self._thread = None
+        self.connected = False
+        self.grabbed = 0
+        self.reconnects = 0
+        self.late = 0
+        self.lazy = hasattr(source, "grab") and hasattr(source, "retrieve")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"grab {self.source.describe()}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.slot.close()
+        if self._thread is not None:
+            # read() of a dead network stream only returns after the capture timeout
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def take(self, timeout=None, max_age=None):
+        """Newest (frame, grab timestamp), or None if nothing (fresh enough) arrived within timeout."""
+        item = self.slot.take(timeout)
+        if item is None:
+            return None
+        data, grabbed_at = item
+        if max_age is not None and time.perf_counter() - grabbed_at > max_age:
+            self.late += 1
+            return None
+        if self.lazy:
+            data = self.source.retrieve(data)
+            if data is None:
+                return None
+        return data, grabbed_at
+
+    @property
+    def dropped(self):
+        return self.slot.dropped
+
+    def _status(self, text):
+        print(text)
+        if self.on_status is not None:
+            self.on_status(text)
+
+    def _run(self):
+        cpu_plan.pin("capture")
+        delay = self.backoff
+        while not self._stop.is_set():
+            if not self.source.open():
+                self.source.close()
+                self._status(f"Could not open camera: {self.source.describe()}, retrying in {delay:.1f} s")
+                if self._stop.wait(delay):
+                    break
+                delay = min(delay * 2, self.max_backoff)
+                continue
+
+            self.connected = True
+            self._status(f"✅ Connected to {self.source.describe()}")
+            connected_at = time.perf_counter()
+            while not self._stop.is_set():
+                frame = self.source.grab() if self.lazy else self.source.read()
+                if frame is None:
+                    break
+                now = time.perf_counter()
+                self.grabbed += 1
+                self.slot.put((frame, now))
+                if delay > self.backoff and now - connected_at >= self.stable_after:
+                    delay = self.backoff  # Verbindung hält: Backoff zurücksetzen
+
+            self.connected = False
+            self.source.close()
+            if not self._stop.is_set():
+                self.reconnects += 1
+                self._status(f"⚠️ Lost {self.source.describe()}, reconnecting in {delay:.1f} s")
+                if self._stop.wait(delay):
+                    break
+                delay = min(delay * 2, self.max_backoff)
+        self.source.close()
+
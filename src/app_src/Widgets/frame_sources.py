@@ -0,0 +1,425 @@
+import base64
+import http.client
+import re
+import time
+import urllib.parse
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """Common interface for everything that delivers camera frames.
+
+    open() returns True when the source is ready, read() returns the next frame
+    (uint8, HxWx3, channel order given by `channel_order`) or None when no frame
+    is available, close() releases the device.
+    """
+    channel_order = "BGR"
+
+    def open(self):
+        return True
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def describe(self):
+        return type(self).__name__
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Picamera2Source(FrameSource):
+    """Raspberry Pi camera via picamera2. "BGR888" delivers arrays in [R, G, B] order."""
+    channel_order = "RGB"
+
+    def __init__(self, size=(240, 400)):
+        self.size = tuple(size)
+        self.picam2 = None
+
+    def open(self):
+        if self.picam2 is None:
+            from picamera2 import Picamera2  # only available on the Pi
+            self.picam2 = Picamera2()
+            config = self.picam2.create_preview_configuration(
+                main={"format": "BGR888", "size": self.size}
+            )
+            self.picam2.configure(config)
+            self.picam2.start()
+        return True
+
+    def read(self):
+        return self.picam2.capture_array()
+
+    def close(self):
+        if self.picam2 is not None:
+            self.picam2.stop()
+            self.picam2.close()
+            self.picam2 = None  # ensure it's released
+
+    def describe(self):
+        return f"Pi Camera {self.size[0]}x{self.size[1]}"
+
+
+class VideoCaptureSource(FrameSource):
+    """Anything cv2.VideoCapture can open (network stream, device index, file)."""
+
+    def __init__(self, target, api=cv2.CAP_ANY, size=None, timeout=None):
+        self.target = target
+        self.api = api
+        self.size = size
+        self.timeout = timeout  # seconds for connect/read of network streams, None = OpenCV default
+        self.cap = None
+
+    def open(self):
+        if self.cap is not None and self.cap.isOpened():
+            return True
+        params = []
+        if self.timeout is not None:
+            ms = int(self.timeout * 1000)
+            params = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, ms]
+        self.cap = cv2.VideoCapture(self.target, self.api, params)
+        # So wenig wie möglich puffern (nicht jedes Backend beachtet das; FrameGrabber liest ohnehin leer)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if self.size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.size[1])
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self):
+        return str(self.target)
+
+
+class MjpegSource(FrameSource):
+    """MJPEG over HTTP (multipart/x-mixed-replace) without cv2.VideoCapture.
+
+    Keeps one persistent connection, splits the multipart stream itself and
+    decodes the JPEGs with IMREAD_REDUCED_COLOR_* so a 640x480 phone stream
+    is never expanded to full resolution when the app only needs ~200 px.
+    grab() returns the encoded JPEG and retrieve() decodes it, so a consumer
+    that drops frames (FrameGrabber) only pays for decoding the ones it shows.
+
+    scale is 1, 2, 4 or 8; with scale=None and a size, the largest factor that
+    still yields at least `size` is chosen from the first frame.
+    """
+    REDUCED_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                     4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+    def __init__(self, url, size=None, scale=None, timeout=5.0):
+        self.url = url
+        self.size = size
+        self.scale = scale
+        self.timeout = timeout
+        self._conn = None
+        self._resp = None
+        self._boundary = None
+        self._at_part = False  # boundary line already consumed by the previous part
+        self.bytes_received = 0
+
+    def open(self):
+        if self._resp is not None:
+            return True
+        parts = urllib.parse.urlsplit(self.url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        try:
+            conn = conn_cls(parts.hostname, parts.port, timeout=self.timeout)
+            headers = {}
+            if parts.username is not None:
+                # http://user:pw@host/... -> Basic-Auth, http.client wertet die Zugangsdaten in der URL nicht aus
+                credentials = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+                headers["Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode("ascii")
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            return False
+        content_type = resp.getheader("Content-Type", "")
+        boundary = re.search(r'boundary="?([^";]+)"?', content_type)
+        if resp.status != 200 or not content_type.startswith("multipart/") or not boundary:
+            conn.close()
+            return False
+        marker = boundary.group(1).encode("latin-1")
+        # Manche Server (u.a. DroidCam) schreiben die führenden "--" schon in den Header
+        self._boundary = marker if marker.startswith(b"--") else b"--" + marker
+        self._conn, self._resp = conn, resp
+        self._at_part = False
+        return True
+
+    def grab(self):
+        """Next JPEG as bytes, or None when the stream ended or timed out."""
+        try:
+            return self._next_part()
+        except (OSError, http.client.HTTPException, ValueError):
+            return None
+
+    def retrieve(self, data):
+        """Decode a grabbed JPEG at the configured reduced scale."""
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if self.scale is None:
+            frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+            if frame is None:
+                return None
+            self.scale = self._pick_scale(frame.shape[1], frame.shape[0])
+            if self.scale == 1:
+                return frame
+        return cv2.imdecode(buf, self.REDUCED_FLAGS[self.scale])
+
+    def read(self):
+        data = self.grab()
+        return self.retrieve(data) if data is not None else None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = self._resp = None
+
+    def describe(self):
+        return self.url
+
+    def _pick_scale(self, width, height):
+        if not self.size:
+            return 1
+        for factor in (8, 4, 2):
+            if width // factor >= self.size[0] and height // factor >= self.size[1]:
+                return factor
+        return 1
+
+    def _next_part(self):
+        resp = self._resp
+        if resp is None:
+            return None
+        if not self._at_part:
+            while True:
+                line = resp.readline()
+                if not line:
+                    return None
+                if line.strip().startswith(self._boundary):
+                    break
+        self._at_part = False
+
+        length = None
+        while True:
+            line = resp.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+
+        if length is not None:
+            data = resp.read(length)
+            if len(data) < length:
+                return None
+        else:
+            # Ohne Content-Length bis zur nächsten Boundary lesen
+            chunks = []
+            while True:
+                line = resp.readline()
+                if not line:
+                    return None
+                if line.strip().startswith(self._boundary):
+                    self._at_part = True
+                    break
+                chunks.append(line)
+            data = b"".join(chunks).rstrip(b"\r\n")
+        self.bytes_received += len(data)
+        return data
+
+
+class DroidCamSource(MjpegSource):
+    """DroidCam app on a phone, served as MJPEG over HTTP.
+
+    DroidCam accepts a single client, so the connection opened to check that
+    the phone is reachable is kept and reused for streaming.
+    """
+
+    def __init__(self, ip, port=4747, size=(200, 200), scale=None, timeout=5.0):
+        self.ip = ip
+        self.port = port
+        super().__init__(f"http://{ip}:{port}/video", size=size, scale=scale, timeout=timeout)
+
+
+class V4L2Source(VideoCaptureSource):
+    """Local V4L2 device such as a USB webcam (/dev/videoN)."""
+
+    def __init__(self, device=0, size=None):
+        super().__init__(device, api=cv2.CAP_V4L2, size=size)
+
+    def describe(self):
+        return f"/dev/video{self.target}" if isinstance(self.target, int) else str(self.target)
+
+
+class VideoFileSource(VideoCaptureSource):
+    """Replays a recorded clip.
+
+    rate=None plays at the clip's native frame rate, rate="max" as fast as it
+    decodes, a number at that fixed rate. With loop=True the clip restarts at the end.
+    """
+
+    def __init__(self, path, rate=None, loop=True):
+        super().__init__(path)
+        self.rate = rate
+        self.loop = loop
+        self._interval = 0.0
+        self._next_due = None
+
+    def open(self):
+        if not super().open():
+            return False
+        if self.rate == "max":
+            self._interval = 0.0
+        else:
+            fps = float(self.rate) if self.rate else self.cap.get(cv2.CAP_PROP_FPS)
+            self._interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self._next_due = None
+        return True
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self._pace()
+        return frame
+
+    def _pace(self):
+        if not self._interval:
+            return
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        delay = self._next_due - now
+        if delay > 0:
+            time.sleep(delay)
+        # Bei Rückstand nicht aufholen, sondern ab jetzt weiter takten
+        self._next_due = max(self._next_due, now) + self._interval
+
+
+class SyntheticSource(FrameSource):
+    """Generated test pattern (moving gradient and block) for runs without any camera."""
+
+    def __init__(self, size=(640, 480), rate=30.0, seed=0):
+        self.size = tuple(size)
+        self.rate = rate
+        self.seed = seed
+        self._index = 0
+        self._next_due = None
+
+    def open(self):
+        w, h = self.size
+        rng = np.random.default_rng(self.seed)
+        x = np.linspace(0, 255, w, dtype=np.float32)
+        y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+        base = np.empty((h, w, 3), dtype=np.uint8)
+        base[..., 0] = (x * 0.3 + y * 0.2).astype(np.uint8)
+        base[..., 1] = (y * 0.6 + 60).clip(0, 255).astype(np.uint8)
+        base[..., 2] = (x * 0.5).astype(np.uint8)
+        self._base = base
+        self._noise = rng.integers(0, 16, size=(h, w, 3), dtype=np.uint8)
+        self._index = 0
+        self._next_due = None
+        return True
+
+    def read(self):
+        w, h = self.size
+        i = self._index
+        self._index += 1
+        frame = np.roll(self._base, i * 4, axis=1)
+        cv2.add(frame, np.roll(self._noise, i, axis=0), dst=frame)
+        bw, bh = max(w // 6, 1), max(h // 6, 1)
+        x0 = (i * 7) % max(w - bw, 1)
+        y0 = (i * 3) % max(h - bh, 1)
+        frame[y0:y0 + bh, x0:x0 + bw] = (30, 140, 40)
+        if self.rate:
+            now = time.perf_counter()
+            if self._next_due is None:
+                self._next_due = now
+            if self._next_due > now:
+                time.sleep(self._next_due - now)
+            self._next_due = max(self._next_due, now) + 1.0 / self.rate
+        return frame
+
+    def describe(self):
+        return f"synthetic {self.size[0]}x{self.size[1]}"
+
+
+def _parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def _split_option(arg, pattern):
+    """'path@30' -> ('path', '30') if the text after the last @ matches pattern, else (arg, '').
+
+    URLs with credentials (http://user:pw@host/...) and paths containing @ stay whole.
+    """
+    head, at, tail = arg.rpartition("@")
+    if at and re.fullmatch(pattern, tail):
+        return head, tail
+    return arg, ""
+
+
+def _parse_rate(text):
+    if text is None or text == "":
+        return None
+    return "max" if text == "max" else float(text)
+
+
+def create_frame_source(spec):
+    """Build a frame source from a launch spec.
+
+    picam[:WxH]               Raspberry Pi camera
+    droidcam:IP[:PORT]        DroidCam phone over Wi-Fi
+    mjpeg:URL[@SCALE]         MJPEG over HTTP with the built-in client, decoded at 1/SCALE
+    http://... / rtsp://...   any network stream (cv2.VideoCapture)
+    v4l2[:N]                  /dev/videoN
+    file:PATH[@FPS|@max]      recorded clip, native rate unless overridden
+    synthetic[:WxH][@FPS|@max] generated pattern
+    """
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind in ("http", "https", "rtsp"):
+        return VideoCaptureSource(spec)
+    if kind == "mjpeg":
+        url, scale = _split_option(arg, r"\d+")
+        return MjpegSource(url, scale=int(scale)) if scale else MjpegSource(url)
+    if kind == "picam":
+        return Picamera2Source(_parse_size(arg)) if arg else Picamera2Source()
+    if kind == "droidcam":
+        ip, _, port = arg.partition(":")
+        return DroidCamSource(ip, int(port)) if port else DroidCamSource(ip)
+    if kind == "v4l2":
+        return V4L2Source(int(arg) if arg.isdigit() else (arg or 0))
+    if kind == "file":
+        path, rate = _split_option(arg, r"\d+(\.\d+)?|max")
+        return VideoFileSource(path, rate=_parse_rate(rate))
+    if kind == "synthetic":
+        size, _, rate = arg.partition("@")
+        source = SyntheticSource(_parse_size(size)) if size else SyntheticSource()
+        if rate:
+            source.rate = None if rate == "max" else float(rate)
+        return source
+    raise ValueError(f"Unknown frame source: {spec}")
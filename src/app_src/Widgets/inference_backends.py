@@ -0,0 +1,220 @@
+import ast
+import json
+import os
+import threading
+from typing import NamedTuple
+import cv2
+import numpy as np
+from Widgets.model_files import DEFAULT_MODEL, DEFAULT_MODEL_PATHS, BACKENDS
+
+
+class Prediction(NamedTuple):
+    """Top-1 result plus the full probability vector over the model's classes."""
+    label: str
+    conf: float
+    class_id: int
+    probs: np.ndarray
+
+
+def _prediction(names, probs):
+    class_id = int(np.argmax(probs))
+    return Prediction(names[class_id], float(probs[class_id]), class_id, probs)
+
+
+class UltralyticsClassifier:
+    """treeDetection.pt through ultralytics/PyTorch (the original path)."""
+    backend = "torch"
+
+    def __init__(self, model_path=DEFAULT_MODEL, threads=None):
+        from ultralytics import YOLO
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model_path = model_path
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+        self.imgsz = None  # None = the size the model was trained with
+        # ultralytics predictors are not thread-safe; windows and services may share one instance
+        self._lock = threading.Lock()
+
+    def set_input_size(self, size):
+        """Square model input size for the next predictions; returns False if the model cannot change it."""
+        self.imgsz = size
+        return True
+
+    def predict(self, frame):
+        return self.predict_batch([frame])[0]
+
+    def predict_batch(self, frames):
+        with self._lock:
+            if self.imgsz:
+                results = self.model.predict(list(frames), imgsz=self.imgsz, verbose=False)
+            else:
+                results = self.model.predict(list(frames), verbose=False)
+        out = []
+        for r in results:
+            probs = r.probs.data
+            probs = probs.cpu().numpy() if hasattr(probs, "cpu") else np.asarray(probs)
+            out.append(Prediction(r.names[r.probs.top1], r.probs.top1conf.item(), int(r.probs.top1), probs))
+        return out
+
+
+class _ExportedClassifier:
+    """Shared preprocessing for exported models, matching ultralytics' classify transforms:
+    BGR->RGB, resize the short side to imgsz, centre crop, scale to [0, 1], NCHW float32."""
+
+    resizable = False  # True if the model accepts other input sizes than imgsz
+
+    def __init__(self, model_path, names, imgsz):
+        self.model_path = model_path
+        self.names = names
+        self.imgsz = imgsz
+
+    def set_input_size(self, size):
+        """Square model input size for the next predictions; returns False if the model cannot change it."""
+        if not self.resizable:
+            return False
+        self.imgsz = size
+        return True
+
+    def preprocess(self, frame, out=None, imgsz=None):
+        imgsz = imgsz or self.imgsz
+        h, w = frame.shape[:2]
+        scale = imgsz / min(h, w)
+        nw, nh = max(imgsz, round(w * scale)), max(imgsz, round(h * scale))
+        resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        top, left = (nh - imgsz) // 2, (nw - imgsz) // 2
+        crop = resized[top:top + imgsz, left:left + imgsz, ::-1]
+        if out is None:
+            out = np.empty((3, imgsz, imgsz), dtype=np.float32)
+        np.multiply(crop.transpose(2, 0, 1), 1.0 / 255.0, out=out, casting="unsafe")
+        return out
+
+    def predict(self, frame):
+        return self.predict_batch([frame])[0]
+
+    def predict_batch(self, frames):
+        imgsz = self.imgsz  # einmal lesen: set_input_size() kann aus einem anderen Thread kommen
+        batch = np.empty((len(frames), 3, imgsz, imgsz), dtype=np.float32)
+        for i, frame in enumerate(frames):
+            self.preprocess(frame, out=batch[i], imgsz=imgsz)
+        probs = self._run(batch)
+        return [_prediction(self.names, p) for p in probs]
+
+    def _run(self, batch):
+        raise NotImplementedError
+
+
+def _parse_names(value):
+    names = ast.literal_eval(value) if isinstance(value, str) else value
+    return {int(k): v for k, v in names.items()}
+
+
+class OnnxClassifier(_ExportedClassifier):
+    """Exported ONNX model through ONNX Runtime (CPU)."""
+    backend = "onnx"
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATHS["onnx"], threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Feste Batch-Größe 1, wenn nicht mit dynamic=True exportiert (dann auch feste Bildgröße)
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.resizable = not isinstance(model_input.shape[2], int)
+        imgsz = ast.literal_eval(meta["imgsz"])[0] if "imgsz" in meta else model_input.shape[2]
+        super().__init__(model_path, _parse_names(meta["names"]), int(imgsz))
+
+    def _run(self, batch):
+        if self.dynamic_batch or len(batch) == 1:
+            return self.session.run(None, {self.input_name: batch})[0]
+        return np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                               for i in range(len(batch))])
+
+
+class TorchScriptClassifier(_ExportedClassifier):
+    """treeDetection.torchscript (export_model.py torchscript) through torch.jit.
+
+    Loads without importing ultralytics or rebuilding the model from its YAML,
+    which is most of the start-up time of the torch backend on a Pi.
+    """
+    backend = "torchscript"
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATHS["torchscript"], threads=None):
+        import torch
+        if threads:
+            torch.set_num_threads(threads)
+        extra = {"config.txt": ""}  # Metadaten, die ultralytics beim Export mitschreibt (names, imgsz)
+        self.model = torch.jit.load(model_path, map_location="cpu", _extra_files=extra).eval()
+        meta = json.loads(extra["config.txt"]) if extra["config.txt"] else {}
+        imgsz = meta.get("imgsz", [224])[0]
+        super().__init__(model_path, _parse_names(meta["names"]), int(imgsz))
+
+    def _run(self, batch):
+        import torch
+        with torch.inference_mode():
+            out = self.model(torch.from_numpy(batch))
+        return (out[0] if isinstance(out, (tuple, list)) else out).numpy()
+
+
+class OpenVinoClassifier(_ExportedClassifier):
+    """Exported OpenVINO IR directory (treeDetection_openvino_model/) on the CPU plugin."""
+    backend = "openvino"
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATHS["openvino"], threads=None):
+        import openvino as ov
+        import yaml
+        core = ov.Core()
+        xml = next(os.path.join(model_path, f) for f in os.listdir(model_path) if f.endswith(".xml"))
+        config = {"INFERENCE_NUM_THREADS": threads} if threads else {}
+        self.compiled = core.compile_model(core.read_model(xml), "CPU", config)
+        with open(os.path.join(model_path, "metadata.yaml"), encoding="utf-8") as f:
+            meta = yaml.safe_load(f)
+        imgsz = meta.get("imgsz", [224])[0]
+        super().__init__(model_path, _parse_names(meta["names"]), int(imgsz))
+
+    def _run(self, batch):
+        return np.concatenate([self.compiled(batch[i:i + 1])[0] for i in range(len(batch))])
+
+
+_BACKEND_CLASSES = {
+    "torch": UltralyticsClassifier,
+    "torchscript": TorchScriptClassifier,
+    "onnx": OnnxClassifier,
+    "onnx-int8": OnnxClassifier,
+    "openvino": OpenVinoClassifier,
+}
+
+
+def load_classifier(backend="torch", model_path=None, **kwargs):
+    """Create a classifier for the given backend; model_path defaults to the backend's standard file."""
+    if backend not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown inference backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return _BACKEND_CLASSES[backend](model_path or DEFAULT_MODEL_PATHS[backend], **kwargs)
+
+
+def export_model(fmt, model_path=DEFAULT_MODEL, imgsz=None):
+    """Export treeDetection.pt with ultralytics; returns the path of the exported artifact."""
+    from ultralytics import YOLO
+    model = YOLO(model_path)
+    kwargs = {"format": fmt}
+    if imgsz:
+        kwargs["imgsz"] = imgsz
+    if fmt == "onnx":
+        kwargs["dynamic"] = True  # variable Batch-Größe für Mehrkamera- und Offline-Betrieb
+    return model.export(**kwargs)
+
+
+def draw_prediction(frame, prediction, names, top_k=5):
+    """Write the top-k classes onto a copy of the frame, like ultralytics' Results.plot() for classifiers."""
+    annotated = frame.copy()
+    order = np.argsort(prediction.probs)[::-1][:top_k]
+    for row, class_id in enumerate(order):
+        text = f"{names[int(class_id)]} {prediction.probs[class_id]:.2f}"
+        cv2.putText(annotated, text, (10, 30 + row * 28), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return annotated
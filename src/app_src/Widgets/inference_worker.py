@@ -0,0 +1,142 @@
+from PySide6.QtCore import QObject, Signal, Slot
+import threading
+import time
+from collections import deque
+from Widgets.cpu_plan import cpu_plan
+from Widgets.metrics import INFERENCE_SECONDS
+
+
+class LatestFrameSlot:
+    """One-slot mailbox between producer and consumer: a newer frame replaces an unconsumed one."""
+
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._closed = False
+        self.dropped = 0
+        self.on_drop = on_drop  # called with frames that were replaced before anyone took them
+
+    def put(self, frame):
+        """Store frame, discarding the pending one. Returns True if a frame was dropped."""
+        with self._cond:
+            replaced = self._frame
+            if replaced is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._cond.notify()
+        if replaced is not None and self.on_drop is not None:
+            self.on_drop(replaced)
+        return replaced is not None
+
+    @property
+    def depth(self):
+        """Frames waiting (0 or 1)."""
+        return int(self._frame is not None)
+
+    def take(self, timeout=None):
+        """Wait for a frame and remove it from the slot. Returns None on timeout or close."""
+        with self._cond:
+            if self._frame is None and not self._closed:
+                self._cond.wait(timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FpsMeter:
+    """Measures events per second over a sliding time window."""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._stamps = deque()
+
+    def tick(self):
+        now = time.perf_counter()
+        self._stamps.append(now)
+        while self._stamps and now - self._stamps[0] > self.window:
+            self._stamps.popleft()
+
+    @property
+    def fps(self):
+        if len(self._stamps) < 2:
+            return 0.0
+        span = self._stamps[-1] - self._stamps[0]
+        return (len(self._stamps) - 1) / span if span > 0 else 0.0
+
+
+class InferenceWorker(QObject):
+    """Runs the classifier on the newest submitted frame, off the GUI thread."""
+    result_ready = Signal(str, float, object, float)  # top-1 class name, confidence, probabilities, seconds in the classifier
+    finished = Signal()
+
+    def __init__(self, classifier, gate=None, release=None):
+        super().__init__()
+        self.classifier = classifier
+        self.gate = gate  # optional SceneChangeGate
+        # release(frame) hands pooled buffers back once the worker no longer needs them
+        self.release = release if release is not None else (lambda frame: None)
+        self.slot = LatestFrameSlot(on_drop=self.release)
+        self.fps_meter = FpsMeter()
+        self.min_interval = 0.0  # seconds between classifier calls, set by an AdaptiveController
+        self.controller = None   # optional AdaptiveController, gets every classifier latency
+        self.thermal_interval = 0.0  # lower bound from a ThermalScheduler, on top of min_interval
+        self.scheduler = None    # optional ThermalScheduler, gets every classifier latency
+        self.error_backoff = 0.0  # seconds to pause after a failed prediction, doubles while it keeps failing
+        self.errors = 0
+        self.running = True
+
+    def submit(self, frame):
+        """Called from the GUI thread; never blocks."""
+        self.slot.put(frame)
+
+    def classify(self, frame):
+        """Synchronous prediction; also used directly by the headless benchmark."""
+        return self.classifier.predict(frame)
+
+    @Slot()
+    def run(self):
+        cpu_plan.pin("inference")
+        last_start = 0.0
+        while self.running:
+            # Ratenbegrenzung: bis dahin eintreffende Bilder ersetzen sich im Slot gegenseitig
+            wait = last_start + max(self.min_interval, self.thermal_interval, self.error_backoff) - time.perf_counter()
+            if wait > 0:
+                time.sleep(min(wait, 0.1))
+                continue
+            frame = self.slot.take(timeout=0.1)
+            if frame is None:
+                continue
+            if self.gate is not None and self.gate.lookup(frame) is not None:
+                self.release(frame)
+                continue  # Szene unverändert: letztes Ergebnis bleibt gültig
+            start = last_start = time.perf_counter()
+            try:
+                prediction = self.classify(frame)
+            except Exception as e:
+                # Ein Fehler (Backend, Modell nicht geladen) darf die Klassifikation nicht dauerhaft beenden
+                self.errors += 1
+                self.error_backoff = min(max(self.error_backoff * 2, 0.5), 30.0)
+                print(f"⚠️ Inference failed ({e!r}), retrying in {self.error_backoff:.1f} s")
+                continue
+            finally:
+                self.release(frame)
+            self.error_backoff = 0.0
+            elapsed = time.perf_counter() - start
+            INFERENCE_SECONDS.observe(elapsed, pipeline="camera")
+            if self.controller is not None:
+                self.controller.observe(elapsed)
+            if self.scheduler is not None:
+                self.scheduler.observe(elapsed)
+            if self.gate is not None:
+                self.gate.store(prediction, elapsed)
+            self.fps_meter.tick()
+            self.result_ready.emit(prediction.label, prediction.conf, prediction.probs, elapsed)
+        self.finished.emit()
+
+    def stop(self):
+        self.running = False
+        self.slot.close()
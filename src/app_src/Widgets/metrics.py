@@ -0,0 +1,164 @@
+import bisect
+import os
+import threading
+import time
+
+# Sekunden; deckt Pi-Inferenz (~50-500 ms) und schnelle Backends ab
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.kind = "counter"
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect plus two additions under a lock."""
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.kind = "histogram"
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [counts per bucket + inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def quantile(self, q, **labels):
+        """Approximate quantile from the buckets (upper bound of the bucket it falls in); None without data."""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            counts = list(series[0]) if series else []
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+    def samples(self):
+        out = []
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for key, (counts, total) in series.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append((self.name + "_bucket", {**labels, "le": le}, cumulative))
+            out.append((self.name + "_sum", labels, total))
+            out.append((self.name + "_count", labels, cumulative))
+        return out
+
+
+class MetricsRegistry:
+    """In-process metrics, rendered in the Prometheus text format (version 0.0.4).
+
+    Hot paths only touch Counters and Histograms. Everything that already
+    exists as state somewhere (FPS meters, drop counters, model load times) is
+    read at scrape time by collector callbacks, so it costs nothing per frame.
+    A collector returns (name, kind, help, labels, value) tuples.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS, labelnames=()):
+        return self._add(Histogram(name, help, buckets, labelnames))
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def collect(self):
+        """All samples grouped per metric: {name: (kind, help, [(sample name, labels, value)])}."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families = {m.name: (m.kind, m.help, m.samples()) for m in metrics}
+        for collector in [process_metrics] + collectors:
+            try:
+                for name, kind, help, labels, value in collector():
+                    families.setdefault(name, (kind, help, []))[2].append((name, labels, value))
+            except Exception as e:  # eine kaputte Quelle darf den Scrape nicht verhindern
+                print(f"Metrics collector failed: {e}")
+        return families
+
+    def render(self):
+        lines = []
+        for name, (kind, help, samples) in self.collect().items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample, labels, value in samples:
+                lines.append(f"{sample}{_label_text(labels)} {float(value):.6g}")
+        return "\n".join(lines) + "\n"
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Spitzenwert, kein aktueller
+
+
+def process_metrics():
+    cpu = os.times()
+    yield "process_resident_memory_bytes", "gauge", "Resident memory size in bytes.", {}, rss_bytes()
+    yield "process_cpu_seconds_total", "counter", "User and system CPU time in seconds.", {}, cpu.user + cpu.system
+    yield "process_start_time_seconds", "gauge", "Start time of the process since the epoch.", {}, metrics.started_at
+
+
+metrics = MetricsRegistry()
+
+# Von den Pipelines pro Bild bzw. Batch beobachtet
+INFERENCE_SECONDS = metrics.histogram(
+    "treedetection_inference_seconds", "Time spent in the classifier per call.", labelnames=("pipeline",))
@@ -0,0 +1,15 @@
+import os
+
+# Nur Pfade, keine schweren Importe: settings.py braucht das vor dem ersten Fenster
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(MODEL_DIR, "treeDetection.pt")
+
+# Standard-Dateien je Backend (werden von export_model.py bzw. quantize_model.py erzeugt)
+DEFAULT_MODEL_PATHS = {
+    "torch": DEFAULT_MODEL,
+    "torchscript": os.path.join(MODEL_DIR, "treeDetection.torchscript"),  # export_model.py torchscript
+    "onnx": os.path.join(MODEL_DIR, "treeDetection.onnx"),
+    "onnx-int8": os.path.join(MODEL_DIR, "treeDetection.int8.onnx"),  # quantize_model.py
+    "openvino": os.path.join(MODEL_DIR, "treeDetection_openvino_model"),
+}
+BACKENDS = tuple(DEFAULT_MODEL_PATHS)
@@ -0,0 +1,127 @@
+import threading
+import time
+import numpy as np
+from Widgets.inference_backends import DEFAULT_MODEL_PATHS, load_classifier
+from Widgets.cpu_plan import cpu_plan
+from Widgets.startup import profile
+
+
+class ModelEntry:
+    """A classifier that loads (and warms up) in the background.
+
+    It satisfies the same predict()/predict_batch()/names contract as the
+    backends; calls made before loading has finished block until the model is
+    ready, so callers should use it from worker threads or check `ready` first.
+    """
+
+    def __init__(self, registry, backend, model_path, warmup_runs=2):
+        self.registry = registry
+        self.backend = backend
+        self.model_path = model_path
+        self.warmup_runs = warmup_runs
+        self._ready = threading.Event()
+        self._classifier = None
+        self.error = None
+        self.load_s = None
+        self.warmup_s = None
+        self.first_prediction_at = None
+
+    def _load(self):
+        try:
+            # Auch das Aufwärmen legt schon den Thread-Pool der Laufzeit an, der die Kerne erbt
+            cpu_plan.pin("inference")
+            start = time.perf_counter()
+            classifier = load_classifier(self.backend, self.model_path, **cpu_plan.loader_kwargs())
+            self.load_s = time.perf_counter() - start
+
+            # Warm-up: erste Inferenz zahlt JIT-, Allokations- und Cache-Kosten
+            start = time.perf_counter()
+            dummy = np.full((224, 224, 3), 114, dtype=np.uint8)
+            for _ in range(self.warmup_runs):
+                classifier.predict(dummy)
+            self.warmup_s = time.perf_counter() - start
+            self._classifier = classifier
+        except Exception as e:
+            self.error = e
+            print(f"❌ Could not load model {self.model_path}: {e}")
+        finally:
+            self._ready.set()
+
+    @property
+    def ready(self):
+        return self._ready.is_set() and self.error is None
+
+    def wait(self, timeout=None):
+        """The loaded classifier; blocks while loading, re-raises a load error."""
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Model {self.model_path} still loading")
+        if self.error is not None:
+            raise self.error
+        return self._classifier
+
+    @property
+    def names(self):
+        return self.wait().names
+
+    def predict(self, frame):
+        prediction = self.wait().predict(frame)
+        if self.first_prediction_at is None:
+            self.first_prediction_at = time.perf_counter()
+        return prediction
+
+    def predict_batch(self, frames):
+        predictions = self.wait().predict_batch(frames)
+        if self.first_prediction_at is None:
+            self.first_prediction_at = time.perf_counter()
+        return predictions
+
+    @property
+    def time_to_first_prediction(self):
+        """Seconds from registry creation (app start) to the first real prediction."""
+        if self.first_prediction_at is None:
+            return None
+        return self.first_prediction_at - self.registry.started_at
+
+    def __getattr__(self, name):
+        # Alles Weitere (preprocess, imgsz, ...) an den geladenen Klassifikator durchreichen
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.wait(), name)
+
+
+class ModelRegistry:
+    """Process-wide cache: every (backend, model file) is loaded exactly once."""
+
+    def __init__(self):
+        self.started_at = profile.t0  # App-Start, nicht der (verzögerte) Import dieses Moduls
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, backend="torch", model_path=None, background=True):
+        """Entry for the model, starting the load on first request (in a daemon thread unless background=False)."""
+        model_path = model_path or DEFAULT_MODEL_PATHS[backend]
+        key = (backend, model_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            entry = self._entries[key] = ModelEntry(self, backend, model_path)
+        if background:
+            threading.Thread(target=entry._load, name=f"load {backend}", daemon=True).start()
+        else:
+            entry._load()
+        return entry
+
+    def stats(self):
+        return {
+            f"{backend}:{path}": {
+                "ready": entry.ready,
+                "load_s": entry.load_s,
+                "warmup_s": entry.warmup_s,
+                "time_to_first_prediction_s": entry.time_to_first_prediction,
+            }
+            for (backend, path), entry in self._entries.items()
+        }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+import cv2
+from Widgets.cpu_plan import cpu_plan
+
+
+class PreviewChannel:
+    """Annotated live video and the current prediction of one camera, for any number of browsers.
+
+    publish() is called from the capture/GUI thread and only keeps a
+    reference to the newest frame (and only while someone is watching, at
+    most max_fps). An encoder thread draws the prediction on it and encodes
+    it to JPEG once; all MJPEG clients share those bytes. A client always
+    gets the newest frame when it is ready for one, so a slow browser skips
+    frames instead of queueing them and never slows the pipeline down.
+    """
+
+    def __init__(self, name, max_fps=10.0, quality=75, width=480):
+        self.name = name
+        self.min_interval = 1.0 / max_fps
+        self.quality = quality
+        self.width = width  # Vorschau wird auf diese Breite verkleinert, 0 = Originalgröße
+        self._cond = threading.Condition()
+        self._raw = None
+        self._last_publish = 0.0
+        self.jpeg = None
+        self.frame_seq = 0
+        self.result = None
+        self.result_seq = 0
+        self.clients = 0
+        self.encoded = 0
+        self.closed = False
+        self._thread = threading.Thread(target=self._encode_loop, name=f"preview {name}", daemon=True)
+        self._thread.start()
+
+    def publish(self, frame, channel_order="BGR"):
+        """Offer a frame; cheap no-op when nobody watches or the last one was too recent."""
+        if not self.clients:
+            return
+        now = time.perf_counter()
+        if now - self._last_publish < self.min_interval:
+            return
+        self._last_publish = now
+        # Verkleinern kopiert das Bild zugleich, Pool-Puffer der Pi-Kamera dürfen danach wiederverwendet werden
+        h, w = frame.shape[:2]
+        if self.width and w > self.width:
+            frame = cv2.resize(frame, (self.width, round(h * self.width / w)), interpolation=cv2.INTER_AREA)
+        else:
+            frame = frame.copy()
+        with self._cond:
+            self._raw = (frame, channel_order)
+            self._cond.notify_all()
+
+    def publish_result(self, label, conf, grade=None):
+        with self._cond:
+            self.result = {"label": label, "conf": round(float(conf), 4), "grade": grade, "time": time.time()}
+            self.result_seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def _encode_loop(self):
+        cpu_plan.pin("web")
+        while True:
+            with self._cond:
+                while self._raw is None and not self.closed:
+                    self._cond.wait()
+                if self.closed:
+                    return
+                (frame, channel_order), self._raw = self._raw, None
+                result = self.result
+            if channel_order == "RGB":
+                cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=frame)
+            if result and result["label"]:
+                cv2.putText(frame, f"{result['label']} ({result['conf']:.2f})", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                continue
+            with self._cond:
+                self.jpeg = jpeg.tobytes()
+                self.frame_seq += 1
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def _wait(self, attr, seen, timeout=1.0):
+        """Newest value of attr once its sequence number passed `seen`; (None, seen) on timeout or close."""
+        seq_attr = "frame_seq" if attr == "jpeg" else "result_seq"
+        with self._cond:
+            self._cond.wait_for(lambda: self.closed or getattr(self, seq_attr) > seen, timeout)
+            if self.closed or getattr(self, seq_attr) <= seen:
+                return None, seen
+            return getattr(self, attr), getattr(self, seq_attr)
+
+    def mjpeg(self):
+        """Generator for a multipart/x-mixed-replace response."""
+        with self._cond:
+            self.clients += 1
+        try:
+            seen = 0
+            while not self.closed:
+                jpeg, seen = self._wait("jpeg", seen)
+                if jpeg is None:
+                    continue
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % len(jpeg)) + jpeg + b"\r\n"
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def events(self):
+        """Generator for a text/event-stream response with the current prediction."""
+        seen = 0
+        while not self.closed:
+            result, new = self._wait("result", seen, timeout=15.0)
+            if result is None:
+                yield ": keep-alive\n\n"  # Verbindung über Proxies/WLAN-Sleep offen halten
+                continue
+            seen = new
+            yield f"data: {json.dumps(result)}\n\n"
+
+
+class PreviewHub:
+    """All preview channels of the app, by name (picam, droid0, droid1, ...)."""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, name, **kw):
+        with self._lock:
+            channel = self._channels.get(name)
+            if channel is None or channel.closed:
+                channel = self._channels[name] = PreviewChannel(name, **kw)
+            return channel
+
+    def get(self, name):
+        with self._lock:
+            return self._channels.get(name)
+
+    def names(self):
+        with self._lock:
+            return [name for name, c in self._channels.items() if not c.closed]
+
+    def close(self):
+        with self._lock:
+            for channel in self._channels.values():
+                channel.close()
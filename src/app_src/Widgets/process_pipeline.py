@@ -0,0 +1,436 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from PySide6.QtCore import QObject, Signal, Slot
+from Widgets.cpu_plan import cpu_plan
+from Widgets.frame_sources import FrameSource
+from Widgets.inference_worker import FpsMeter
+from Widgets.metrics import INFERENCE_SECONDS
+
+MAX_CLASSES = 128
+
+
+def _attach(name):
+    """Open an existing segment; only its creator unlinks it.
+
+    Spawned children share the parent's resource tracker, so attaching there
+    registers the name a second time without harm (Python < 3.13 has no
+    track=False).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameRing:
+    """Frames in shared memory, one writer, any number of readers, no locks.
+
+    Each slot has a sequence number that works as a seqlock: the writer marks
+    the slot invalid (-1), copies the frame, then publishes the new number and
+    moves `latest` to it. A reader copies the newest slot out and checks the
+    number again; if the writer came round to that slot meanwhile, the copy is
+    discarded and the reader tries the newer frame. Slots hold frames up to
+    max_bytes of any shape.
+    """
+
+    HEADER = 4  # latest seq, frames written, frames read by the consumer, spare
+
+    def __init__(self, slots=4, max_bytes=1280 * 720 * 3, name=None):
+        meta_bytes = 8 * (self.HEADER + slots * 4)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=meta_bytes + slots * max_bytes)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.slots = slots
+        self.max_bytes = max_bytes
+        self.header = np.ndarray((self.HEADER,), np.int64, self.shm.buf)
+        self.meta = np.ndarray((slots, 4), np.int64, self.shm.buf, offset=8 * self.HEADER)  # seq, h, w, c
+        self.data = np.ndarray((slots, max_bytes), np.uint8, self.shm.buf, offset=meta_bytes)
+        if self.owner:
+            self.header[:] = 0
+            self.meta[:] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def begin(self, shape):
+        """Writer: a view of the next slot shaped like the frame; fill it, then commit()."""
+        size = int(np.prod(shape))
+        if size > self.max_bytes:
+            raise ValueError(f"frame {shape} does not fit the {self.max_bytes} byte slots")
+        seq = int(self.header[0]) + 1
+        index = seq % self.slots
+        self.meta[index, 0] = -1
+        self.meta[index, 1:1 + len(shape)] = shape
+        return seq, self.data[index, :size].reshape(shape)
+
+    def commit(self, seq):
+        self.meta[seq % self.slots, 0] = seq
+        self.header[0] = seq
+        self.header[1] += 1
+
+    def read(self, after=0, out=None):
+        """Reader: (seq, copy of the newest frame) if it is newer than `after`, else None."""
+        for _ in range(3):
+            seq = int(self.header[0])
+            if seq <= after:
+                return None
+            index = seq % self.slots
+            if self.meta[index, 0] != seq:
+                continue  # wird gerade überschrieben
+            shape = tuple(int(v) for v in self.meta[index, 1:4])
+            if out is None or out.shape != shape:
+                out = np.empty(shape, np.uint8)
+            np.copyto(out, self.data[index, :out.size].reshape(shape))
+            if self.meta[index, 0] == seq:
+                return seq, out
+        return None
+
+    def close(self):
+        self.header = self.meta = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def result_dtype(max_classes=MAX_CLASSES):
+    return np.dtype([("frame_seq", "<i8"), ("t", "<f8"), ("latency", "<f4"), ("class_id", "<i2"),
+                     ("conf", "<f4"), ("n_classes", "<i2"), ("probs", "<f4", (max_classes,))])
+
+
+class SharedResultQueue:
+    """Single-producer/single-consumer ring of result records in shared memory.
+
+    head is only written by the producer and tail only by the consumer, so
+    neither side needs a lock. When the consumer falls `capacity` results
+    behind, new results are counted as dropped instead of overwriting.
+    """
+
+    def __init__(self, capacity=16, max_classes=MAX_CLASSES, name=None):
+        self.dtype = result_dtype(max_classes)
+        size = 8 * 4 + capacity * self.dtype.itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.capacity = capacity
+        self.max_classes = max_classes
+        self.header = np.ndarray((4,), np.int64, self.shm.buf)  # head, tail, dropped, spare
+        self.records = np.ndarray((capacity,), self.dtype, self.shm.buf, offset=8 * 4)
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def put(self, frame_seq, prediction, latency):
+        head, tail = int(self.header[0]), int(self.header[1])
+        if head - tail >= self.capacity:
+            self.header[2] += 1
+            return False
+        record = self.records[head % self.capacity]
+        probs = np.asarray(prediction.probs, np.float32)[:self.max_classes]
+        record["frame_seq"] = frame_seq
+        record["t"] = time.time()
+        record["latency"] = latency
+        record["class_id"] = prediction.class_id
+        record["conf"] = prediction.conf
+        record["n_classes"] = probs.size
+        record["probs"][:probs.size] = probs
+        self.header[0] = head + 1
+        return True
+
+    def drain(self):
+        """All results not yet taken, oldest first, as a copied record array."""
+        head, tail = int(self.header[0]), int(self.header[1])
+        if head == tail:
+            return self.records[:0].copy()
+        indices = np.arange(tail, head) % self.capacity
+        out = self.records[indices]  # Fancy-Indexing kopiert
+        self.header[1] = head
+        return out
+
+    @property
+    def dropped(self):
+        return int(self.header[2])
+
+    def close(self):
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _capture_main(spec, ring_args, stop, events, rotation, swap_rb, cpu):
+    """Capture process: read the source and write oriented RGB frames into the ring."""
+    from Widgets.frame_sources import create_frame_source
+    cv2.setNumThreads(1)
+    cpu_plan.configure(**cpu).pin("capture")
+    ring = SharedFrameRing(*ring_args)
+    source = None
+    slot = None
+    try:
+        source = create_frame_source(spec)
+        if not source.open():
+            events.put(("error", "capture", f"could not open {spec}"))
+            return
+        events.put(("opened", "capture", source.describe()))
+        swap = swap_rb if swap_rb is not None else source.channel_order == "BGR"
+        while not stop.is_set():
+            frame = source.read()
+            if frame is None:
+                time.sleep(0.005)
+                continue
+            h, w = frame.shape[:2]
+            shape = (w, h, 3) if rotation in (cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE) else (h, w, 3)
+            seq, slot = ring.begin(shape)
+            # Drehen und Farbkanäle tauschen direkt in den Shared-Memory-Slot, ohne Zwischenpuffer
+            if rotation is None:
+                np.copyto(slot, frame)
+            else:
+                cv2.rotate(frame, rotation, dst=slot)
+            if swap:
+                cv2.cvtColor(slot, cv2.COLOR_BGR2RGB, dst=slot)
+            ring.commit(seq)
+    except Exception as e:
+        events.put(("error", "capture", repr(e)))
+    finally:
+        if source is not None:
+            source.close()
+        del slot  # die Slot-Ansicht hält den Shared-Memory-Puffer sonst offen
+        ring.close()
+
+
+def _inference_main(ring_args, results_args, stop, events, backend, model_path, gate, cascade, cpu):
+    """Inference process: classify the newest frame of the ring, results into the result queue."""
+    from Widgets.inference_backends import load_classifier
+    from Widgets.scene_gate import SceneChangeGate
+    cpu_plan.configure(**cpu).pin("inference")
+    ring = SharedFrameRing(*ring_args)
+    results = SharedResultQueue(*results_args)
+    try:
+        start = time.perf_counter()
+        classifier = load_classifier(backend, model_path, **cpu_plan.loader_kwargs())
+        if cascade:
+            from Widgets.cascade import CascadeClassifier
+            gate_model = load_classifier(cascade["backend"] or backend, cascade["model"], **cpu_plan.loader_kwargs())
+            classifier = CascadeClassifier(gate_model, classifier, cascade["low"], cascade["high"], cascade["audit"])
+        load_s = time.perf_counter() - start
+        names = classifier.names
+        events.put(("ready", "inference", {"names": dict(names) if isinstance(names, dict) else list(names),
+                                           "load_s": load_s}))
+        scene_gate = SceneChangeGate(*gate) if gate and gate[0] > 0 else None
+        seen, buf = 0, None
+        while not stop.is_set():
+            item = ring.read(after=seen, out=buf)
+            if item is None:
+                time.sleep(0.002)
+                continue
+            seen, buf = item
+            ring.header[2] += 1
+            if scene_gate is not None and scene_gate.lookup(buf) is not None:
+                continue  # Szene unverändert: letztes Ergebnis bleibt gültig
+            start = time.perf_counter()
+            prediction = classifier.predict(buf)
+            elapsed = time.perf_counter() - start
+            if scene_gate is not None:
+                scene_gate.store(prediction, elapsed)
+            results.put(seen, prediction, elapsed)
+    except Exception as e:
+        events.put(("error", "inference", repr(e)))
+    finally:
+        ring.close()
+        results.close()
+
+
+class ProcessPipeline:
+    """Capture and inference of the Pi camera in two processes, frames and results in shared memory.
+
+    The capture process writes oriented RGB frames into a SharedFrameRing;
+    the inference process classifies the newest one and puts the result into
+    a SharedResultQueue. The GUI process only reads both, so capture,
+    PyTorch and Qt painting no longer share one interpreter lock. Control
+    messages (opened, ready, errors) go through a multiprocessing queue.
+
+    It also stands in for the classifier in the window (names, ready) and
+    provides the display source and the inference worker. The children
+    take over the thread count and the capture/inference cores of cpu_plan.
+    """
+
+    def __init__(self, spec, backend="torch", model_path=None, gate=(6.0, 2.0), cascade=None,
+                 slots=4, max_frame=(1280, 720), rotation=cv2.ROTATE_90_COUNTERCLOCKWISE, swap_rb=None):
+        ctx = multiprocessing.get_context("spawn")
+        self.spec = spec
+        self.ring = SharedFrameRing(slots, max_frame[0] * max_frame[1] * 3)
+        self.results = SharedResultQueue()
+        self.stop_event = ctx.Event()
+        self.events = ctx.Queue()
+        self.names = None
+        self.model_path = model_path
+        self.load_s = None
+        self.error = None
+        ring = (slots, self.ring.max_bytes, self.ring.name)
+        results = (self.results.capacity, self.results.max_classes, self.results.name)
+        self.processes = [
+            ctx.Process(target=_capture_main, name="capture", daemon=True,
+                        args=(spec, ring, self.stop_event, self.events, rotation, swap_rb, cpu_plan.as_dict())),
+            ctx.Process(target=_inference_main, name="inference", daemon=True,
+                        args=(ring, results, self.stop_event, self.events, backend, model_path, gate, cascade,
+                              cpu_plan.as_dict())),
+        ]
+        self.started = False
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        self.started = True
+        return self
+
+    @property
+    def ready(self):
+        return self.names is not None
+
+    def poll_events(self):
+        """Handle control messages from the children (call from the GUI side)."""
+        while True:
+            try:
+                kind, who, payload = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "ready":
+                names = payload["names"]
+                self.names = names if isinstance(names, list) else {int(k): v for k, v in names.items()}
+                self.load_s = payload["load_s"]
+                print(f"🧠 Inference process ready: model loaded in {self.load_s:.1f} s")
+            elif kind == "opened":
+                print(f"📷 Capture process: {payload}")
+            else:
+                self.error = payload
+                print(f"❌ {who} process: {payload}")
+
+    def display_source(self):
+        return SharedRingSource(self)
+
+    def worker(self, release=None):
+        return RemoteInferenceWorker(self, release)
+
+    def stats(self):
+        if self.ring.header is None:
+            return {}
+        return {
+            "captured": int(self.ring.header[1]),
+            "inferred_from": int(self.ring.header[2]),
+            "results_dropped": self.results.dropped,
+            "alive": [p.name for p in self.processes if p.is_alive()],
+        }
+
+    def stop(self, timeout=2.0):
+        """Stop both children and free the shared memory; safe to call twice."""
+        if self.ring.header is None:
+            return
+        self.stop_event.set()
+        deadline = time.perf_counter() + timeout
+        for process in self.processes:
+            if self.started:
+                process.join(max(deadline - time.perf_counter(), 0.1))
+                if process.is_alive():
+                    print(f"⚠️ {process.name} process did not stop, terminating it")
+                    process.terminate()
+                    process.join(1.0)
+        self.poll_events()
+        print(f"📉 Process pipeline: {self.stats()}")
+        self.ring.close()
+        self.results.close()
+        self.events.close()
+
+
+class SharedRingSource(FrameSource):
+    """Display side of a ProcessPipeline: the newest frame of the ring, None if there is no new one."""
+    channel_order = "RGB"
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.seq = 0
+        self._buf = None
+
+    def read(self):
+        if self.pipeline.ring.header is None:
+            return None
+        item = self.pipeline.ring.read(after=self.seq, out=self._buf)
+        if item is None:
+            return None
+        self.seq, self._buf = item
+        return self._buf
+
+    def describe(self):
+        return f"{self.pipeline.spec} (capture process)"
+
+
+class _RemoteSlot:
+    """Queue figures of the inference process in the shape of LatestFrameSlot."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    @property
+    def dropped(self):
+        """Captured frames the inference process never looked at."""
+        header = self.pipeline.ring.header
+        return 0 if header is None else max(int(header[1] - header[2]) - self.depth, 0)
+
+    @property
+    def depth(self):
+        header = self.pipeline.ring.header
+        return 0 if header is None else int(header[1] > header[2])
+
+
+class RemoteInferenceWorker(QObject):
+    """InferenceWorker stand-in for ProcessPipeline: turns the shared result queue into result_ready signals."""
+    result_ready = Signal(str, float, object, float)
+    finished = Signal()
+
+    def __init__(self, pipeline, release=None):
+        super().__init__()
+        self.pipeline = pipeline
+        self.release = release if release is not None else (lambda frame: None)
+        self.slot = _RemoteSlot(pipeline)
+        self.fps_meter = FpsMeter()
+        self.gate = None  # das Gate läuft im Inferenz-Prozess
+        self.controller = None
+        self.min_interval = 0.0
+        self.running = True
+
+    def submit(self, frame):
+        # Der Inferenz-Prozess liest selbst aus dem Ring; der Anzeigepuffer wird hier nicht gebraucht
+        self.release(frame)
+
+    @Slot()
+    def run(self):
+        self.pipeline.start()
+        while self.running:
+            self.pipeline.poll_events()
+            records = self.pipeline.results.drain() if self.pipeline.ring.header is not None else ()
+            if not len(records) or self.pipeline.names is None:
+                time.sleep(0.005)
+                continue
+            names = self.pipeline.names
+            for record in records:
+                probs = record["probs"][:record["n_classes"]]
+                latency = float(record["latency"])
+                INFERENCE_SECONDS.observe(latency, pipeline="camera")
+                self.fps_meter.tick()
+                self.result_ready.emit(names[int(record["class_id"])], float(record["conf"]), probs, latency)
+        self.finished.emit()
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,55 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import numpy as np
+
+
+def summarize(seconds):
+    """p50/p95/p99/mean/max of a list of durations, in milliseconds."""
+    if not seconds:
+        return {"count": 0}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+class StageTimer:
+    """Collects durations per named pipeline stage."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.samples[name].append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+
+    def summary(self):
+        return {name: summarize(values) for name, values in self.samples.items()}
+
+
+class NullStageTimer:
+    """Drop-in for StageTimer when nobody is measuring; costs one shared no-op context."""
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def add(self, name, seconds):
+        pass
@@ -0,0 +1,45 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class FrameResultCache:
+    """Bounded LRU of results keyed by a hash of the frame pixels.
+
+    Identical frames (a frozen DroidCam image captured again, an unchanged
+    still) map to the same key, so their result is returned without running
+    the model. Thread-safe: results are stored from worker threads.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(frame):
+        digest = hashlib.blake2b(np.ascontiguousarray(frame).data, digest_size=16)
+        return frame.shape, digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,80 @@
+import time
+import cv2
+
+
+class SceneChangeGate:
+    """Reuses the last classification while the view is stable.
+
+    Every frame is reduced to a small grey thumbnail and compared with the
+    thumbnail of the last classified frame (mean absolute difference, 0-255).
+    Below `threshold` the cached result is returned; after `max_age` seconds
+    the classifier runs anyway. threshold=0 disables the gate.
+    """
+
+    def __init__(self, threshold=6.0, max_age=2.0, size=(32, 32)):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self._reference = None
+        self._candidate = None
+        self._result = None
+        self._stamp = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.forced = 0
+        self.inference_time = 0.0
+        self.last_difference = 0.0
+
+    def _thumbnail(self, frame):
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(grey, self.size, interpolation=cv2.INTER_AREA)
+
+    def lookup(self, frame, now=None):
+        """Cached result if the scene has not changed, otherwise None (then call store())."""
+        now = time.monotonic() if now is None else now
+        if self.threshold <= 0:
+            self.misses += 1
+            return None
+        self._candidate = self._thumbnail(frame)
+        if self._result is None:
+            self.misses += 1
+            return None
+        self.last_difference = float(cv2.absdiff(self._candidate, self._reference).mean())
+        if self.last_difference >= self.threshold:
+            self.misses += 1
+            return None
+        if now - self._stamp >= self.max_age:
+            self.misses += 1
+            self.forced += 1
+            return None
+        self.hits += 1
+        return self._result
+
+    def store(self, result, inference_s, now=None):
+        """Remember the classification of the frame passed to the last lookup()."""
+        self._result = result
+        self._reference = self._candidate
+        self._stamp = time.monotonic() if now is None else now
+        self.inference_time += inference_s
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def cpu_saved(self):
+        """Estimated classifier seconds saved: hits times the mean inference time."""
+        return self.hits * self.inference_time / self.misses if self.misses else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "forced_refreshes": self.forced,
+            "hit_rate": round(self.hit_rate, 4),
+            "cpu_saved_s": round(self.cpu_saved, 3),
+        }
@@ -0,0 +1,165 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+import cv2
+import numpy as np
+
+
+def record_dtype(top_k=5):
+    """Fixed-size binary record per classification result (little-endian, packed)."""
+    return np.dtype([
+        ("t", "<f8"),                       # time.time() of the result
+        ("class_id", "<i2"),                # top-1 class, -1 if unknown
+        ("grade", "u1"),                    # 0-5 as shown in the grade bar
+        ("conf", "<f4"),
+        ("latency_ms", "<f4"),              # classifier time for this frame
+        ("top_ids", "<i2", (top_k,)),
+        ("top_probs", "<f4", (top_k,)),
+    ])
+
+
+class SessionRecorder:
+    """Opt-in recorder for what the Pi camera window computes.
+
+    A session is a directory with meta.json, records.bin (the records of
+    record_dtype back to back, append-only, memory-mappable) and thumbs/ with
+    a JPEG every `thumb_every` seconds. record() only fills a row of a
+    preallocated block on the calling thread; full blocks and thumbnails are
+    written by a background thread. Thumbnails wait in a ring buffer of
+    `ring` entries, so a slow SD card drops old thumbnails instead of
+    blocking the preview.
+    """
+
+    def __init__(self, root, names=None, top_k=5, thumb_every=2.0, thumb_width=160, ring=8,
+                 block=256, flush_every=1.0, channel_order="RGB", meta=None):
+        self.path = os.path.join(root, time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(os.path.join(self.path, "thumbs"), exist_ok=True)
+        self.top_k = top_k
+        self.dtype = record_dtype(top_k)
+        self.thumb_every = thumb_every
+        self.thumb_width = thumb_width
+        self.block_size = block
+        self.flush_every = flush_every
+        self.channel_order = channel_order
+        self.started = time.time()
+
+        self.meta = {"started": self.started, "top_k": top_k, "names": None, "dtype": self.dtype.descr, **(meta or {})}
+        self.set_names(names)
+
+        self._block = np.zeros(block, dtype=self.dtype)
+        self._n = 0
+        self._last_flush = time.perf_counter()
+        self._last_thumb = None
+        self._blocks = queue.SimpleQueue()
+        self._thumbs = deque(maxlen=ring)
+        self._wake = threading.Event()
+        self._stop = False
+        self.records = 0
+        self.thumbs_written = 0
+        self.thumbs_dropped = 0
+        self._file = open(os.path.join(self.path, "records.bin"), "ab")
+        self._thread = threading.Thread(target=self._run, name="session recorder", daemon=True)
+        self._thread.start()
+
+    @property
+    def names(self):
+        return self.meta["names"]
+
+    def set_names(self, names):
+        """Class names for class_id/top_ids; may be given later, once the model has loaded."""
+        if names is not None:
+            self.meta["names"] = list(names.values()) if isinstance(names, dict) else list(names)
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def record(self, probs, grade, latency=None, now=None):
+        """Append one result; probs is the full probability vector (or None)."""
+        row = self._block[self._n]
+        row["t"] = time.time() if now is None else now
+        row["grade"] = grade
+        row["latency_ms"] = np.nan if latency is None else latency * 1000.0
+        if probs is None:
+            row["class_id"] = -1
+            row["top_ids"] = -1
+        else:
+            probs = np.asarray(probs)
+            k = min(self.top_k, probs.size)
+            top = np.argpartition(probs, -k)[-k:]
+            top = top[np.argsort(probs[top])[::-1]]
+            row["class_id"] = top[0]
+            row["conf"] = probs[top[0]]
+            row["top_ids"][:k] = top
+            row["top_probs"][:k] = probs[top]
+        self._n += 1
+        self.records += 1
+        if self._n == self.block_size or time.perf_counter() - self._last_flush > self.flush_every:
+            self._hand_over()
+
+    def add_thumbnail(self, frame, now=None):
+        """Keep a downscaled copy of frame if the last thumbnail is older than thumb_every."""
+        now = time.time() if now is None else now
+        if self._last_thumb is not None and now - self._last_thumb < self.thumb_every:
+            return
+        self._last_thumb = now
+        h, w = frame.shape[:2]
+        size = (self.thumb_width, max(round(h * self.thumb_width / w), 1))
+        if len(self._thumbs) == self._thumbs.maxlen:
+            self.thumbs_dropped += 1
+        self._thumbs.append((now, cv2.resize(frame, size, interpolation=cv2.INTER_AREA)))
+        self._wake.set()
+
+    def close(self):
+        self._hand_over()
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+
+    def _hand_over(self):
+        # Block an den Schreib-Thread übergeben und für die nächsten Zeilen einen neuen nehmen
+        if self._n:
+            self._blocks.put(self._block[:self._n])
+            self._block = np.zeros(self.block_size, dtype=self.dtype)
+            self._n = 0
+            self._wake.set()
+        self._last_flush = time.perf_counter()
+
+    def _run(self):
+        while True:
+            self._wake.wait(1.0)
+            self._wake.clear()
+            wrote = False
+            while not self._blocks.empty():
+                self._file.write(self._blocks.get().tobytes())
+                wrote = True
+            if wrote:
+                self._file.flush()
+            while self._thumbs:
+                t, thumb = self._thumbs.popleft()
+                if self.channel_order == "RGB":
+                    thumb = cv2.cvtColor(thumb, cv2.COLOR_RGB2BGR)
+                name = f"{int((t - self.started) * 1000):09d}.jpg"
+                cv2.imwrite(os.path.join(self.path, "thumbs", name), thumb, [cv2.IMWRITE_JPEG_QUALITY, 80])
+                self.thumbs_written += 1
+            if self._stop and self._blocks.empty() and not self._thumbs:
+                break
+
+    def stats(self):
+        return {"records": self.records, "thumbs_written": self.thumbs_written, "thumbs_dropped": self.thumbs_dropped}
+
+
+def load_session(path):
+    """Records as a read-only memory map, plus meta.json and the thumbnails as (seconds, file) pairs."""
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    dtype = np.dtype([tuple(field) if len(field) == 2 else (field[0], field[1], tuple(field[2]))
+                      for field in meta["dtype"]])
+    records_path = os.path.join(path, "records.bin")
+    count = os.path.getsize(records_path) // dtype.itemsize  # ein halb geschriebener letzter Datensatz wird ignoriert
+    records = np.memmap(records_path, dtype=dtype, mode="r", shape=(count,)) if count else np.zeros(0, dtype)
+    thumbs_dir = os.path.join(path, "thumbs")
+    thumbs = [(int(name[:-4]) / 1000.0, os.path.join(thumbs_dir, name)) for name in sorted(os.listdir(thumbs_dir))]
+    return records, meta, thumbs
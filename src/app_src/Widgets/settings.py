@@ -0,0 +1,119 @@
+import argparse
+import json
+from Widgets.cpu_plan import ROLES, parse_affinity
+from Widgets.model_files import BACKENDS
+
+
+def _overlap(text):
+    value = float(text)
+    if not 0 <= value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 0 and below 1, got {text}")
+    return value
+
+
+def build_arg_parser():
+    """Command-line options of the GUI. Every option can also be set in a JSON file via --config."""
+    parser = argparse.ArgumentParser(description="BotanIdent tree category detection")
+    parser.add_argument("--config", help="JSON file with default values for the options below")
+    parser.add_argument("--picam-source", default="picam",
+                        help="frame source for 'Connect via PI Camera' (e.g. picam, v4l2:0, file:clip.mp4@max, synthetic)")
+    parser.add_argument("--droid-source", action="append", default=None,
+                        help="frame source for 'Connect via Droid Camera' (repeatable with --multi-stream); "
+                             "skips the phone setup page when given")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="inference runtime for treeDetection (export onnx/openvino models with export_model.py)")
+    parser.add_argument("--model", default=None,
+                        help="model file or directory; defaults to the standard artifact of the chosen backend")
+    parser.add_argument("--cascade-model", default=None,
+                        help="small gate model run before the full model; the full model only sees ambiguous frames")
+    parser.add_argument("--cascade-backend", choices=BACKENDS, default=None,
+                        help="inference runtime of the cascade gate model (default: --backend)")
+    parser.add_argument("--cascade-low", type=float, default=0.5,
+                        help="gate confidence below which a frame exits early as 'no tree'")
+    parser.add_argument("--cascade-high", type=float, default=0.9,
+                        help="gate confidence from which a frame exits early with the gate's species")
+    parser.add_argument("--cascade-audit", type=int, default=20,
+                        help="also run every Nth early exit through the full model to measure agreement; 0 disables")
+    parser.add_argument("--gate-threshold", type=float, default=6.0,
+                        help="scene-change threshold (mean grey difference 0-255) below which the last result is reused; 0 disables")
+    parser.add_argument("--gate-max-age", type=float, default=2.0,
+                        help="seconds after which the classifier runs even if the scene looks unchanged")
+    parser.add_argument("--multi-stream", action="store_true",
+                        help="allow several DroidCam phones at once, classified live by one shared model")
+    parser.add_argument("--batch-size", type=int, default=4, help="maximum micro-batch in multi-stream mode")
+    parser.add_argument("--batch-wait-ms", type=float, default=20.0,
+                        help="how long a micro-batch waits for frames from the other streams")
+    parser.add_argument("--record", metavar="DIR", default=None,
+                        help="record Pi camera sessions (results and thumbnails) below DIR; off by default")
+    parser.add_argument("--record-thumb-every", type=float, default=2.0,
+                        help="seconds between recorded thumbnails")
+    parser.add_argument("--pipeline", choices=("thread", "process"), default="thread",
+                        help="Pi camera: capture and inference in threads of the GUI process, or in two processes "
+                             "exchanging frames and results through shared memory")
+    parser.add_argument("--pipeline-max-frame", default="1280x720",
+                        help="largest camera frame (WxH) the shared-memory ring of --pipeline process holds")
+    parser.add_argument("--tiled", action="store_true",
+                        help="start the DroidCam window with tiled analysis of captured stills switched on")
+    parser.add_argument("--tile-grid", type=int, default=3, help="tiles along the shorter side of a captured still")
+    parser.add_argument("--tile-overlap", type=_overlap, default=0.25,
+                        help="overlap of neighbouring tiles, as a fraction of the tile (0 to below 1)")
+    parser.add_argument("--tile-batch", type=int, default=16, help="tiles per predict call in tiled analysis")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="adapt the Pi camera's inference rate and model input size to hold --latency-budget-ms")
+    parser.add_argument("--latency-budget-ms", type=float, default=250.0, help="target p90 classifier latency")
+    parser.add_argument("--min-rate", type=float, default=0.5, help="lowest inference rate (per second) in adaptive mode")
+    parser.add_argument("--max-rate", type=float, default=10.0, help="highest inference rate (per second) in adaptive mode")
+    parser.add_argument("--input-sizes", default="224,192,160,128",
+                        help="model input sizes the adaptive mode may use, largest first")
+    parser.add_argument("--cpu-high", type=float, default=85.0,
+                        help="system CPU load (percent) above which adaptive mode lowers the inference rate")
+    parser.add_argument("--thermal", action="store_true",
+                        help="Pi camera: lower the inference rate (and switch to --thermal-light-model) before the CPU throttles")
+    parser.add_argument("--thermal-source", choices=("sysfs", "fake"), default="sysfs",
+                        help="where temperature and clock come from; 'fake' simulates a heating SoC for runs without a Pi")
+    parser.add_argument("--thermal-soft", type=float, default=70.0,
+                        help="projected CPU temperature (°C) from which the inference rate is lowered")
+    parser.add_argument("--thermal-hard", type=float, default=78.0,
+                        help="projected CPU temperature (°C) at which the lowest rate (--min-rate) is reached")
+    parser.add_argument("--thermal-light-model", default=None,
+                        help="lighter model with the same classes to switch to while the rate stays low")
+    parser.add_argument("--thermal-light-backend", choices=BACKENDS, default=None,
+                        help="inference runtime of the light model (default: --backend)")
+    parser.add_argument("--thermal-log", metavar="CSV", default=None,
+                        help="append temperature, clock and sustained throughput to this CSV file")
+    parser.add_argument("--thermal-log-every", type=float, default=60.0, help="seconds between thermal log rows")
+    parser.add_argument("--inference-threads", type=int, default=0,
+                        help="intra-op threads of the inference runtime (0 = its default, usually one per core)")
+    parser.add_argument("--affinity", action="append", default=None, metavar="ROLE=CORES",
+                        help=f"pin a pipeline role ({', '.join(ROLES)}) to cores, e.g. inference=1-3 (repeatable, "
+                             "Linux only); benchmark.py threads finds a good combination")
+    parser.add_argument("--web-port", type=int, default=8080,
+                        help="port of the phone setup page and live preview (all interfaces); 0 disables it")
+    parser.add_argument("--metrics-port", type=int, default=9100,
+                        help="port of the local Prometheus /metrics endpoint; 0 disables it")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="address the metrics endpoint listens on (0.0.0.0 to scrape it from another machine)")
+    parser.add_argument("--startup-profile", nargs="?", const="-", default=None, metavar="JSON",
+                        help="print the startup timeline and slowest imports once the model is ready; "
+                             "also write it to JSON when a file is given")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quit once the model is ready (for timing the startup with --startup-profile)")
+    return parser
+
+
+def load_settings(argv=None):
+    """Parse argv, using values from the --config file as defaults. Unknown (Qt) options are ignored."""
+    parser = build_arg_parser()
+    known, _ = parser.parse_known_args(argv)
+    if known.config:
+        with open(known.config, encoding="utf-8") as f:
+            parser.set_defaults(**{k.replace("-", "_"): v for k, v in json.load(f).items()})
+    settings, _ = parser.parse_known_args(argv)
+    if isinstance(settings.droid_source, str):  # single value from a config file
+        settings.droid_source = [settings.droid_source]
+    try:
+        settings.affinity = parse_affinity(settings.affinity)
+        settings.tile_overlap = _overlap(str(settings.tile_overlap))  # Werte aus --config umgehen type=
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+    return settings
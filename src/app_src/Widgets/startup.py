@@ -0,0 +1,83 @@
+import importlib
+import json
+import os
+import sys
+import time
+from PySide6.QtCore import QEvent, QObject
+
+
+def _process_age():
+    """Seconds since the interpreter process was started (Linux), None elsewhere."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfile:
+    """Timeline of the app start: milestones and the heavy imports, in seconds since the first import of this module.
+
+    `interpreter_s` is how long the process ran before that (Python start-up
+    and the imports in front of it).
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.interpreter_s = _process_age()
+        self.events = []   # (milestone, seconds)
+        self.imports = []  # (module, seconds, thread)
+
+    def mark(self, name):
+        self.events.append((name, time.perf_counter() - self.t0))
+
+    def elapsed(self, name):
+        return next((t for event, t in self.events if event == name), None)
+
+    def import_modules(self, names):
+        """Import modules one after the other and time each (already imported parts cost nothing)."""
+        for name in names:
+            start = time.perf_counter()
+            if name not in sys.modules:
+                importlib.import_module(name)
+                self.imports.append((name, time.perf_counter() - start, "background"))
+
+    def report(self):
+        lines = ["🚀 Startup profile"]
+        if self.interpreter_s is not None:
+            lines.append(f"   {'interpreter + early imports':<34}{self.interpreter_s:6.2f} s")
+        for name, t in self.events:
+            lines.append(f"   {name:<34}{t:6.2f} s")
+        for name, seconds, thread in sorted(self.imports, key=lambda item: -item[1]):
+            lines.append(f"   {'import ' + name:<34}{seconds:6.2f} s ({thread})")
+        return "\n".join(lines)
+
+    def as_dict(self):
+        return {"interpreter_s": self.interpreter_s, "events": dict(self.events),
+                "imports": {name: seconds for name, seconds, _ in self.imports}}
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+class FirstPaintProbe(QObject):
+    """Calls `callback` once, right after the watched widget received its first paint event."""
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.widget = widget
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self.widget.removeEventFilter(self)
+            self.callback()
+        return False
+
+
+profile = StartupProfile()
@@ -0,0 +1,299 @@
+import csv
+import glob
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+
+class ThermalReading(NamedTuple):
+    """One sample of the SoC; fields are None when the platform does not expose them."""
+    temp_c: float
+    freq_mhz: float
+    max_freq_mhz: float
+
+    @property
+    def freq_ratio(self):
+        if not self.freq_mhz or not self.max_freq_mhz:
+            return None
+        return self.freq_mhz / self.max_freq_mhz
+
+
+def _read_number(path):
+    try:
+        with open(path) as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class SysfsThermalSource:
+    """CPU temperature and clock from sysfs (Raspberry Pi OS and most Linux boards).
+
+    The thermal zone whose type names the CPU/SoC is used (cpu-thermal on a
+    Pi, x86_pkg_temp on a PC), else the first one. The clock is cpu0's
+    scaling_cur_freq against cpuinfo_max_freq.
+    """
+
+    def __init__(self, root="/sys", cpu=0):
+        self.zone = None
+        zones = sorted(glob.glob(os.path.join(root, "class/thermal/thermal_zone*")))
+        for zone in zones:
+            try:
+                with open(os.path.join(zone, "type")) as f:
+                    kind = f.read().strip()
+            except OSError:
+                continue
+            if any(name in kind for name in ("cpu", "soc", "x86_pkg")):
+                self.zone = zone
+                break
+        if self.zone is None and zones:
+            self.zone = zones[0]
+        cpufreq = os.path.join(root, f"devices/system/cpu/cpu{cpu}/cpufreq")
+        self.freq_path = os.path.join(cpufreq, "scaling_cur_freq")
+        max_khz = _read_number(os.path.join(cpufreq, "cpuinfo_max_freq"))
+        self.max_freq_mhz = max_khz / 1000.0 if max_khz else None
+
+    @property
+    def available(self):
+        return self.zone is not None and _read_number(os.path.join(self.zone, "temp")) is not None
+
+    def read(self):
+        millidegrees = _read_number(os.path.join(self.zone, "temp")) if self.zone else None
+        khz = _read_number(self.freq_path)
+        return ThermalReading(millidegrees / 1000.0 if millidegrees is not None else None,
+                              khz / 1000.0 if khz is not None else None, self.max_freq_mhz)
+
+    def describe(self):
+        return f"sysfs {os.path.basename(self.zone) if self.zone else 'no thermal zone'}"
+
+
+class FakeThermalSource:
+    """Simulated SoC for desk runs and benchmark.py thermal: heats up with load and throttles at throttle_at.
+
+    The temperature approaches ambient + heat * load with time constant tau
+    (seconds of `clock`); `load` (0-1) is set by the scheduler from the
+    classifier's busy fraction.
+    """
+
+    def __init__(self, ambient=40.0, heat=45.0, tau=120.0, throttle_at=80.0, max_freq=1800.0,
+                 throttled_freq=1000.0, temp=None, clock=time.monotonic):
+        self.ambient = ambient
+        self.heat = heat
+        self.tau = tau
+        self.throttle_at = throttle_at
+        self.max_freq = max_freq
+        self.throttled_freq = throttled_freq
+        self.temp = ambient if temp is None else temp
+        self.clock = clock
+        self.load = 0.0
+        self._last = clock()
+        self.available = True
+
+    def read(self):
+        now = self.clock()
+        target = self.ambient + self.heat * min(max(self.load, 0.0), 1.0)
+        self.temp += (target - self.temp) * (1.0 - math.exp(-(now - self._last) / self.tau))
+        self._last = now
+        freq = self.throttled_freq if self.temp >= self.throttle_at else self.max_freq
+        return ThermalReading(self.temp, freq, self.max_freq)
+
+    def describe(self):
+        return f"simulated SoC (throttles at {self.throttle_at:.0f} °C)"
+
+
+def create_thermal_source(kind="sysfs"):
+    if kind == "fake":
+        return FakeThermalSource()
+    if kind == "sysfs":
+        return SysfsThermalSource()
+    raise ValueError(f"Unknown thermal source: {kind} (expected sysfs or fake)")
+
+
+def _class_names(names):
+    return list(names.values()) if isinstance(names, dict) else list(names)
+
+
+class ThermalScheduler:
+    """Keeps the SoC out of thermal throttling by lowering the inference rate early and smoothly.
+
+    step() runs about once a second (GUI timer). The temperature is projected
+    `lookahead` seconds ahead from its recent slope; between `soft` and `hard`
+    degrees the allowed rate falls linearly from max_rate to min_rate. A clock
+    below 90 % of the maximum while the classifier is busy means the firmware
+    already throttles, then the target is min_rate. The limit moves at most
+    `max_step` (relative) per step towards the target, so preview and results
+    never jump.
+
+    With a lighter model (same classes) the worker switches to it after the
+    limit stayed at or below `switch_below` of max_rate for `hold` steps, and
+    back once the projected temperature stayed `hysteresis` degrees under
+    soft as long (so not while the SoC is still heating up).
+
+    Every `log_every` seconds the sustained throughput, temperature, clock,
+    rate limit and model in use go to `log` and, with csv_path, into a CSV
+    file for long runs.
+    """
+
+    def __init__(self, source, soft=70.0, hard=78.0, min_rate=0.5, max_rate=30.0, lookahead=30.0,
+                 max_step=0.15, light=None, switch_below=0.5, hold=10, hysteresis=5.0, log_every=60.0,
+                 csv_path=None, log=print, clock=time.monotonic):
+        self.source = source
+        self.soft = soft
+        self.hard = hard
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.lookahead = lookahead
+        self.max_step = max_step
+        self.light = light
+        self.switch_below = switch_below
+        self.hold = hold
+        self.hysteresis = hysteresis
+        self.log_every = log_every
+        self.csv_path = csv_path
+        self.log = log
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._busy = 0.0          # Sekunden im Klassifikator seit dem letzten step()
+        self._count = 0           # Vorhersagen seit der letzten Logzeile
+        self._history = deque()   # (time, temp) der letzten lookahead Sekunden
+        self._hot = 0
+        self._cool = 0
+        self.worker = None
+        self.full = None
+        self.rate = max_rate
+        self.reading = ThermalReading(None, None, None)
+        self.projected = None
+        self.throttled = False
+        self.using_light = False
+        self.switches = 0
+        self.rows = deque(maxlen=1440)  # ein Tag bei log_every=60
+        self.started = self._last_step = self._last_row = clock()
+        self.total = 0
+        self.peak_temp = None
+        self.throttled_s = 0.0
+
+    def attach(self, worker, classifier):
+        """Start limiting worker.thermal_interval; classifier is the full model to return to."""
+        self.worker = worker
+        self.full = classifier
+        worker.thermal_interval = 0.0
+
+    def observe(self, latency):
+        """Called from the inference thread after each classifier call."""
+        with self._lock:
+            self._busy += latency
+            self._count += 1
+
+    def step(self):
+        """One scheduling decision; returns the new rate limit (per second)."""
+        now = self.clock()
+        dt = max(now - self._last_step, 1e-6)
+        self._last_step = now
+        with self._lock:
+            busy, self._busy = min(self._busy / dt, 1.0), 0.0
+        if hasattr(self.source, "load"):
+            self.source.load = busy  # FakeThermalSource heizt mit der tatsächlichen Last
+        reading = self.reading = self.source.read()
+        if reading.temp_c is None:
+            return self.rate  # keine Temperatur auf dieser Plattform: nichts zu regeln
+
+        temp = reading.temp_c
+        self.peak_temp = temp if self.peak_temp is None else max(self.peak_temp, temp)
+        self._history.append((now, temp))
+        while now - self._history[0][0] > self.lookahead:
+            self._history.popleft()
+        t0, first = self._history[0]
+        slope = (temp - first) / (now - t0) if now > t0 else 0.0
+        self.projected = temp + max(slope, 0.0) * self.lookahead
+        ratio = reading.freq_ratio
+        self.throttled = ratio is not None and ratio < 0.9 and busy > 0.5
+        if self.throttled:
+            self.throttled_s += dt
+
+        if self.throttled or self.projected >= self.hard:
+            target = self.min_rate
+        elif self.projected <= self.soft:
+            target = self.max_rate
+        else:
+            share = (self.projected - self.soft) / (self.hard - self.soft)
+            target = self.max_rate - share * (self.max_rate - self.min_rate)
+        step = self.rate * self.max_step
+        self._set_rate(min(max(target, self.rate - step), self.rate + step))
+        self._choose_model(temp)
+        if now - self._last_row >= self.log_every:
+            self._write_row(now)
+        return self.rate
+
+    def _set_rate(self, rate):
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        if self.worker is not None:
+            # Volle Rate = keine Bremse, der 30-ms-Timer der Kamera gibt dann den Takt vor
+            self.worker.thermal_interval = 0.0 if self.rate >= self.max_rate else 1.0 / self.rate
+
+    def _choose_model(self, temp):
+        if self.light is None or self.worker is None:
+            return
+        if not self.using_light:
+            self._hot = self._hot + 1 if self.rate <= self.switch_below * self.max_rate else 0
+            if self._hot >= self.hold and getattr(self.light, "ready", True):
+                if _class_names(self.light.names) != _class_names(self.full.names):
+                    self.log("⚠️ Thermal: light model has different classes, not switching")
+                    self.light = None
+                    return
+                self.worker.classifier = self.light
+                self.using_light = True
+                self.switches += 1
+                self._hot = 0
+                self.log(f"🌡 Thermal: {temp:.1f} °C, switched to the light model")
+        else:
+            self._cool = self._cool + 1 if self.projected <= self.soft - self.hysteresis else 0
+            if self._cool >= self.hold:
+                self.worker.classifier = self.full
+                self.using_light = False
+                self.switches += 1
+                self._cool = 0
+                self.log(f"🌡 Thermal: {temp:.1f} °C, back to the full model")
+
+    def _write_row(self, now):
+        with self._lock:
+            count, self._count = self._count, 0
+        self.total += count
+        r = self.reading
+        row = {
+            "elapsed_s": round(now - self.started, 1),
+            "temp_c": round(r.temp_c, 1) if r.temp_c is not None else None,
+            "freq_mhz": round(r.freq_mhz) if r.freq_mhz is not None else None,
+            "rate_limit": round(self.rate, 2),
+            "throughput": round(count / (now - self._last_row), 2),
+            "model": "light" if self.using_light else "full",
+            "throttled": int(self.throttled),
+        }
+        self._last_row = now
+        self.rows.append(row)
+        self.log(f"🌡 {row['elapsed_s']:.0f} s: {row['temp_c']} °C, {row['freq_mhz']} MHz, "
+                 f"{row['throughput']:.1f} predictions/s (limit {row['rate_limit']:.1f}, {row['model']} model)")
+        if self.csv_path:
+            new = not os.path.exists(self.csv_path)
+            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                if new:
+                    writer.writeheader()
+                writer.writerow(row)
+
+    def state(self):
+        r = self.reading
+        return {"temp_c": r.temp_c, "freq_mhz": r.freq_mhz, "projected_c": self.projected, "rate": round(self.rate, 2),
+                "throttled": self.throttled, "light_model": self.using_light, "switches": self.switches}
+
+    def summary(self):
+        """Whole run: sustained throughput, peak temperature and time spent throttled."""
+        elapsed = self.clock() - self.started
+        with self._lock:
+            total = self.total + self._count
+        return {"seconds": round(elapsed, 1), "predictions": total,
+                "sustained_throughput": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+                "peak_temp_c": round(self.peak_temp, 1) if self.peak_temp is not None else None,
+                "throttled_s": round(self.throttled_s, 1), "model_switches": self.switches}
@@ -0,0 +1,149 @@
+import time
+from typing import NamedTuple
+import cv2
+import numpy as np
+from Widgets.flammability import FlammabilityScorer, GRADE_BOUNDS, GRADE_COLORS
+from Widgets.inference_backends import Prediction
+from Widgets.metrics import INFERENCE_SECONDS
+from Widgets.view_state import CONFIDENCE_THRESHOLD
+
+
+def tile_boxes(height, width, grid=3, overlap=0.25, min_tile=32):
+    """Overlapping square tiles (x0, y0, x1, y1) covering the image.
+
+    `grid` tiles fit along the shorter side; the tiles along the longer side
+    are spaced evenly with at least the same overlap. Images smaller than
+    min_tile per tile get fewer tiles. overlap must be in [0, 1).
+    """
+    _check_tiling(grid, overlap)
+    short = min(height, width)
+    tile = int(short / (grid - (grid - 1) * overlap)) if grid > 1 else short
+    tile = min(max(tile, min_tile), short)
+
+    def starts(length):
+        count = max(1, int(np.ceil((length - tile) / (tile * (1 - overlap)))) + 1) if length > tile else 1
+        return np.linspace(0, length - tile, count).round().astype(int)
+
+    return np.array([(x, y, x + tile, y + tile) for y in starts(height) for x in starts(width)], dtype=np.int32)
+
+
+def _check_tiling(grid, overlap):
+    if grid < 1:
+        raise ValueError(f"tile grid must be at least 1, got {grid}")
+    if not 0 <= overlap < 1:
+        raise ValueError(f"tile overlap must be in [0, 1), got {overlap}")
+
+
+class TiledResult(NamedTuple):
+    """Per-tile predictions and the merged per-region maps of one still."""
+    prediction: Prediction   # mean over all regions, for the result label and the preview
+    boxes: np.ndarray        # (N, 4) x0, y0, x1, y1
+    tile_probs: np.ndarray   # (N, C)
+    cell: int                # pixels per map cell
+    species: np.ndarray      # (H/cell, W/cell) class id, -1 below the confidence threshold
+    conf: np.ndarray         # (H/cell, W/cell) top-1 probability of the merged distribution
+    index: np.ndarray        # (H/cell, W/cell) flammability index 0-100, NaN = unknown species
+    grade: np.ndarray        # (H/cell, W/cell) 0-5
+    elapsed: float
+    tiles_per_s: float
+
+
+class TiledAnalyzer:
+    """Classifies a still as overlapping tiles and merges them into region maps.
+
+    The tiles are crops (views) of the frame and go through the classifier's
+    predict_batch in chunks of batch_size, so with batch_size >= number of
+    tiles the whole still is one model call. Each tile's probabilities are
+    added to every map cell it covers; cells covered by several tiles get
+    the average. The merged distribution per cell gives the species map and,
+    via FlammabilityScorer, the flammability map.
+    """
+
+    def __init__(self, classifier, grid=3, overlap=0.25, batch_size=16, cell=8, moisture=0.5):
+        _check_tiling(grid, overlap)
+        self.classifier = classifier
+        self.grid = grid
+        self.overlap = overlap
+        self.batch_size = max(1, batch_size)
+        self.cell = cell
+        self.moisture = moisture
+        self.scorer = None
+        self.tiles = 0
+        self.seconds = 0.0
+
+    def analyze(self, frame):
+        h, w = frame.shape[:2]
+        boxes = tile_boxes(h, w, self.grid, self.overlap)
+        crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in boxes]
+
+        start = time.perf_counter()
+        probs = []
+        for i in range(0, len(crops), self.batch_size):
+            probs.extend(p.probs for p in self.classifier.predict_batch(crops[i:i + self.batch_size]))
+        elapsed = time.perf_counter() - start
+        INFERENCE_SECONDS.observe(elapsed, pipeline="tiled")
+        self.tiles += len(crops)
+        self.seconds += elapsed
+        tile_probs = np.stack(probs).astype(np.float32)
+
+        # Kacheln auf ein grobes Raster aufsummieren, überlappende Zellen mitteln
+        names = self.classifier.names
+        if self.scorer is None:
+            self.scorer = FlammabilityScorer(names)
+        c = self.cell
+        gh, gw = -(-h // c), -(-w // c)
+        total = np.zeros((gh, gw, tile_probs.shape[1]), dtype=np.float32)
+        count = np.zeros((gh, gw, 1), dtype=np.float32)
+        for (x0, y0, x1, y1), p in zip(boxes, tile_probs):
+            total[y0 // c:-(-y1 // c), x0 // c:-(-x1 // c)] += p
+            count[y0 // c:-(-y1 // c), x0 // c:-(-x1 // c)] += 1
+        merged = total / np.maximum(count, 1)
+
+        conf = merged.max(axis=2)
+        species = np.where(conf > CONFIDENCE_THRESHOLD, merged.argmax(axis=2), -1)
+        index = self.scorer.index(merged.reshape(-1, merged.shape[2]), self.moisture).reshape(gh, gw)
+        grade = np.where(np.isnan(index), 0, np.searchsorted(GRADE_BOUNDS, np.nan_to_num(index), side="right") + 1)
+        grade = np.where(species >= 0, grade, 0)
+
+        mean = merged.reshape(-1, merged.shape[2]).mean(axis=0)
+        top1 = int(np.argmax(mean))
+        overall = Prediction(names[top1], float(mean[top1]), top1, mean)
+        return TiledResult(overall, boxes, tile_probs, c, species, conf, index, grade.astype(np.uint8),
+                           elapsed, len(crops) / elapsed if elapsed else 0.0)
+
+    def summary(self, result, top=3):
+        """Species by share of the image, e.g. 'quercus 55% · pinus 30%'."""
+        ids, counts = np.unique(result.species[result.species >= 0], return_counts=True)
+        if not len(ids):
+            return "no species above threshold"
+        share = counts / result.species.size
+        order = np.argsort(share)[::-1][:top]
+        return " · ".join(f"{self.classifier.names[int(ids[i])]} {share[i]:.0%}" for i in order)
+
+    def render(self, frame, result, alpha=0.4):
+        """Flammability grade colours blended over the frame (BGR), with the top-1 species per tile."""
+        h, w = frame.shape[:2]
+        palette = np.array([_bgr(color) for color in GRADE_COLORS], dtype=np.uint8)
+        heat = cv2.resize(palette[result.grade], (w, h), interpolation=cv2.INTER_NEAREST)
+        mask = cv2.resize((result.grade > 0).astype(np.uint8), (w, h), interpolation=cv2.INTER_NEAREST).astype(bool)
+        out = frame.copy()
+        out[mask] = cv2.addWeighted(frame, 1 - alpha, heat, alpha, 0)[mask]
+
+        names = self.classifier.names
+        scale = max(0.35, min(h, w) / 900)
+        for (x0, y0, x1, y1), p in zip(result.boxes, result.tile_probs):
+            class_id = int(np.argmax(p))
+            cv2.rectangle(out, (int(x0), int(y0)), (int(x1) - 1, int(y1) - 1), (255, 255, 255), 1)
+            cx, cy = int((x0 + x1) // 2), int((y0 + y1) // 2)
+            cv2.putText(out, f"{names[class_id]} {p[class_id]:.2f}", (cx - int(40 * scale / 0.5), cy),
+                        cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 1, cv2.LINE_AA)
+        return out
+
+    def stats(self):
+        return {"tiles": self.tiles, "tiles_per_s": round(self.tiles / self.seconds, 2) if self.seconds else 0.0}
+
+
+def _bgr(color):
+    value = color.lstrip("#")
+    r, g, b = (int(value[i:i + 2], 16) for i in (0, 2, 4))
+    return b, g, r
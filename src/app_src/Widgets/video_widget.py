@@ -0,0 +1,54 @@
+from PySide6.QtWidgets import QWidget, QSizePolicy
+from PySide6.QtGui import QImage, QPainter, QColor, QFont
+from PySide6.QtCore import Qt
+
+
+class VideoWidget(QWidget):
+    """Paints the current camera frame with QPainter, scaled to the widget.
+
+    The QImage is a view on a pooled numpy buffer (no QPixmap upload); the
+    buffer stays retained until the next frame replaces it, so it cannot be
+    reused while a repaint is still pending.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.image = None
+        self.text = ""
+        self._buffer = None
+        self._release = None
+        self.font = QFont()
+        self.font.setPixelSize(24)
+        self.font.setBold(True)
+
+    def set_frame(self, buffer, text="", retain=None, release=None):
+        """Show an RGB888 buffer. retain/release manage pooled buffers (see FramePool)."""
+        if retain is not None:
+            retain(buffer)
+        if self._buffer is not None and self._release is not None:
+            self._release(self._buffer)
+        self._buffer, self._release = buffer, release
+        h, w, ch = buffer.shape
+        self.image = QImage(buffer.data, w, h, ch * w, QImage.Format_RGB888)
+        self.text = text
+        self.update()
+
+    def clear(self):
+        if self._buffer is not None and self._release is not None:
+            self._release(self._buffer)
+        self._buffer = self._release = self.image = None
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.image is None:
+            painter.fillRect(self.rect(), QColor(0, 0, 0))
+            return
+        # Bild auf die Widgetgröße strecken (wie früher setScaledContents); Text skaliert mit
+        painter.scale(self.width() / self.image.width(), self.height() / self.image.height())
+        painter.drawImage(0, 0, self.image)
+        if self.text:
+            painter.setFont(self.font)
+            painter.setPen(QColor(0, 255, 0))
+            painter.drawText(20, 40, self.text)
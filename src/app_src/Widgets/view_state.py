@@ -0,0 +1,71 @@
+from typing import NamedTuple
+from Widgets.flammability import calculate_flammability
+
+# Schwellenwert, unter dem kein Baum als erkannt gilt
+CONFIDENCE_THRESHOLD = 0.7
+INSTRUCTION_TEXT = "Bitte bewegen Sie die Kamera oder passen Sie den Abstand zum Baum an."
+
+DEFAULT_GRADE_STYLE = "background-color: #34495e; color: white; font-weight: bold; border: 1px solid #7f8c8d; border-radius: 4px;"
+ACTIVE_GRADE_STYLE = "background-color: {color}; color: black; font-weight: bold; border: 2px solid white; border-radius: 4px;"
+
+
+class ViewState(NamedTuple):
+    """Everything the Pi camera window shows about the current classification."""
+    grade: int = 0          # 1-5, 0 = no grade highlighted
+    color: str = ""
+    label: str = ""         # drawn on the video, empty below the threshold
+    conf: float = 0.0
+    overlay_text: str = ""  # centred instruction, empty = hidden
+
+
+def view_state_for(pred_label, conf, probs=None, scorer=None):
+    """Map a result to the view: grade tile and label above the threshold, instruction below.
+
+    With the full probability vector and a FlammabilityScorer the grade is the
+    probability-weighted expectation, so a borderline second species no longer
+    makes the grade jump; otherwise the top-1 species alone decides.
+    """
+    if conf > CONFIDENCE_THRESHOLD:
+        if probs is not None and scorer is not None:
+            grade, color = scorer.grade(probs)
+        else:
+            grade, color = calculate_flammability(pred_label)
+        return ViewState(grade, color, pred_label, conf, "")
+    return ViewState(conf=conf, overlay_text=INSTRUCTION_TEXT)
+
+
+class ViewRenderer:
+    """Applies a ViewState to the widgets, touching only what changed since the last render.
+
+    setStyleSheet re-parses CSS and triggers relayout/repaint, so a tile is only
+    restyled when it becomes or stops being the highlighted grade.
+    """
+
+    def __init__(self, grade_widgets, overlay_label, place_overlay):
+        self.grade_widgets = grade_widgets
+        self.overlay_label = overlay_label
+        self.place_overlay = place_overlay
+        self.state = ViewState()
+        self.widget_updates = 0
+
+    def render(self, state):
+        previous = self.state
+        if (state.grade, state.color) != (previous.grade, previous.color):
+            if 1 <= previous.grade <= len(self.grade_widgets):
+                self.grade_widgets[previous.grade - 1].setStyleSheet(DEFAULT_GRADE_STYLE)
+                self.widget_updates += 1
+            if 1 <= state.grade <= len(self.grade_widgets):
+                self.grade_widgets[state.grade - 1].setStyleSheet(ACTIVE_GRADE_STYLE.format(color=state.color))
+                self.widget_updates += 1
+
+        if state.overlay_text != previous.overlay_text:
+            if state.overlay_text:
+                self.overlay_label.setText(state.overlay_text)
+                self.place_overlay()
+                self.overlay_label.show()
+            else:
+                self.overlay_label.hide()
+            self.widget_updates += 1
+
+        self.state = state
+        return state != previous
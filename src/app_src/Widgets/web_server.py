@@ -0,0 +1,137 @@
+import re
+import threading
+from flask import Flask, Response, abort, request, render_template_string
+from werkzeug.serving import make_server, WSGIRequestHandler
+from Widgets.cpu_plan import cpu_plan
+from Widgets.metrics import metrics
+
+SETUP_PAGE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>BotanIdent</title>
+    <style>
+        body { font-family: sans-serif; text-align: center; margin-top: 40px; }
+        input { padding: 10px; font-size: 18px; }
+        button { padding: 10px 20px; font-size: 18px; margin-top: 10px; }
+        .stream { display: inline-block; margin: 20px 10px; }
+        .stream img { max-width: 95vw; border-radius: 4px; background: #000; }
+        .result { font-size: 20px; font-weight: bold; margin-top: 6px; }
+    </style>
+</head>
+<body>
+    {% if message %}<h3>{{ message }}</h3>{% endif %}
+    <h2>Enter DroidCam IP Address</h2>
+    {% if multi_stream %}<p>Several phones: separate the addresses with commas.</p>{% endif %}
+    <form method="post">
+        <input name="ip" placeholder="192.168.x.x" required>
+        <br><button type="submit">Connect</button>
+    </form>
+    {% for name in streams %}
+    <div class="stream">
+        <img src="/stream/{{ name }}.mjpg" alt="{{ name }}">
+        <div class="result" id="result-{{ name }}">{{ name }}</div>
+    </div>
+    {% endfor %}
+    {% if not streams %}<p>No camera is running yet; reload this page once a stream has started.</p>{% endif %}
+    <script>
+    {% for name in streams %}
+    new EventSource("/events/{{ name }}").onmessage = function (e) {
+        var r = JSON.parse(e.data);
+        document.getElementById("result-{{ name }}").textContent =
+            r.label + " (" + r.conf.toFixed(2) + ")" + (r.grade ? " – Grad " + r.grade : "");
+    };
+    {% endfor %}
+    </script>
+</body>
+</html>
+"""
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args):
+        pass  # kein Log pro Scrape auf der Pi-Konsole
+
+
+class WebServer:
+    """A Flask app served from a daemon thread for the lifetime of the app.
+
+    serve_metrics() adds /metrics (Prometheus text format); serve_setup() adds
+    the DroidCam setup form plus the live previews of a PreviewHub as MJPEG
+    (/stream/<name>.mjpg) and server-sent events (/events/<name>). start()
+    binds the port once and returns False if it is taken.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9100):
+        self.host = host
+        self.port = port
+        self.app = Flask(__name__)
+        self._server = None
+        self._thread = None
+
+    def serve_metrics(self):
+        self.app.add_url_rule("/metrics", "metrics", self._metrics)
+        return self
+
+    def _metrics(self):
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    def serve_setup(self, on_connect, hub, multi_stream=False):
+        """on_connect(ip) is called (in the request thread) for every submitted DroidCam address."""
+        self.on_connect = on_connect
+        self.hub = hub
+        self.multi_stream = multi_stream
+        self.app.add_url_rule("/", "index", self._index, methods=["GET", "POST"])
+        self.app.add_url_rule("/stream/<name>.mjpg", "stream", self._stream)
+        self.app.add_url_rule("/events/<name>", "events", self._events)
+        return self
+
+    def _index(self):
+        message = None
+        if request.method == "POST":
+            ips = [ip for ip in re.split(r"[,\s]+", request.form.get("ip", "")) if ip]
+            if not self.multi_stream:
+                ips = ips[:1]
+            for ip in ips:
+                threading.Thread(target=self.on_connect, args=(ip,), daemon=True).start()
+            if ips:
+                message = "✅ Connecting… the live view appears below once the stream is running."
+        return render_template_string(SETUP_PAGE, message=message, streams=self.hub.names(),
+                                      multi_stream=self.multi_stream)
+
+    def _channel(self, name):
+        channel = self.hub.get(name)
+        if channel is None or channel.closed:
+            abort(404)
+        return channel
+
+    def _stream(self, name):
+        channel = self._channel(name)
+        return Response(channel.mjpeg(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
+    def _events(self, name):
+        channel = self._channel(name)
+        return Response(channel.events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    def start(self):
+        try:
+            self._server = make_server(self.host, self.port, self.app, threaded=True, request_handler=_QuietHandler)
+        except OSError as e:
+            print(f"❌ Web server could not listen on {self.host}:{self.port}: {e}")
+            return False
+        self._thread = threading.Thread(target=self._serve, args=(self._server,), name=f"web server :{self.port}",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    @staticmethod
+    def _serve(server):
+        cpu_plan.pin("web")  # Request-Threads erben die Kerne
+        server.serve_forever()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
@@ -0,0 +1,935 @@
+"""Headless benchmarks for the frame pipeline.
+
+    python benchmark.py pipeline --source file:clips/hedge.mp4@max --frames 300 --json before.json
+    python benchmark.py backends --source clips/hedge.mp4 --backend torch --backend onnx
+    python benchmark.py gate --source clips/survey.mp4 --threshold 3 --threshold 6 --threshold 10
+    python benchmark.py multistream --source synthetic@30 --streams 4 --batch 1 --batch 4
+    python benchmark.py mjpeg --source synthetic:640x480@30 --scale 1 --scale 4
+    python benchmark.py tiles --source file:clips/hedge.mp4 --grid 3 --batch 1 --batch 16
+    python benchmark.py cascade --source clips/survey.mp4 --gate-model small.pt --band 0.5:0.9 --band 0.6:0.8
+    python benchmark.py processes --source file:clips/hedge.mp4 --seconds 30
+    python benchmark.py startup --backend torch --backend torchscript --runs 5
+    python benchmark.py thermal --source clips/hedge.mp4 --minutes 30 --log soak.csv
+    python benchmark.py threads --source clips/hedge.mp4 --threads 1 --threads 2 --threads 4 --layout "inference=1-3;capture=0;gui=0"
+
+Results are printed as a table and optionally written as JSON so runs can be
+diffed between commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+# Kein Bildschirm nötig: Qt rendert in einen Offscreen-Puffer
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Widgets.frame_sources import create_frame_source, VideoFileSource
+from Widgets.profiling import NullStageTimer, StageTimer, summarize
+from Widgets.inference_backends import BACKENDS, load_classifier
+from Widgets.scene_gate import SceneChangeGate
+from Widgets.batch_inference import BatchInferenceService
+from Widgets.session_recorder import SessionRecorder
+from Widgets.tiling import TiledAnalyzer, tile_boxes
+from Widgets.cascade import outcome
+from Widgets.cpu_plan import CpuPlan, cpu_plan, format_affinity, parse_affinity
+from Widgets.frame_grabber import FrameGrabber
+from Widgets.inference_worker import InferenceWorker, LatestFrameSlot
+from Widgets.thermal import FakeThermalSource, ThermalScheduler, create_thermal_source
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_metadata():
+    return {
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def open_source(spec):
+    """Frame source from a spec; a plain path to an existing clip is replayed at max rate."""
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, rate="max")
+    return create_frame_source(spec)
+
+
+def print_table(title, stages):
+    print(f"\n{title}")
+    print(f"  {'stage':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, s in stages.items():
+        if not s.get("count"):
+            continue
+        print(f"  {name:<14}{s['count']:>7}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['mean_ms']:>10.2f}")
+
+
+def bench_pipeline(args):
+    """Drive CameraWindow.update_frame, the classifier and on_result synchronously, stage by stage."""
+    from PySide6.QtWidgets import QApplication
+    from Widgets.camera_widget import CameraWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    classifier = load_classifier(args.backend, args.model)
+    runs = []
+    for spec in args.source:
+        source = open_source(spec)
+        recorder = SessionRecorder(args.record, classifier.names) if args.record else None
+        window = CameraWindow(source, classifier, autostart=False, recorder=recorder)
+        worker = window.inference_worker
+        timer = StageTimer()
+        end_to_end, gui_thread = [], []
+
+        def one_frame():
+            start = time.perf_counter()
+            predict_s = 0.0
+            window.update_frame()
+            frame = worker.slot.take(timeout=0)
+            if frame is not None:
+                t = time.perf_counter()
+                with window.stage_timer.stage("predict"):
+                    prediction = worker.classify(frame)
+                predict_s = time.perf_counter() - t
+                worker.release(frame)
+                window.on_result(prediction.label, prediction.conf, prediction.probs, predict_s)
+            with window.stage_timer.stage("repaint"):
+                app.processEvents()
+            elapsed = time.perf_counter() - start
+            return frame is not None, elapsed, elapsed - predict_s
+
+        for _ in range(args.warmup):
+            one_frame()
+
+        window.stage_timer = timer
+        frames = 0
+        wall_start = time.perf_counter()
+        while frames < args.frames:
+            ok, elapsed, gui = one_frame()
+            if not ok:
+                break
+            end_to_end.append(elapsed)
+            gui_thread.append(gui)
+            frames += 1
+        wall = time.perf_counter() - wall_start
+
+        # Eigener Durchlauf für Speicher: tracemalloc bremst, deshalb nicht mit der Zeitmessung mischen
+        window.stage_timer = NullStageTimer()
+        transient = []
+        tracemalloc.start()
+        for _ in range(args.alloc_frames):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            window.update_frame()
+            transient.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        memory = window.preprocessor.stats()
+        memory["transient_bytes_per_frame"] = round(sum(transient) / len(transient)) if transient else 0
+        window.close()
+
+        run = {
+            "source": spec,
+            "frames": frames,
+            "stages": timer.summary(),
+            "end_to_end": summarize(end_to_end),
+            "gui_thread": summarize(gui_thread),  # everything except the classifier itself
+            "fps": round(frames / wall, 2) if wall > 0 else 0.0,
+            "memory": memory,
+        }
+        runs.append(run)
+        print_table(f"{spec}: {frames} frames, {run['fps']} FPS sustained", {**run["stages"], "gui_thread": run["gui_thread"], "end_to_end": run["end_to_end"]})
+        print(f"  buffers allocated {memory['pool_allocations']} (pool {memory['pool_size']}), "
+              f"copied {memory['bytes_copied_per_frame'] / 1024:.0f} KiB/frame, "
+              f"transient allocations {memory['transient_bytes_per_frame'] / 1024:.1f} KiB/frame")
+    return {"benchmark": "pipeline", "backend": args.backend, "model": classifier.model_path, "runs": runs}
+
+
+def read_frames(spec, count):
+    """First `count` frames of a source, held in memory so decoding doesn't skew inference timings."""
+    source = open_source(spec)
+    if isinstance(source, VideoFileSource):
+        source.rate = "max"
+    source.open()
+    frames = []
+    while len(frames) < count:
+        frame = source.read()
+        if frame is None:
+            break
+        frames.append(frame)
+    source.close()
+    return frames
+
+
+def bench_backends(args):
+    """Same frames through each inference backend: latency and top-1 agreement with the first backend."""
+    frames = [f for spec in args.source for f in read_frames(spec, args.frames)]
+    results = {}
+    reference = None
+    for backend in args.backend:
+        classifier = load_classifier(backend, args.models.get(backend))
+        for frame in frames[:args.warmup]:
+            classifier.predict(frame)
+        latencies, labels = [], []
+        for frame in frames:
+            start = time.perf_counter()
+            prediction = classifier.predict(frame)
+            latencies.append(time.perf_counter() - start)
+            labels.append(prediction.label)
+        stats = summarize(latencies)
+        stats["fps"] = round(1000.0 / stats["mean_ms"], 2) if stats.get("mean_ms") else 0.0
+        if reference is None:
+            reference = labels
+        stats["top1_agreement"] = round(sum(a == b for a, b in zip(labels, reference)) / max(len(labels), 1), 4)
+        stats["model"] = classifier.model_path
+        results[backend] = stats
+
+    print(f"\n{len(frames)} frames, agreement relative to '{args.backend[0]}'")
+    print(f"  {'backend':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'FPS':>8}{'agree':>8}")
+    for backend, s in results.items():
+        print(f"  {backend:<10}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['fps']:>8.1f}{s['top1_agreement']:>8.3f}")
+    return {"benchmark": "backends", "frames": len(frames), "backends": results}
+
+
+def bench_gate(args):
+    """Scene-change gate hit rate, CPU saved and label agreement for several thresholds.
+
+    Every frame is classified once as ground truth; the gate is then replayed on
+    a simulated clock of `--fps` so max-age refreshes behave like the live camera.
+    """
+    frames = [f for spec in args.source for f in read_frames(spec, args.frames)]
+    classifier = load_classifier(args.backend, args.model)
+    truth, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        truth.append(classifier.predict(frame).label)
+        latencies.append(time.perf_counter() - start)
+    mean_latency = sum(latencies) / max(len(latencies), 1)
+
+    results = {}
+    for threshold in args.threshold:
+        gate = SceneChangeGate(threshold, args.max_age)
+        agree = 0
+        for i, frame in enumerate(frames):
+            now = i / args.fps
+            cached = gate.lookup(frame, now=now)
+            if cached is None:
+                cached = truth[i]
+                gate.store(cached, latencies[i], now=now)
+            agree += cached == truth[i]
+        stats = gate.stats()
+        stats["cpu_saved_fraction"] = round(stats["hits"] / max(len(frames), 1), 4)
+        stats["label_agreement"] = round(agree / max(len(frames), 1), 4)
+        results[str(threshold)] = stats
+
+    print(f"\n{len(frames)} frames, mean inference {mean_latency * 1000:.1f} ms, max age {args.max_age} s")
+    print(f"  {'threshold':<10}{'hit rate':>10}{'forced':>8}{'CPU s':>8}{'agree':>8}")
+    for threshold, s in results.items():
+        print(f"  {threshold:<10}{s['hit_rate']:>10.3f}{s['forced_refreshes']:>8}{s['cpu_saved_s']:>8.2f}{s['label_agreement']:>8.3f}")
+    return {"benchmark": "gate", "frames": len(frames), "mean_inference_ms": round(mean_latency * 1000, 3),
+            "max_age_s": args.max_age, "thresholds": results}
+
+
+def bench_multistream(args):
+    """N paced streams feeding one BatchInferenceService, for each micro-batch size."""
+    classifier = load_classifier(args.backend, args.model)
+    specs = (args.source * args.streams)[:args.streams]
+    results = {}
+    for max_batch in args.batch:
+        service = BatchInferenceService(classifier, max_batch, args.wait_ms / 1000.0)
+        stop = threading.Event()
+
+        def feed(stream_id, spec):
+            source = open_source(spec)
+            source.open()
+            while not stop.is_set():
+                frame = source.read()
+                if frame is None:
+                    break
+                service.submit(stream_id, frame)
+            source.close()
+
+        feeders = []
+        for i, spec in enumerate(specs):
+            service.add_stream(i, spec)
+            feeders.append(threading.Thread(target=feed, args=(i, spec), daemon=True))
+        runner = threading.Thread(target=service.run, daemon=True)
+        runner.start()
+        for t in feeders:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        service.stop()
+        runner.join()
+        for t in feeders:
+            t.join(timeout=2)
+
+        stats = service.stats()
+        stats["served_per_s"] = round(sum(s["served"] for s in stats["streams"].values()) / args.seconds, 2)
+        results[str(max_batch)] = stats
+
+    print(f"\n{len(specs)} streams, {args.seconds:.0f} s per setting")
+    print(f"  {'batch':<7}{'served/s':>10}{'mean batch':>12}{'fairness':>10}{'drop %':>8}{'p95 ms':>9}")
+    for max_batch, s in results.items():
+        streams = s["streams"].values()
+        received = sum(x["received"] for x in streams) or 1
+        drop = 100.0 * sum(x["dropped"] for x in streams) / received
+        p95 = max((x["latency"].get("p95_ms", 0.0) for x in streams), default=0.0)
+        print(f"  {max_batch:<7}{s['served_per_s']:>10.1f}{s['mean_batch']:>12.2f}{s['fairness']:>10.3f}{drop:>8.1f}{p95:>9.1f}")
+    return {"benchmark": "multistream", "streams": specs, "batches": results}
+
+
+def serve_mjpeg(spec, port, quality, ready):
+    """Local stand-in for the DroidCam app: serves a frame source as MJPEG on /video."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import cv2
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            source = open_source(spec)
+            source.open()
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            try:
+                while True:
+                    frame = source.read()
+                    if frame is None:
+                        break
+                    _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % jpeg.size)
+                    self.wfile.write(jpeg.tobytes())
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                source.close()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    ready.set()
+    server.serve_forever()
+
+
+def bench_mjpeg(args):
+    """Client CPU per frame: cv2.VideoCapture vs. the built-in MJPEG client at reduced decode scales."""
+    import multiprocessing
+    from Widgets.frame_sources import MjpegSource, VideoCaptureSource
+
+    # Server in eigenem Prozess, damit process_time() nur den Client misst
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Event()
+    server = ctx.Process(target=serve_mjpeg, args=(args.source, args.port, args.quality, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+    url = f"http://127.0.0.1:{args.port}/video"
+
+    clients = [("VideoCapture", lambda: VideoCaptureSource(url), "read")]
+    for scale in args.scale:
+        clients.append((f"mjpeg 1/{scale}", lambda scale=scale: MjpegSource(url, scale=scale), "read"))
+    clients.append(("mjpeg grab only", lambda: MjpegSource(url), "grab"))
+
+    results = {}
+    try:
+        for name, make, method in clients:
+            source = make()
+            if not source.open():
+                print(f"Could not open {url} with {name}")
+                continue
+            read = getattr(source, method)
+            for _ in range(args.warmup):
+                read()
+            frame = None
+            cpu, wall = time.process_time(), time.perf_counter()
+            for _ in range(args.frames):
+                frame = read()
+            cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+            source.close()
+            results[name] = {
+                "cpu_ms_per_frame": round(cpu * 1000.0 / args.frames, 3),
+                "fps": round(args.frames / wall, 2),
+                "output": "x".join(map(str, frame.shape[1::-1])) if hasattr(frame, "shape") else "-",
+            }
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"\n{args.source} as MJPEG (quality {args.quality}), {args.frames} frames per client")
+    print(f"  {'client':<18}{'CPU ms/frame':>14}{'FPS':>8}{'output':>10}")
+    for name, r in results.items():
+        print(f"  {name:<18}{r['cpu_ms_per_frame']:>14.2f}{r['fps']:>8.1f}{r['output']:>10}")
+    return {"benchmark": "mjpeg", "source": args.source, "quality": args.quality, "clients": results}
+
+
+def bench_tiles(args):
+    """Tiled still analysis: tiles per second for each predict batch size on the same stills."""
+    frames = [f for spec in args.source for f in read_frames(spec, args.frames)]
+    classifier = load_classifier(args.backend, args.model)
+    h, w = frames[0].shape[:2]
+    tiles = len(tile_boxes(h, w, args.grid, args.overlap))
+    results = {}
+    for batch in args.batch:
+        analyzer = TiledAnalyzer(classifier, args.grid, args.overlap, batch)
+        for frame in frames[:args.warmup]:
+            analyzer.analyze(frame)
+        latencies = []
+        for frame in frames:
+            latencies.append(analyzer.analyze(frame).elapsed)
+        stats = summarize(latencies)
+        stats["tiles_per_s"] = round(tiles * len(latencies) / sum(latencies), 2) if latencies else 0.0
+        results[str(batch)] = stats
+
+    print(f"\n{len(frames)} stills of {w}x{h}, {tiles} tiles each (grid {args.grid}, overlap {args.overlap})")
+    print(f"  {'batch':<8}{'p50 ms':>10}{'p95 ms':>10}{'tiles/s':>10}")
+    for batch, s in results.items():
+        print(f"  {batch:<8}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['tiles_per_s']:>10.1f}")
+    return {"benchmark": "tiles", "frames": len(frames), "tiles_per_frame": tiles, "grid": args.grid,
+            "overlap": args.overlap, "batches": results}
+
+
+def timed_predictions(classifier, frames, warmup):
+    for frame in frames[:warmup]:
+        classifier.predict(frame)
+    predictions, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        predictions.append(classifier.predict(frame))
+        latencies.append(time.perf_counter() - start)
+    return predictions, latencies
+
+
+def bench_cascade(args):
+    """Early-exit fraction, agreement with the full model and estimated speed-up per threshold band.
+
+    Both models classify every frame once; each band is then replayed from
+    those results, so the full model's answer is the ground truth and a frame
+    costs the gate latency plus the full latency only when it escalates.
+    """
+    frames = [f for spec in args.source for f in read_frames(spec, args.frames)]
+    full, full_latency = timed_predictions(load_classifier(args.backend, args.model), frames, args.warmup)
+    gate, gate_latency = timed_predictions(load_classifier(args.gate_backend or args.backend, args.gate_model),
+                                           frames, args.warmup)
+    full_ms = 1000.0 * sum(full_latency) / len(frames)
+    gate_ms = 1000.0 * sum(gate_latency) / len(frames)
+
+    results = {}
+    for low, high in args.band:
+        agree = same_label = escalated = 0
+        for g, f in zip(gate, full):
+            answer = f if low <= g.conf < high else g
+            escalated += answer is f
+            agree += outcome(answer) == outcome(f)
+            same_label += answer.label == f.label
+        n = len(frames)
+        mean_ms = gate_ms + 1000.0 * sum(lat for g, lat in zip(gate, full_latency) if low <= g.conf < high) / n
+        results[f"{low}:{high}"] = {
+            "early_exit_fraction": round(1 - escalated / n, 4),
+            "outcome_agreement": round(agree / n, 4),   # gleiche Anzeige (Art über 0.7 bzw. Hinweis)
+            "top1_agreement": round(same_label / n, 4),
+            "mean_ms": round(mean_ms, 3),
+            "speedup": round(full_ms / mean_ms, 2) if mean_ms else None,
+        }
+
+    print(f"\n{len(frames)} frames, full model {full_ms:.1f} ms, gate model {gate_ms:.1f} ms per frame")
+    print(f"  {'band':<12}{'early exit':>12}{'agree':>8}{'top-1':>8}{'mean ms':>10}{'speed-up':>10}")
+    for band, s in results.items():
+        print(f"  {band:<12}{s['early_exit_fraction']:>12.3f}{s['outcome_agreement']:>8.3f}"
+              f"{s['top1_agreement']:>8.3f}{s['mean_ms']:>10.2f}{s['speedup']:>10.2f}")
+    return {"benchmark": "cascade", "frames": len(frames), "full_ms": round(full_ms, 3), "gate_ms": round(gate_ms, 3),
+            "bands": results}
+
+
+def bench_processes(args):
+    """The live Pi camera window in thread and in process pipeline mode, on the same paced source.
+
+    Each mode runs the real CameraWindow with its timers for --seconds after
+    the first result arrived (the process mode loads its model in the child).
+    Besides preview and inference FPS, a 10 ms probe timer measures how late
+    the GUI event loop runs, i.e. how much capture and inference hold up Qt.
+    """
+    from PySide6.QtCore import QElapsedTimer, QEventLoop, QTimer
+    from PySide6.QtWidgets import QApplication
+    from Widgets.camera_widget import CameraWindow
+    from Widgets.process_pipeline import ProcessPipeline
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    classifier = load_classifier(args.backend, args.model) if "thread" in args.mode else None
+    results = {}
+    for mode in args.mode:
+        if mode == "process":
+            window = CameraWindow(pipeline=ProcessPipeline(args.source, args.backend, args.model, gate=(0.0, 0.0)))
+        else:
+            window = CameraWindow(create_frame_source(args.source), classifier)
+        counts = {"results": 0}
+        window.inference_worker.result_ready.connect(lambda *_: counts.__setitem__("results", counts["results"] + 1))
+
+        loop = QEventLoop()
+        deadline = time.perf_counter() + args.startup_timeout
+        while not counts["results"] and time.perf_counter() < deadline:
+            app.processEvents(QEventLoop.AllEvents, 50)
+            time.sleep(0.01)
+        counts["results"] = 0
+        displayed = window.preprocessor.frames
+
+        lag, clock = [], QElapsedTimer()
+        probe = QTimer()
+        probe.timeout.connect(lambda: (lag.append(max(clock.nsecsElapsed() / 1e6 - 10.0, 0.0) / 1000.0), clock.restart()))
+        clock.start()
+        probe.start(10)
+        QTimer.singleShot(int(args.seconds * 1000), loop.quit)
+        loop.exec()
+        probe.stop()
+
+        displayed = window.preprocessor.frames - displayed
+        stats = window.pipeline.stats() if window.pipeline is not None else {}
+        window.close()
+        results[mode] = {
+            "preview_fps": round(displayed / args.seconds, 2),
+            "inference_fps": round(counts["results"] / args.seconds, 2),
+            "loop_lag": summarize(lag),
+            **({"pipeline": stats} if stats else {}),
+        }
+
+    print(f"\n{args.source}, {args.seconds:.0f} s per mode")
+    print(f"  {'mode':<10}{'preview FPS':>13}{'inference FPS':>15}{'lag p50 ms':>12}{'lag p95 ms':>12}")
+    for mode, r in results.items():
+        lag = r["loop_lag"]
+        print(f"  {mode:<10}{r['preview_fps']:>13.1f}{r['inference_fps']:>15.1f}"
+              f"{lag.get('p50_ms', 0.0):>12.2f}{lag.get('p95_ms', 0.0):>12.2f}")
+    return {"benchmark": "processes", "source": args.source, "seconds": args.seconds, "modes": results}
+
+
+def bench_startup(args):
+    """Cold start of the GUI per backend: python-gui.py in a fresh process until the model is ready.
+
+    Each run writes its --startup-profile JSON; the table shows the median
+    time of each milestone (first paint, modules ready, model ready) and of
+    the slowest background imports over --runs.
+    """
+    import statistics
+    import tempfile
+
+    gui = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python-gui.py")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen") if args.offscreen else None
+    results = {}
+    for backend in args.backend:
+        runs = []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "startup.json")
+                subprocess.run([sys.executable, gui, "--backend", backend, "--web-port", "0", "--metrics-port", "0",
+                                "--startup-profile", path, "--exit-after-startup"],
+                               env=env, cwd=os.path.dirname(gui), check=True, timeout=args.timeout,
+                               stdout=subprocess.DEVNULL)
+                with open(path, encoding="utf-8") as f:
+                    runs.append(json.load(f))
+
+        def median(values):
+            values = [v for v in values if v is not None]
+            return round(statistics.median(values), 3) if values else None
+
+        events = {name: median([r["events"].get(name) for r in runs]) for name in runs[0]["events"]}
+        imports = {name: median([r["imports"].get(name) for r in runs]) for name in runs[0]["imports"]}
+        results[backend] = {
+            "interpreter_s": median([r["interpreter_s"] for r in runs]),
+            "events": events,
+            "slowest_imports": dict(sorted(imports.items(), key=lambda item: -item[1])[:5]),
+        }
+
+    print(f"\nmedian of {args.runs} cold starts")
+    for backend, r in results.items():
+        print(f"  {backend}")
+        if r["interpreter_s"] is not None:
+            print(f"    {'interpreter + early imports':<34}{r['interpreter_s']:>8.2f} s")
+        for name, t in r["events"].items():
+            print(f"    {name:<34}{t:>8.2f} s")
+        for name, t in r["slowest_imports"].items():
+            print(f"    {'import ' + name:<34}{t:>8.2f} s")
+    return {"benchmark": "startup", "runs": args.runs, "backends": results}
+
+
+def _threads_trial(spec, backend, model, threads, affinity, seconds, warmup):
+    """One combination in a fresh process: capture thread, 'GUI' loop and inference thread like the Pi camera.
+
+    A fresh process per combination matters: the runtime's thread pool is
+    created once and keeps the cores of the thread that started it.
+    """
+    cpu_plan.configure(threads, affinity)
+    cpu_plan.pin("gui")
+    source = VideoFileSource(spec) if os.path.isfile(spec) else create_frame_source(spec)  # Clip im Originaltempo
+    grabber = FrameGrabber(source)
+    slot = LatestFrameSlot()
+    predict, end_to_end, shown, errors = [], [], [0], []
+    measuring, ready, stop = threading.Event(), threading.Event(), threading.Event()
+
+    def infer():
+        cpu_plan.pin("inference")
+        try:
+            classifier = load_classifier(backend, model, **cpu_plan.loader_kwargs())
+            for _ in range(warmup):
+                classifier.predict(np.full((224, 224, 3), 114, dtype=np.uint8))
+        except Exception as e:
+            errors.append(e)
+            return
+        finally:
+            ready.set()
+        while not stop.is_set():
+            item = slot.take(timeout=0.1)
+            if item is None:
+                continue
+            frame, grabbed_at = item
+            start = time.perf_counter()
+            classifier.predict(frame)
+            done = time.perf_counter()
+            if measuring.is_set():
+                predict.append(done - start)
+                end_to_end.append(done - grabbed_at)
+
+    worker = threading.Thread(target=infer, name="inference", daemon=True)
+    worker.start()
+    ready.wait()
+    if errors:
+        raise errors[0]
+    grabber.start()
+    deadline = None
+    while deadline is None or time.perf_counter() < deadline:
+        item = grabber.take(timeout=0.5)
+        if item is None:
+            continue
+        if deadline is None:
+            measuring.set()
+            deadline = time.perf_counter() + seconds
+        frame, grabbed_at = item
+        # GUI-Arbeit pro Vorschaubild: drehen und für Qt nach RGB wandeln
+        display = cv2.cvtColor(cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE), cv2.COLOR_BGR2RGB)
+        slot.put((display, grabbed_at))
+        shown[0] += 1
+    stop.set()
+    slot.close()
+    grabber.stop()
+    worker.join(timeout=5)
+    return {
+        "preview_fps": round(shown[0] / seconds, 2),
+        "inference_fps": round(len(predict) / seconds, 2),
+        "predict": summarize(predict),
+        "end_to_end": summarize(end_to_end),
+    }
+
+
+def bench_threads(args):
+    """Inference thread count x core layout on a recorded clip; prints the best combination for this machine.
+
+    Every combination runs the capture thread, a GUI stand-in (rotate and
+    colour-convert each preview frame) and the inference thread for
+    --seconds in its own process. "best throughput" has the highest
+    inference FPS, "best latency" the lowest grab-to-result p95 among the
+    combinations that keep at least 95% of the best preview FPS.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    available = CpuPlan.available()
+    print(f"cores available: {sorted(available) if available is not None else os.cpu_count()}")
+    results = []
+    for layout in args.layout:
+        for threads in args.threads:
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                r = pool.submit(_threads_trial, args.source, args.backend, args.model, threads, layout,
+                                args.seconds, args.warmup).result()
+            r.update(threads=threads, layout=format_affinity(layout))
+            results.append(r)
+            print(f"  threads {threads or 'default':<8} {r['layout']:<36} inference {r['inference_fps']:6.2f} FPS, "
+                  f"p95 {r['end_to_end'].get('p95_ms', 0.0):7.1f} ms, preview {r['preview_fps']:5.1f} FPS")
+
+    def flags(r):
+        rules = [f"--affinity {rule}" for rule in r["layout"].split(";") if rule != "none"]
+        return " ".join([f"--inference-threads {r['threads']}"] + rules)
+
+    best = max(results, key=lambda r: (r["inference_fps"], -r["end_to_end"].get("p95_ms", 0.0)))
+    smooth = [r for r in results if r["preview_fps"] >= 0.95 * max(x["preview_fps"] for x in results)]
+    fastest = min(smooth, key=lambda r: r["end_to_end"].get("p95_ms", float("inf")))
+    print(f"\nbest throughput: {flags(best)}")
+    print(f"best latency:    {flags(fastest)}")
+    return {"benchmark": "threads", "source": args.source, "seconds": args.seconds, "results": results,
+            "best_throughput": flags(best), "best_latency": flags(fastest)}
+
+
+def default_layouts():
+    """No pinning, and - with 2+ cores - capture and GUI on the first core, inference on the rest."""
+    layouts = [{}]
+    available = sorted(CpuPlan.available() or ())
+    if len(available) >= 2:
+        rest = ",".join(map(str, available[1:]))
+        layouts.append(parse_affinity([f"gui={available[0]}", f"capture={available[0]}", f"web={available[0]}",
+                                       f"inference={rest}"]))
+    return layouts
+
+
+def default_thread_counts():
+    cores = len(CpuPlan.available() or ()) or os.cpu_count() or 1
+    return sorted({1, max(1, cores // 2), cores})
+
+
+def layout_arg(text):
+    try:
+        return {} if text == "none" else parse_affinity(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def bench_thermal(args):
+    """Long run of the Pi camera inference at the 30 ms timer rate, logging temperature and sustained throughput.
+
+    The clip feeds an InferenceWorker like the camera window does; the
+    ThermalScheduler steps once a second. With --no-limit it only measures
+    (the behaviour before the scheduler), so two runs from a cold start show
+    what it buys. --thermal-source fake with a short --fake-tau gives a
+    quick, machine-independent run.
+    """
+    if args.thermal_source == "fake":
+        source = FakeThermalSource(tau=args.fake_tau, ambient=args.fake_ambient)
+    else:
+        source = create_thermal_source(args.thermal_source)
+        if not source.available:
+            raise SystemExit("no CPU temperature readable on this machine; try --thermal-source fake")
+    classifier = load_classifier(args.backend, args.model)
+    light = load_classifier(args.light_backend or args.backend, args.light_model) if args.light_model else None
+    scheduler = ThermalScheduler(source, args.soft, args.hard, min_rate=args.min_rate, light=light,
+                                 log_every=args.log_every, csv_path=args.log)
+    worker = InferenceWorker(classifier)
+    scheduler.attach(worker, classifier)
+    worker.scheduler = scheduler
+    if args.no_limit:
+        scheduler.max_step = 0.0  # misst nur, bremst nicht
+        scheduler.light = None
+    thread = threading.Thread(target=worker.run, name="inference", daemon=True)
+    thread.start()
+
+    frames = open_source(args.source)
+    if not frames.open():
+        raise SystemExit(f"could not open {args.source}")
+    deadline = time.perf_counter() + args.minutes * 60.0
+    next_step = time.perf_counter() + 1.0
+    try:
+        while time.perf_counter() < deadline:
+            frame = frames.read()
+            if frame is not None:
+                worker.submit(frame)
+            if time.perf_counter() >= next_step:
+                scheduler.step()
+                next_step += 1.0
+            time.sleep(0.03)  # Takt des Kamera-Timers
+    finally:
+        worker.stop()
+        thread.join(timeout=5)
+        frames.close()
+
+    summary = scheduler.summary()
+    print(f"\n{source.describe()}, {args.minutes:g} min, {'no limit' if args.no_limit else 'scheduler on'}")
+    for key, value in summary.items():
+        print(f"  {key:<22}{value}")
+    return {"benchmark": "thermal", "source": args.source, "no_limit": args.no_limit, "summary": summary,
+            "rows": list(scheduler.rows)}
+
+
+def threshold_band(text):
+    low, _, high = text.partition(":")
+    return float(low), float(high)
+
+
+def model_override(text):
+    backend, _, path = text.partition("=")
+    if backend not in BACKENDS or not path:
+        raise argparse.ArgumentTypeError("expected BACKEND=PATH")
+    return backend, path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pipeline", help="per-stage latency of the Pi camera frame pipeline")
+    p.add_argument("--source", action="append", required=True,
+                   help="clip path or frame source spec (repeatable), e.g. file:clip.mp4@max, synthetic:240x400@max")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None, help="model file; defaults to the backend's standard artifact")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--alloc-frames", type=int, default=50, help="frames for the tracemalloc allocation pass")
+    p.add_argument("--record", metavar="DIR", default=None, help="also record the session below DIR (adds a 'record' stage)")
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("backends", help="side-by-side classifier latency of the inference backends")
+    p.add_argument("--source", action="append", required=True, help="clip path or frame source spec (repeatable)")
+    p.add_argument("--backend", action="append", choices=BACKENDS, default=None,
+                   help="backend to compare (repeatable, default: all); the first one is the accuracy reference")
+    p.add_argument("--model-path", dest="models", action="append", type=model_override, default=[],
+                   help="override a backend's model, e.g. onnx=treeDetection.onnx")
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_backends)
+
+    p = sub.add_parser("gate", help="tune the scene-change gate thresholds on a recorded clip")
+    p.add_argument("--source", action="append", required=True, help="clip path or frame source spec (repeatable)")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None)
+    p.add_argument("--threshold", action="append", type=float, default=None, help="threshold to try (repeatable)")
+    p.add_argument("--max-age", type=float, default=2.0)
+    p.add_argument("--fps", type=float, default=30.0, help="camera rate used for the simulated clock")
+    p.add_argument("--frames", type=int, default=600)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_gate)
+
+    p = sub.add_parser("multistream", help="micro-batched inference for several camera streams")
+    p.add_argument("--source", action="append", required=True,
+                   help="frame source spec per stream (repeatable, reused cyclically), e.g. synthetic@30")
+    p.add_argument("--streams", type=int, default=4)
+    p.add_argument("--batch", action="append", type=int, default=None, help="max micro-batch to try (repeatable)")
+    p.add_argument("--wait-ms", type=float, default=20.0)
+    p.add_argument("--seconds", type=float, default=20.0)
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_multistream)
+
+    p = sub.add_parser("mjpeg", help="DroidCam client CPU per frame against a local MJPEG stand-in server")
+    p.add_argument("--source", default="synthetic:640x480@max", help="frame source the stand-in server streams")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--quality", type=int, default=80, help="JPEG quality of the stand-in server")
+    p.add_argument("--scale", action="append", type=int, choices=[1, 2, 4, 8], default=None,
+                   help="reduced decode scale to try (repeatable)")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_mjpeg)
+
+    p = sub.add_parser("tiles", help="tiles per second of the tiled still analysis for several batch sizes")
+    p.add_argument("--source", action="append", required=True, help="clip path or frame source spec (repeatable)")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None)
+    p.add_argument("--grid", type=int, default=3, help="tiles along the shorter side")
+    p.add_argument("--overlap", type=float, default=0.25)
+    p.add_argument("--batch", action="append", type=int, default=None, help="predict batch size to try (repeatable)")
+    p.add_argument("--frames", type=int, default=30)
+    p.add_argument("--warmup", type=int, default=2)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_tiles)
+
+    p = sub.add_parser("cascade", help="early exit of a small gate model in front of the full classifier")
+    p.add_argument("--source", action="append", required=True, help="clip path or frame source spec (repeatable)")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None, help="full model; defaults to the backend's standard artifact")
+    p.add_argument("--gate-model", required=True, help="small model with the same classes")
+    p.add_argument("--gate-backend", choices=BACKENDS, default=None, help="runtime of the gate model (default: --backend)")
+    p.add_argument("--band", action="append", type=threshold_band, default=None,
+                   help="LOW:HIGH gate confidence band that escalates to the full model (repeatable)")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_cascade)
+
+    p = sub.add_parser("processes", help="Pi camera window in thread vs. shared-memory process pipeline mode")
+    p.add_argument("--source", required=True,
+                   help="paced frame source spec both modes open, e.g. file:clip.mp4 or synthetic:400x240@30")
+    p.add_argument("--mode", action="append", choices=("thread", "process"), default=None,
+                   help="pipeline mode to run (repeatable; default both)")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None)
+    p.add_argument("--seconds", type=float, default=20.0, help="measured time per mode")
+    p.add_argument("--startup-timeout", type=float, default=120.0, help="seconds to wait for the first result")
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_processes)
+
+    p = sub.add_parser("startup", help="time from launching the GUI to a ready model, per backend")
+    p.add_argument("--backend", action="append", choices=BACKENDS, default=None,
+                   help="backend to start with (repeatable, default: torch)")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--timeout", type=float, default=300.0, help="seconds one start may take")
+    p.add_argument("--offscreen", action="store_true", help="run the GUI without a display (QT_QPA_PLATFORM=offscreen)")
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("thermal", help="long run logging CPU temperature, clock and sustained inference throughput")
+    p.add_argument("--source", required=True, help="clip path or frame source spec")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None)
+    p.add_argument("--light-model", default=None, help="lighter model with the same classes to switch to")
+    p.add_argument("--light-backend", choices=BACKENDS, default=None)
+    p.add_argument("--minutes", type=float, default=30.0)
+    p.add_argument("--soft", type=float, default=70.0)
+    p.add_argument("--hard", type=float, default=78.0)
+    p.add_argument("--min-rate", type=float, default=0.5)
+    p.add_argument("--no-limit", action="store_true", help="only measure, never lower the rate or switch models")
+    p.add_argument("--thermal-source", choices=("sysfs", "fake"), default="sysfs")
+    p.add_argument("--fake-tau", type=float, default=120.0, help="time constant (s) of the simulated SoC")
+    p.add_argument("--fake-ambient", type=float, default=40.0, help="idle temperature of the simulated SoC")
+    p.add_argument("--log-every", type=float, default=60.0, help="seconds between log rows")
+    p.add_argument("--log", metavar="CSV", default=None, help="append the log rows to this CSV file")
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_thermal)
+
+    p = sub.add_parser("threads", help="sweep inference threads and core pinning per pipeline role on a clip")
+    p.add_argument("--source", required=True, help="recorded clip (played at its own rate) or frame source spec")
+    p.add_argument("--backend", choices=BACKENDS, default="torch")
+    p.add_argument("--model", default=None)
+    p.add_argument("--threads", action="append", type=int, default=None,
+                   help="inference thread count to try (repeatable, 0 = runtime default; default: 1, cores/2, cores)")
+    p.add_argument("--layout", action="append", type=layout_arg, default=None,
+                   help="core layout 'ROLE=CORES;ROLE=CORES' or 'none' (repeatable; default: none and a split "
+                        "of core 0 for capture/GUI/web and the rest for inference)")
+    p.add_argument("--seconds", type=float, default=20.0, help="measured time per combination")
+    p.add_argument("--warmup", type=int, default=5)
+    p.add_argument("--json", help="write results to this file")
+    p.set_defaults(func=bench_threads)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "backends":
+        args.backend = args.backend or list(BACKENDS)
+        args.models = dict(args.models)
+    if args.command == "gate":
+        args.threshold = args.threshold or [3.0, 6.0, 10.0]
+    if args.command == "multistream":
+        args.batch = args.batch or [1, args.streams]
+    if args.command == "mjpeg":
+        args.scale = args.scale or [1, 2, 4]
+    if args.command == "processes":
+        args.mode = args.mode or ["thread", "process"]
+    if args.command == "cascade":
+        args.band = args.band or [(0.4, 0.95), (0.5, 0.9), (0.6, 0.8)]
+    if args.command == "threads":
+        args.threads = args.threads or default_thread_counts()
+        args.layout = args.layout or default_layouts()
+    if args.command == "startup":
+        args.backend = args.backend or ["torch"]
+    if args.command == "tiles":
+        args.batch = args.batch or [1, 4, 16]
+    report = args.func(args)
+    report["meta"] = run_metadata()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Offline classification of survey photos and videos with a pool of worker processes.
+
+    python classify_folder.py data/survey --output survey.jsonl --backend onnx --workers 8
+    python classify_folder.py data/survey --output survey.csv --video-stride 30
+
+Every image, and every --video-stride'th frame of each video, is classified
+and scored for flammability. Results are appended to the output file (JSONL or
+CSV, by extension) batch by batch; running the same command again skips
+everything already in the file, so an interrupted run simply continues. Videos
+are split into frame ranges of one batch each, so long survey videos are
+saved incrementally too.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+import numpy as np
+
+from Widgets.flammability import FlammabilityScorer, calculate_flammability
+from Widgets.inference_backends import BACKENDS, load_classifier
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".h264")
+CSV_FIELDS = ["path", "frame", "label", "conf", "index", "grade", "grade_top1", "top5", "error"]
+
+# Pro Worker-Prozess einmal geladen (siehe _init_worker)
+_classifier = None
+_scorer = None
+_moisture = 0.5
+
+
+def list_inputs(folder):
+    """Sorted (images, videos) below folder."""
+    images, videos = [], []
+    for root, _, files in os.walk(folder):
+        for f in files:
+            ext = os.path.splitext(f)[1].lower()
+            if ext in IMAGE_EXTENSIONS:
+                images.append(os.path.join(root, f))
+            elif ext in VIDEO_EXTENSIONS:
+                videos.append(os.path.join(root, f))
+    return sorted(images), sorted(videos)
+
+
+def _truncate_partial_line(path):
+    """Cut off a half-written last line left by a killed run, so appending stays valid."""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(max(size - 65536, 0))
+        tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        cut = tail.rfind(b"\n")
+        f.truncate(size - len(tail) + cut + 1 if cut >= 0 else 0)
+
+
+def load_done(path):
+    """Keys (path, frame) of all records already in the output file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    _truncate_partial_line(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+            for row in rows:
+                done.add((row["path"], int(row["frame"]) if row["frame"] else None))
+        else:
+            for line in f:
+                record = json.loads(line)
+                done.add((record["path"], record["frame"]))
+    return done
+
+
+def _init_worker(backend, model_path, threads, moisture):
+    global _classifier, _scorer, _moisture
+    # Parallelität kommt von den Prozessen; jeder Prozess rechnet mit wenigen Threads
+    cv2.setNumThreads(1)
+    if backend == "torch":
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+        _classifier = load_classifier(backend, model_path)
+    else:
+        _classifier = load_classifier(backend, model_path, threads=threads)
+    _scorer = FlammabilityScorer(_classifier.names)
+    _moisture = moisture
+
+
+def _records(keys, frames):
+    """Classify a batch of frames; one result record per (path, frame) key."""
+    predictions = _classifier.predict_batch(frames)
+    probs = np.stack([p.probs for p in predictions])
+    F = _scorer.index(probs, _moisture)
+    grades, _ = _scorer.grade(probs, _moisture)
+    names = _classifier.names
+    records = []
+    for (path, frame_index), p, f, grade in zip(keys, predictions, F, grades):
+        top5 = np.argsort(p.probs)[::-1][:5]
+        records.append({
+            "path": path,
+            "frame": frame_index,
+            "label": p.label,
+            "conf": round(float(p.conf), 4),
+            "index": None if np.isnan(f) else round(float(f), 2),
+            "grade": int(grade),
+            "grade_top1": calculate_flammability(p.label, _moisture)[0],
+            "top5": [[names[int(i)], round(float(p.probs[i]), 4)] for i in top5],
+        })
+    return records
+
+
+def classify_images(paths):
+    keys, frames, records = [], [], []
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            records.append({"path": path, "frame": None, "error": "unreadable image"})
+            continue
+        keys.append((path, None))
+        frames.append(frame)
+    if frames:
+        records.extend(_records(keys, frames))
+    return records
+
+
+def video_frame_count(path):
+    """Frames in the video per its container, 0 if unknown; None if it cannot be opened."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return None
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return max(count, 0)
+
+
+def classify_video(task):
+    """Every stride'th frame in [start, end) of a video (end None = to the end), in batches.
+
+    Skipped frames are grabbed but not decoded.
+    """
+    path, stride, batch, start, end, done_frames = task
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return [{"path": path, "frame": None, "error": "unreadable video"}]
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    keys, frames, records = [], [], []
+    index = start
+    while (end is None or index < end) and cap.grab():
+        if index % stride == 0 and index not in done_frames:
+            ok, frame = cap.retrieve()
+            if ok:
+                keys.append((path, index))
+                frames.append(frame)
+            if len(frames) == batch:
+                records.extend(_records(keys, frames))
+                keys, frames = [], []
+        index += 1
+    cap.release()
+    if frames:
+        records.extend(_records(keys, frames))
+    return records
+
+
+def _run_task(task):
+    kind, payload = task
+    return classify_images(payload) if kind == "images" else classify_video(payload)
+
+
+class ResultWriter:
+    """Appends records to JSONL or CSV and flushes after every batch."""
+
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.endswith(".csv")
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        if self.csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if new:
+                self._writer.writeheader()
+
+    def write(self, records):
+        for record in records:
+            if self.csv:
+                row = dict(record)
+                row["top5"] = json.dumps(row.get("top5")) if row.get("top5") else ""
+                self._writer.writerow(row)
+            else:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def build_tasks(images, videos, done, batch, stride):
+    """Tasks of at most one batch each; returns (tasks, pending images, pending video frames)."""
+    tasks = []
+    todo = [p for p in images if (p, None) not in done]
+    for i in range(0, len(todo), batch):
+        tasks.append(("images", todo[i:i + batch]))
+    done_frames = {}
+    for path, frame in done:
+        if frame is not None:
+            done_frames.setdefault(path, set()).add(frame)
+    pending_frames = 0
+    for path in videos:
+        if (path, None) in done:  # (path, None) = Video war nicht lesbar
+            continue
+        seen = done_frames.get(path, set())
+        count = video_frame_count(path)
+        if not count:
+            # Nicht lesbar (Fehlerdatensatz) oder Länge unbekannt (z. B. rohes .h264): ein Task fürs ganze Video
+            tasks.append(("video", (path, stride, batch, 0, None, seen)))
+            continue
+        span = batch * stride
+        for start in range(0, count, span):
+            wanted = set(range(start, min(start + span, count), stride)) - seen
+            if wanted:
+                chunk_done = {f for f in seen if start <= f < start + span}
+                tasks.append(("video", (path, stride, batch, start, start + span, chunk_done)))
+                pending_frames += len(wanted)
+    return tasks, len(todo), pending_frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder", help="folder with survey images and videos (searched recursively)")
+    parser.add_argument("--output", required=True, help="results file, .jsonl or .csv; appended to and resumed from")
+    parser.add_argument("--backend", choices=BACKENDS, default="onnx")
+    parser.add_argument("--model", default=None, help="model file; defaults to the backend's standard artifact")
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) - 1, 1))
+    parser.add_argument("--threads", type=int, default=1, help="inference threads per worker process")
+    parser.add_argument("--batch", type=int, default=16, help="images per inference batch")
+    parser.add_argument("--video-stride", type=int, default=15, help="classify every n-th video frame")
+    parser.add_argument("--moisture", type=float, default=0.5, help="fuel moisture for the flammability index")
+    args = parser.parse_args(argv)
+
+    images, videos = list_inputs(args.folder)
+    done = load_done(args.output)
+    tasks, pending_images, pending_frames = build_tasks(images, videos, done, args.batch, args.video_stride)
+    pending = pending_images + pending_frames
+    print(f"📂 {len(images)} images, {len(videos)} videos; {len(done)} results already in {args.output}, "
+          f"{pending_images} images and {pending_frames} video frames to go")
+    if not tasks:
+        return
+
+    writer = ResultWriter(args.output)
+    ctx = multiprocessing.get_context("spawn")
+    start = last_report = time.perf_counter()
+    written = finished = 0
+    try:
+        with ctx.Pool(args.workers, initializer=_init_worker,
+                      initargs=(args.backend, args.model, args.threads, args.moisture)) as pool:
+            for records in pool.imap_unordered(_run_task, tasks):
+                writer.write(records)
+                written += len(records)
+                finished += 1
+                now = time.perf_counter()
+                if now - last_report > 10 or finished == len(tasks):
+                    rate = written / (now - start)
+                    left = max(pending - written, 0) / rate if rate else 0
+                    print(f"  {finished}/{len(tasks)} tasks, {written} results, {rate:.1f}/s, ~{left / 60:.0f} min left")
+                    last_report = now
+    except KeyboardInterrupt:
+        print("⏸ Interrupted; run the same command again to continue.")
+    finally:
+        writer.close()
+    print(f"✅ {written} results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
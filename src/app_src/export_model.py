@@ -0,0 +1,27 @@
+"""Export treeDetection.pt for the TorchScript / ONNX Runtime / OpenVINO backends.
+
+    python export_model.py torchscript
+    python export_model.py onnx
+    python export_model.py openvino
+
+The exported files land next to treeDetection.pt, where --backend
+torchscript/onnx/openvino looks for them by default.
+"""
+import argparse
+
+from Widgets.inference_backends import DEFAULT_MODEL, export_model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("format", choices=("torchscript", "onnx", "openvino"))
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="PyTorch weights to export")
+    parser.add_argument("--imgsz", type=int, default=None, help="input size (defaults to the training size)")
+    args = parser.parse_args(argv)
+
+    path = export_model(args.format, args.model, args.imgsz)
+    print(f"✅ Exported {args.model} -> {path}")
+
+
+if __name__ == "__main__":
+    main()
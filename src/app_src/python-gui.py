@@ -2,24 +2,42 @@
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QHBoxLayout, QPushButton, QLabel, QSizePolicy
 )'''
-from PySide6.QtCore import Qt, Slot, Signal, QThread
+from Widgets.startup import profile, FirstPaintProbe  # als Erstes: Startzeit ab hier gemessen
+from PySide6.QtCore import Qt, Slot, Signal, QThread, QTimer
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QHBoxLayout, QPushButton, QLabel, QSizePolicy, QTextEdit
 )
-from PySide6.QtGui import QImage, QPixmap
-from Widgets.camera_widget import CameraWindow
-from Widgets.droidcam_widget import CameraWindowDroidCam, CameraWorker
+from PySide6.QtGui import QPixmap
+from Widgets.settings import load_settings
+from Widgets.cpu_plan import cpu_plan
+from Widgets.metrics import metrics, rss_bytes, INFERENCE_SECONDS
 import sys
 import threading
-import webbrowser
+from functools import partial
 import socket
-import cv2
-from flask import Flask, request, render_template_string
+
+# Erst nach dem ersten Zeichnen des Fensters im Hintergrund importiert (numpy, cv2, Flask, ...);
+# die Fenster-Methoden importieren daraus lokal, dann ist das nur noch ein Nachschlagen in sys.modules
+HEAVY_MODULES = (
+    "numpy", "cv2", "Widgets.model_registry", "Widgets.frame_sources", "Widgets.scene_gate",
+    "Widgets.camera_widget", "Widgets.droidcam_widget", "Widgets.batch_inference", "Widgets.session_recorder",
+    "Widgets.web_server", "Widgets.preview_stream", "Widgets.adaptive", "Widgets.thermal", "Widgets.tiling",
+    "Widgets.cascade", "Widgets.process_pipeline",
+)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Verbindungen kommen aus dem Flask-Thread; Fenster und QThreads nur im GUI-Thread anlegen
+    droid_stream_requested = Signal(object)
+    modules_loaded = Signal(object)  # None or the import error, from the startup thread
+    stream_finished = Signal(int)    # DroidCam worker ended (from its thread), by stream id
+
+    def __init__(self, settings=None):
         super().__init__()
+        self.settings = settings if settings is not None else load_settings([])
+        # Vor allen weiteren Threads: die erben die Kerne des GUI-Threads, bis sie ihre eigene Rolle setzen
+        cpu_plan.configure(self.settings.inference_threads, self.settings.affinity)
+        cpu_plan.pin("gui")
         self.setWindowTitle("Tree Category Detection Model")
         self.resize(320, 100)
 
@@ -48,6 +66,9 @@ class MainWindow(QMainWindow):
         # Connect buttons to methods
         self.button_picam.clicked.connect(self.connect_pi_camera)
         self.button_droidcam.clicked.connect(self.connect_droid_camera)
+        # Bis Module und Server bereit sind (siehe _finish_startup)
+        self.button_picam.setEnabled(False)
+        self.button_droidcam.setEnabled(False)
         # Info box (for messages)
         self.info_box = QTextEdit()
         self.info_box.setReadOnly(True)
@@ -77,68 +98,218 @@ class MainWindow(QMainWindow):
             print(f"Fehler beim Laden des Logos: {e}")
         # -----------------------------------------------
 
-        self.cam_window_droid = CameraWindowDroidCam()
+        # Wird in _finish_startup gesetzt, sobald die schweren Module geladen sind
+        self.model_entry = None
+        self.classifier = None
+        self.cam_window_droid = None
+        self.cam_window = None
+        self.web_server = None
+        self.setup_server = None
+        self.preview_hub = None
+        self._model_load_reported = False
+
+        # Camera streams: stream id -> (window, thread, worker) per connected phone; ids are never reused
+        self.streams = {}
+        self._next_stream_id = 0
+        self.batch_service = None
+        self.batch_thread = None
+        self.droid_stream_requested.connect(self._start_droid_stream)
+        self.stream_finished.connect(self._forget_stream)
+
+        # Fenster zuerst zeichnen; Module und Modell laden danach im Hintergrund
+        self.modules_loaded.connect(self._finish_startup)
+        FirstPaintProbe(self, self._start_background_loading)
+        self.log_to_gui("⏳ Loading camera and model modules...")
+        if cpu_plan.inference_threads or cpu_plan.affinity:
+            self.log_to_gui(f"🧮 CPU: {cpu_plan.describe()}")
+        self.showFullScreen()
 
-        # Thread + worker
-        self.worker_thread = None
-        self.worker = None
+    def _start_background_loading(self):
+        profile.mark("first paint")
+        threading.Thread(target=self._load_modules, name="startup", daemon=True).start()
 
-        self.showFullScreen()
+    def _load_modules(self):
+        """Startup thread: start the model load as early as possible, then import the rest."""
+        try:
+            profile.import_modules(HEAVY_MODULES[:3])
+            from Widgets.model_registry import registry
+            registry.get(self.settings.backend, self.settings.model)  # lädt in eigenem Thread weiter
+            if self.settings.cascade_model:
+                registry.get(self.settings.cascade_backend or self.settings.backend, self.settings.cascade_model)
+            profile.import_modules(HEAVY_MODULES[3:])
+            self.modules_loaded.emit(None)
+        except Exception as e:
+            self.modules_loaded.emit(e)
+
+    @Slot(object)
+    def _finish_startup(self, error):
+        if error is not None:
+            self.log_to_gui(f"❌ Startup failed: {error!r}")
+            return
+        from Widgets.model_registry import registry
+        from Widgets.droidcam_widget import CameraWindowDroidCam
+        from Widgets.cascade import CascadeClassifier
+        from Widgets.web_server import WebServer
+        from Widgets.preview_stream import PreviewHub
+
+        # Modell im Hintergrund laden und aufwärmen; beide Fenster teilen sich diese eine Instanz
+        self.model_entry = registry.get(self.settings.backend, self.settings.model)
+        self.model_status_timer = QTimer(self)
+        self.model_status_timer.timeout.connect(self._report_model_status)
+        self.model_status_timer.start(500)
+
+        # Optional: kleines Gate-Modell vorschalten, das große Modell nur für unsichere Bilder
+        self.classifier = self.model_entry
+        if self.settings.cascade_model:
+            gate_entry = registry.get(self.settings.cascade_backend or self.settings.backend, self.settings.cascade_model)
+            self.classifier = CascadeClassifier(gate_entry, self.model_entry, self.settings.cascade_low,
+                                                self.settings.cascade_high, self.settings.cascade_audit)
+
+        self.cam_window_droid = CameraWindowDroidCam(self.classifier, self._tiler(self.classifier), self.settings.tiled)
+
+        # Telemetrie: Prometheus-Endpunkt und eine Zusammenfassung im Info-Fenster
+        metrics.register_collector(self._collect_metrics)
+        if self.settings.metrics_port:
+            self.web_server = WebServer(self.settings.metrics_host, self.settings.metrics_port).serve_metrics()
+            if self.web_server.start():
+                self.log_to_gui(f"📈 Metrics at http://{self.settings.metrics_host}:{self.settings.metrics_port}/metrics")
+
+        # Ein Server für die ganze Laufzeit: Setup-Formular fürs Handy und Live-Vorschau aller Kameras
+        self.preview_hub = PreviewHub()
+        if self.settings.web_port:
+            server = WebServer("0.0.0.0", self.settings.web_port)
+            server.serve_setup(self._connect_to_droidcam, self.preview_hub, self.settings.multi_stream)
+            if server.start():
+                self.setup_server = server
+
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self._log_metrics)
+        self.metrics_timer.start(30000)
+
+        self.button_picam.setEnabled(True)
+        self.button_droidcam.setEnabled(True)
+        profile.mark("modules ready")
+        self.log_to_gui(f"✅ Cameras available after {profile.elapsed('modules ready'):.1f} s")
     # Methods for buttons
     def connect_pi_camera(self):
+        from Widgets.camera_widget import CameraWindow
+        from Widgets.frame_sources import create_frame_source
+        from Widgets.scene_gate import SceneChangeGate
+        from Widgets.session_recorder import SessionRecorder
+        from Widgets.adaptive import AdaptiveController
         print("PI Camera clicked")
         # TODO: Open Pi Camera in a new window or start stream
         # Camera feed
-        self.cam_window = CameraWindow()
+        gate = SceneChangeGate(self.settings.gate_threshold, self.settings.gate_max_age)
+        recorder = None
+        if self.settings.record:
+            recorder = SessionRecorder(self.settings.record, thumb_every=self.settings.record_thumb_every,
+                                       meta={"source": self.settings.picam_source, "backend": self.settings.backend})
+            self.log_to_gui(f"💾 Recording session to {recorder.path}")
+        if self.settings.pipeline == "process":
+            self.cam_window = CameraWindow(recorder=recorder, preview=self.preview_hub.channel("picam"),
+                                           pipeline=self._process_pipeline())
+            self.cam_window.show()
+            return
+        controller = None
+        if self.settings.adaptive:
+            controller = AdaptiveController(
+                self.settings.latency_budget_ms / 1000.0, self.settings.min_rate, self.settings.max_rate,
+                [int(s) for s in str(self.settings.input_sizes).split(",")],
+                cpu_high=self.settings.cpu_high, log=self._log_decision)
+        self.cam_window = CameraWindow(create_frame_source(self.settings.picam_source), self.classifier,
+                                       gate=gate, recorder=recorder, preview=self.preview_hub.channel("picam"),
+                                       controller=controller, scheduler=self._thermal_scheduler())
         self.cam_window.show()
 
+    def _thermal_scheduler(self):
+        from Widgets.model_registry import registry
+        from Widgets.thermal import ThermalScheduler, create_thermal_source
+        s = self.settings
+        if not s.thermal:
+            return None
+        source = create_thermal_source(s.thermal_source)
+        if not source.available:
+            self.log_to_gui("⚠️ --thermal: no CPU temperature readable on this machine; running without it.")
+            return None
+        light = None
+        if s.thermal_light_model:
+            light = registry.get(s.thermal_light_backend or s.backend, s.thermal_light_model)  # lädt im Hintergrund
+        self.log_to_gui(f"🌡 Thermal scheduler on {source.describe()}: {s.thermal_soft:.0f}-{s.thermal_hard:.0f} °C"
+                        + (f", light model {s.thermal_light_model}" if light is not None else ""))
+        return ThermalScheduler(source, s.thermal_soft, s.thermal_hard, min_rate=s.min_rate, light=light,
+                                log_every=s.thermal_log_every, csv_path=s.thermal_log, log=self._log_decision)
+
+    def _process_pipeline(self):
+        from Widgets.process_pipeline import ProcessPipeline
+        s = self.settings
+        if s.adaptive:
+            self.log_to_gui("⚠️ --adaptive is not available with --pipeline process; running at full rate.")
+        if s.thermal:
+            self.log_to_gui("⚠️ --thermal is not available with --pipeline process; running at full rate.")
+        cascade = None
+        if s.cascade_model:
+            cascade = {"model": s.cascade_model, "backend": s.cascade_backend, "low": s.cascade_low,
+                       "high": s.cascade_high, "audit": s.cascade_audit}
+        width, height = (int(v) for v in s.pipeline_max_frame.lower().split("x"))
+        self.log_to_gui("🧵 Starting capture and inference processes...")
+        return ProcessPipeline(s.picam_source, s.backend, s.model, (s.gate_threshold, s.gate_max_age), cascade,
+                               max_frame=(width, height))
+
+    def _report_model_status(self):
+        """Log model load/warm-up time once, then time-to-first-prediction once a camera delivers."""
+        entry = self.model_entry
+        if entry.error is not None:
+            self.log_to_gui(f"❌ Model could not be loaded: {entry.error}")
+            self.model_status_timer.stop()
+        elif entry.ready and not self._model_load_reported:
+            self.log_to_gui(f"🧠 Model ready ({entry.backend}): loaded in {entry.load_s:.1f} s, warm-up {entry.warmup_s * 1000:.0f} ms")
+            self._model_load_reported = True
+            profile.mark("model ready")
+            self._report_startup_profile()
+        elif entry.first_prediction_at is not None:
+            profile.mark("first prediction")
+            self.log_to_gui(f"⏱ Time to first prediction: {profile.elapsed('first prediction'):.1f} s after start")
+            self.model_status_timer.stop()
+
+    def _report_startup_profile(self):
+        """--startup-profile: timeline and slowest imports once the model is ready; optionally as JSON."""
+        target = self.settings.startup_profile
+        if target:
+            report = profile.report()
+            print(report)
+            self.log_to_gui(report.replace("\n", "<br>"))
+            if target != "-":
+                profile.save(target)
+        if self.settings.exit_after_startup:
+            QTimer.singleShot(0, self.close)
+
+    def _tiler(self, classifier):
+        from Widgets.tiling import TiledAnalyzer
+        return TiledAnalyzer(classifier, self.settings.tile_grid, self.settings.tile_overlap, self.settings.tile_batch)
+
+    def _log_decision(self, text):
+        print(text)
+        self.log_to_gui(text)
+
     def log_to_gui(self, text):
         """Append text messages to the info box on the GUI."""
         self.info_box.append(text)
 
     def connect_droid_camera(self):
+        from Widgets.frame_sources import create_frame_source
+        if self.settings.droid_source:
+            # Feste Streams aus der Startkonfiguration (z.B. aufgezeichnete Dateien), kein Setup über das Handy
+            specs = self.settings.droid_source if self.settings.multi_stream else self.settings.droid_source[:1]
+            for spec in specs:
+                source = create_frame_source(spec)
+                self.log_to_gui(f"🔗 Using configured source {source.describe()} ...")
+                self._start_droid_stream(source)
+            return
 
-        HTML_PAGE = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Connect DroidCam</title>
-            <style>
-                body { font-family: sans-serif; text-align: center; margin-top: 100px; }
-                input { padding: 10px; font-size: 18px; }
-                button { padding: 10px 20px; font-size: 18px; margin-top: 10px; }
-            </style>
-        </head>
-        <body>
-            <h2>Enter DroidCam IP Address</h2>
-            <form method="post">
-                <input name="ip" placeholder="192.168.x.x" required>
-                <br><button type="submit">Connect</button>
-            </form>
-        </body>
-        </html>
-        """
-
-        app = Flask(__name__)
-        self.droid_ip = None
-
-        @app.route("/", methods=["GET", "POST"])
-        def index():
-            if request.method == "POST":
-                ip = request.form.get("ip", "").strip()
-                if ip:
-                    self.droid_ip = ip
-                    threading.Thread(target=self._connect_to_droidcam, args=(ip,), daemon=True).start()
-                    return "<h3>✅ Connected! You can close this page now.</h3>"
-            return render_template_string(HTML_PAGE)
-
-        self.log_to_gui("🌐 Starting DroidCam setup via web interface...")
-
-        def run_server():
-            app.run(host="0.0.0.0", port=8080, debug=False)
-
-        threading.Thread(target=run_server, daemon=True).start()
+        if self.setup_server is None:
+            self.log_to_gui("❌ Setup page is not available (see --web-port).")
+            return
 
         # Get local IP address of Raspberry Pi
         try:
@@ -151,10 +322,11 @@ class MainWindow(QMainWindow):
 
         # GUI feedback instead of terminal print
         message = (
-            "<b>DroidCam Setup Server Started</b><br>"
-            f"👉 From your phone, open: <b>http://{local_ip}:8080</b><br>"
+            "<b>DroidCam Setup</b><br>"
+            f"👉 From your phone, open: <b>http://{local_ip}:{self.settings.web_port}</b><br>"
             "Make sure both the Raspberry Pi and phone are on the same Wi-Fi.<br>"
-            "After entering your DroidCam IP on the phone, the stream will appear here."
+            "After entering your DroidCam IP on the phone, the stream will appear here and, with the "
+            "detected species, on that page."
         )
         self.log_to_gui(message)
 
@@ -162,36 +334,219 @@ class MainWindow(QMainWindow):
 
 
     def _connect_to_droidcam(self, ip):
+        from Widgets.frame_sources import DroidCamSource
         self.log_to_gui(f"🔗 Connecting to DroidCam at {ip} ...")
-        # url = f"http://{ip}:4747/video?640x480"
-        url = f"http://{ip}:4747/video"
+        source = DroidCamSource(ip)
 
-        cap = cv2.VideoCapture(url)
-        if not cap.isOpened():
-            self.log_to_gui(f"❌ Could not connect to {url}")
+        if not source.open():
+            self.log_to_gui(f"❌ Could not connect to {source.describe()}")
             return
 
-        cap.release()
+        # Verbindung offen lassen: DroidCam nimmt nur einen Client an, der Worker streamt darüber weiter
+        self.droid_stream_requested.emit(source)
+
+    @Slot(object)
+    def _start_droid_stream(self, source):
+        from Widgets.droidcam_widget import CameraWindowDroidCam, CameraWorker
+        if self.streams and not self.settings.multi_stream:
+            self.log_to_gui("⚠️ Already streaming; start with --multi-stream to add more phones.")
+            return
+        if self.streams:
+            # Weitere Handys teilen sich das Modell des ersten Fensters
+            window = CameraWindowDroidCam(self.cam_window_droid.classifier, self.cam_window_droid.tiler,
+                                          self.settings.tiled)
+        else:
+            window = self.cam_window_droid
+        window.setWindowTitle(f"DroidCam Feed – {source.describe()}")
+        stream_id = self._next_stream_id
+        self._next_stream_id += 1
+        window.preview = self.preview_hub.channel(f"droid{stream_id}")
+        window.show()
 
-        self.cam_window_droid.show()
         # Thread + worker
-        self.thread = QThread()
-        self.worker = CameraWorker(url)
-        self.worker.moveToThread(self.thread)
+        thread = QThread()
+        worker = CameraWorker(source)
+        worker.moveToThread(thread)
 
         # Signals
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.worker.frame_ready.connect(lambda f: print("Frame emitted:", f.shape))
-        # self.worker.frame_ready.connect(self.update_frame)
-        self.worker.frame_ready.connect(self.cam_window_droid.update_frame)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        worker.frame_ready.connect(window.update_frame)
+        # Quittung direkt im GUI-Thread: der Worker schickt erst dann das nächste (neueste) Bild
+        window.frame_shown.connect(worker.frame_shown, Qt.DirectConnection)
+        worker.status.connect(window.show_status)
+        # Fenster zu: Stream beenden, damit die (einzige) DroidCam-Verbindung des Handys frei wird
+        window.closed.connect(partial(self._stop_stream, stream_id))
+        worker.finished.connect(partial(self.stream_finished.emit, stream_id))
+
+        if self.settings.multi_stream:
+            # Bilder direkt aus dem Capture-Thread in den gemeinsamen Batch geben
+            self._ensure_batch_service().add_stream(stream_id, source.describe())
+            worker.frame_ready.connect(partial(self.batch_service.submit, stream_id))
+
+        self.streams[stream_id] = (window, thread, worker)
 
         # Start
-        self.thread.start()
+        thread.start()
         self.log_to_gui("✅ Connection successful — opening camera window.")
 
+    def _stop_stream(self, stream_id):
+        """Stop the capture worker of a closed window and wait for its thread."""
+        entry = self.streams.get(stream_id)
+        if entry is None:
+            return
+        _, thread, worker = entry
+        try:
+            worker.stop()
+            thread.quit()
+            thread.wait()
+        except RuntimeError:
+            pass  # Worker schon beendet und gelöscht
+        self._forget_stream(stream_id)
+
+    @Slot(int)
+    def _forget_stream(self, stream_id):
+        """Drop a finished stream: batch slot, preview channel and (extra) window."""
+        entry = self.streams.pop(stream_id, None)
+        if entry is None:
+            return
+        window = entry[0]
+        window.closed.disconnect()
+        if self.batch_service is not None:
+            self.batch_service.remove_stream(stream_id)
+        if window.preview is not None:
+            window.preview.close()
+            window.preview = None
+        if window is not self.cam_window_droid:
+            window.close()
+            window.deleteLater()
+        print(f"🔌 DroidCam stream droid{stream_id} closed")
+
+    def _ensure_batch_service(self):
+        """Start the shared micro-batching classifier for multi-stream mode on first use."""
+        from Widgets.batch_inference import BatchInferenceService
+        if self.batch_service is None:
+            self.batch_service = BatchInferenceService(
+                self.cam_window_droid.classifier, self.settings.batch_size, self.settings.batch_wait_ms / 1000.0
+            )
+            self.batch_thread = QThread()
+            self.batch_service.moveToThread(self.batch_thread)
+            self.batch_thread.started.connect(self.batch_service.run)
+            self.batch_service.finished.connect(self.batch_thread.quit)
+            self.batch_service.result_ready.connect(self._route_batch_result)
+            self.batch_thread.start()
+
+            self.batch_stats_timer = QTimer(self)
+            self.batch_stats_timer.timeout.connect(self._log_batch_stats)
+            self.batch_stats_timer.start(10000)
+        return self.batch_service
+
+    @Slot(int, str, float)
+    def _route_batch_result(self, stream_id, pred_label, conf):
+        entry = self.streams.get(stream_id)
+        if entry is not None:
+            entry[0].show_live_result(pred_label, conf)
+
+    def _log_batch_stats(self):
+        stats = self.batch_service.stats()
+        lines = [f"📊 Batches: {stats['batches']}, mean size {stats['mean_batch']}, fairness {stats['fairness']}"]
+        for s in stats["streams"].values():
+            latency = s["latency"].get("p95_ms", 0.0)
+            lines.append(f"&nbsp;&nbsp;{s['name']}: served {s['served']}, dropped {s['dropped']}, p95 {latency:.0f} ms")
+        self.log_to_gui("<br>".join(lines))
+
+    def _collect_metrics(self):
+        """Scrape-time metrics from the live windows and workers (called from the web server thread)."""
+        fps = ("treedetection_fps", "gauge", "Frames per second, measured over the last 2 s.")
+        frames = ("treedetection_frames_total", "counter", "Frames per stream and what happened to them.")
+        depth = ("treedetection_queue_depth", "gauge", "Frames waiting for the classifier.")
+        window = self.cam_window
+        if window is not None and window.inference_worker.running:
+            worker = window.inference_worker
+            yield (*fps, {"stream": "picam", "stage": "preview"}, window.preview_fps.fps)
+            yield (*fps, {"stream": "picam", "stage": "inference"}, worker.fps_meter.fps)
+            yield (*frames, {"stream": "picam", "state": "dropped"}, worker.slot.dropped)
+            yield (*depth, {"queue": "picam"}, worker.slot.depth)
+            if window.controller is not None:
+                state = window.controller.state()
+                yield ("treedetection_adaptive_rate", "gauge", "Inference rate limit set by the adaptive controller.",
+                       {}, state["rate"])
+                yield ("treedetection_adaptive_input_size", "gauge", "Model input size set by the adaptive controller.",
+                       {}, state["input_size"])
+                yield ("treedetection_adaptive_changes_total", "counter", "Adaptive controller decisions.",
+                       {}, state["changes"])
+            if window.scheduler is not None:
+                state = window.scheduler.state()
+                if state["temp_c"] is not None:
+                    yield ("treedetection_cpu_temperature_celsius", "gauge", "CPU temperature.", {}, state["temp_c"])
+                if state["freq_mhz"] is not None:
+                    yield ("treedetection_cpu_frequency_mhz", "gauge", "Current CPU clock.", {}, state["freq_mhz"])
+                yield ("treedetection_thermal_rate_limit", "gauge", "Inference rate limit set by the thermal scheduler.",
+                       {}, state["rate"])
+                yield ("treedetection_thermal_light_model", "gauge", "1 while the thermal scheduler uses the light model.",
+                       {}, int(state["light_model"]))
+            if worker.gate is not None:
+                cache = ("treedetection_gate_lookups_total", "counter", "Scene-change gate lookups by outcome.")
+                yield (*cache, {"result": "hit"}, worker.gate.hits)
+                yield (*cache, {"result": "miss"}, worker.gate.misses)
+        for _, _, worker in list(self.streams.values()):
+            try:
+                stats = worker.stats()
+                name = worker.source.describe()
+                yield (*fps, {"stream": name, "stage": "capture"}, worker.fps_meter.fps)
+            except RuntimeError:
+                continue  # Worker schon gelöscht
+            for state in ("grabbed", "emitted", "dropped", "late"):
+                yield (*frames, {"stream": name, "state": state}, stats[state])
+            yield ("treedetection_reconnects_total", "counter", "Reconnects after a lost camera stream.",
+                   {"stream": name}, stats["reconnects"])
+        if self.batch_service is not None:
+            for s in self.batch_service.stats()["streams"].values():
+                yield (*depth, {"queue": f"batch:{s['name']}"}, s["pending"])
+                yield (*frames, {"stream": s["name"], "state": "batch_dropped"}, s["dropped"])
+        entry = self.model_entry
+        load = ("treedetection_model_load_seconds", "gauge", "Model load and warm-up time.")
+        if entry.load_s is not None:
+            yield (*load, {"backend": entry.backend, "phase": "load"}, entry.load_s)
+        if entry.warmup_s is not None:
+            yield (*load, {"backend": entry.backend, "phase": "warmup"}, entry.warmup_s)
+        if entry.time_to_first_prediction is not None:
+            yield ("treedetection_time_to_first_prediction_seconds", "gauge",
+                   "Seconds from app start to the first real prediction.", {"backend": entry.backend},
+                   entry.time_to_first_prediction)
+
+    def _log_metrics(self):
+        parts = []
+        window = self.cam_window
+        if window is not None and window.inference_worker.running:
+            parts.append(f"Pi {window.preview_fps.fps:.0f}/{window.inference_worker.fps_meter.fps:.1f} FPS, "
+                         f"dropped {window.inference_worker.slot.dropped}")
+        for _, _, worker in list(self.streams.values()):
+            try:
+                stats = worker.stats()
+                parts.append(f"{worker.source.describe()} {worker.fps_meter.fps:.0f} FPS, "
+                             f"dropped {stats['dropped']}, late {stats['late']}")
+            except RuntimeError:
+                continue
+        for pipeline in ("camera", "batch"):
+            p95 = INFERENCE_SECONDS.quantile(0.95, pipeline=pipeline)
+            if p95 is not None:
+                parts.append(f"inference p95 ≤ {p95 * 1000:.0f} ms ({pipeline})")
+        from Widgets.cascade import CascadeClassifier
+        # Nie Attribute am ModelEntry abfragen: __getattr__ wartet auf das Laden
+        if isinstance(self.classifier, CascadeClassifier) and self.classifier.frames:
+            stats = self.classifier.stats()
+            text = f"cascade early exit {stats['early_exit_fraction']:.0%}"
+            if stats["audit_agreement"] is not None:
+                text += f", agreement {stats['audit_agreement']:.1%} ({stats['audited']} audited)"
+            parts.append(text)
+        if not parts:
+            return  # noch keine Kamera verbunden
+        parts.append(f"RSS {rss_bytes() / 2**20:.0f} MB")
+        self.log_to_gui("📈 " + " | ".join(parts))
+
     # @Slot(object)
     # def update_frame(self, frame):
     #     print("Updating Frame")
@@ -202,15 +557,28 @@ class MainWindow(QMainWindow):
     #     # self.label.setPixmap(QPixmap.fromImage(qt_img))
 
     def closeEvent(self, event):
-        if self.worker:
-            self.worker.stop()
-        if self.thread:
-            self.thread.quit()
-            self.thread.wait()
+        for _, thread, worker in list(self.streams.values()):
+            try:
+                worker.stop()
+                thread.quit()
+                thread.wait()
+            except RuntimeError:
+                pass  # stream already ended, Qt objects deleted via deleteLater
+        if self.batch_service:
+            self.batch_service.stop()
+            self.batch_thread.quit()
+            self.batch_thread.wait()
+        metrics.unregister_collector(self._collect_metrics)
+        if self.preview_hub is not None:
+            self.preview_hub.close()
+        for server in (self.web_server, self.setup_server):
+            if server:
+                server.stop()
         event.accept()
 
 if __name__ == "__main__":
+    settings = load_settings(sys.argv[1:])
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(settings)
     window.show()
     sys.exit(app.exec())
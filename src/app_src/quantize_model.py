@@ -0,0 +1,187 @@
+"""Post-training INT8 quantization of the tree classifier, with an accuracy/latency/memory report.
+
+    python quantize_model.py --calibration data/calib --eval data/eval --report quant_report.json
+
+The calibration folder holds representative survey images (any layout). The
+evaluation folder has one subfolder per species (viburnum/, quercus/, ...).
+The quantized model is written to Widgets/treeDetection.int8.onnx and can be
+used in the GUI with --backend onnx-int8.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+
+from Widgets.flammability import FLAMMABILITY_FACTORS
+from Widgets.inference_backends import DEFAULT_MODEL_PATHS, OnnxClassifier, export_model, load_classifier
+from Widgets.profiling import summarize
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def list_images(folder):
+    paths = []
+    for root, _, files in os.walk(folder):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(paths)
+
+
+def labelled_images(folder):
+    """(path, species) pairs; the species is the name of the image's top-level subfolder."""
+    samples = []
+    for species in sorted(os.listdir(folder)):
+        subdir = os.path.join(folder, species)
+        if os.path.isdir(subdir):
+            samples.extend((path, species.lower()) for path in list_images(subdir))
+    return samples
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, in KiB on Linux
+
+
+def quantize(fp32_path, calibration_dir, out_path, max_images=300, per_channel=True):
+    """Static INT8 quantization (QDQ, int8 weights / uint8 activations) calibrated on calibration_dir."""
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    reference = OnnxClassifier(fp32_path)
+    images = list_images(calibration_dir)[:max_images]
+    if not images:
+        raise SystemExit(f"No calibration images found in {calibration_dir}")
+
+    class FolderReader(CalibrationDataReader):
+        def __init__(self):
+            self._paths = iter(images)
+
+        def get_next(self):
+            for path in self._paths:
+                frame = cv2.imread(path)
+                if frame is not None:
+                    return {reference.input_name: reference.preprocess(frame)[None]}
+            return None
+
+    model_input = fp32_path
+    try:
+        # Shape-Inferenz und Graph-Optimierung vorab verbessern die Quantisierung
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+        model_input = out_path + ".prep.onnx"
+        quant_pre_process(fp32_path, model_input)
+    except Exception as e:
+        print(f"⚠️ Pre-processing skipped: {e}")
+        model_input = fp32_path
+
+    quantize_static(model_input, out_path, FolderReader(),
+                    quant_format=QuantFormat.QDQ, per_channel=per_channel,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    if model_input != fp32_path:
+        os.remove(model_input)
+    print(f"✅ Calibrated on {len(images)} images -> {out_path}")
+    return out_path
+
+
+def evaluate_model(backend, model_path, samples, warmup=5):
+    """Runs in a fresh process so memory numbers are not polluted by other models."""
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    classifier = load_classifier(backend, model_path)
+    load_s = time.perf_counter() - start
+    rss_loaded = _rss_mb()
+
+    correct, total, latencies = {}, {}, []
+    for i, (path, species) in enumerate(samples):
+        frame = cv2.imread(path)
+        if frame is None:
+            continue
+        t = time.perf_counter()
+        prediction = classifier.predict(frame)
+        if i >= warmup:
+            latencies.append(time.perf_counter() - t)
+        total[species] = total.get(species, 0) + 1
+        correct[species] = correct.get(species, 0) + int(prediction.label.lower() == species)
+
+    if os.path.isdir(model_path):
+        size_mb = sum(os.path.getsize(os.path.join(model_path, f)) for f in os.listdir(model_path)) / 2**20
+    else:
+        size_mb = os.path.getsize(model_path) / 2**20
+    n = sum(total.values())
+    return {
+        "backend": backend,
+        "model": model_path,
+        "file_mb": round(size_mb, 2),
+        "load_s": round(load_s, 3),
+        "rss_model_mb": round(rss_loaded - rss_before, 1),
+        "rss_peak_mb": round(_rss_mb(), 1),
+        "latency": summarize(latencies),
+        "accuracy": round(sum(correct.values()) / n, 4) if n else None,
+        "per_species": {s: round(correct[s] / total[s], 4) for s in sorted(total)},
+        "images": n,
+    }
+
+
+def print_report(models):
+    species = list(FLAMMABILITY_FACTORS)
+    header = f"  {'model':<12}{'MB':>7}{'RSS MB':>8}{'p50 ms':>8}{'p95 ms':>8}{'acc':>7}" + "".join(f"{s[:9]:>11}" for s in species)
+    print("\n" + header)
+    for name, m in models.items():
+        acc = m["accuracy"] if m["accuracy"] is not None else float("nan")
+        per = "".join(f"{m['per_species'].get(s, float('nan')):>11.3f}" for s in species)
+        print(f"  {name:<12}{m['file_mb']:>7.1f}{m['rss_model_mb']:>8.1f}{m['latency'].get('p50_ms', 0):>8.2f}"
+              f"{m['latency'].get('p95_ms', 0):>8.2f}{acc:>7.3f}{per}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calibration", required=True, help="folder of representative images")
+    parser.add_argument("--eval", help="folder with one subfolder per species (default: skip the report)")
+    parser.add_argument("--fp32", default=DEFAULT_MODEL_PATHS["onnx"], help="FP32 ONNX model (exported if missing)")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATHS["onnx-int8"])
+    parser.add_argument("--max-calibration", type=int, default=300)
+    parser.add_argument("--per-tensor", action="store_true", help="per-tensor instead of per-channel weights")
+    parser.add_argument("--with-torch", action="store_true", help="also evaluate the PyTorch model")
+    parser.add_argument("--report", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.fp32):
+        args.fp32 = export_model("onnx")
+    quantize(args.fp32, args.calibration, args.output, args.max_calibration, per_channel=not args.per_tensor)
+
+    if not args.eval:
+        return
+    samples = labelled_images(args.eval)
+    candidates = {"onnx-fp32": ("onnx", args.fp32), "onnx-int8": ("onnx-int8", args.output)}
+    if args.with_torch:
+        candidates = {"torch": ("torch", DEFAULT_MODEL_PATHS["torch"]), **candidates}
+
+    ctx = multiprocessing.get_context("spawn")
+    models = {}
+    for name, (backend, path) in candidates.items():
+        with ctx.Pool(1) as pool:
+            models[name] = pool.apply(evaluate_model, (backend, path, samples))
+    print_report(models)
+
+    fp32, int8 = models["onnx-fp32"], models["onnx-int8"]
+    drops = {s: round(fp32["per_species"][s] - int8["per_species"].get(s, 0.0), 4) for s in fp32["per_species"]}
+    summary = {
+        "speedup_p50": round(fp32["latency"]["p50_ms"] / int8["latency"]["p50_ms"], 2) if int8["latency"].get("p50_ms") else None,
+        "size_ratio": round(int8["file_mb"] / fp32["file_mb"], 3) if fp32["file_mb"] else None,
+        "accuracy_drop": round((fp32["accuracy"] or 0) - (int8["accuracy"] or 0), 4),
+        "worst_species_drop": max(drops.items(), key=lambda kv: kv[1]) if drops else None,
+    }
+    print(f"\nINT8 vs FP32: speed-up {summary['speedup_p50']}x, size x{summary['size_ratio']}, "
+          f"accuracy drop {summary['accuracy_drop']:.3f}, worst species {summary['worst_species_drop']}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"models": models, "species_drop": drops, "summary": summary}, f, indent=2)
+        print(f"Wrote {args.report}")
+
+
+if __name__ == "__main__":
+    main()